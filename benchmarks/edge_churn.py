@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: 2025 pydot contributors
+#
+# SPDX-License-Identifier: MIT
+
+"""Benchmark edge churn: repeatedly adding and deleting edges.
+
+Each cycle adds an edge and deletes it again, addressing it in the
+reverse direction half of the time. Run with:
+
+    python benchmarks/edge_churn.py --cycles 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pydot
+
+
+def churn(graph: pydot.Graph, cycles: int, nodes: int) -> float:
+    undirected = graph.get_type() == "graph"
+    start = time.perf_counter()
+    for i in range(cycles):
+        src = f"n{i % nodes}"
+        dst = f"n{(i * 7 + 1) % nodes}"
+        graph.add_edge(pydot.Edge(src, dst))
+        if undirected and i % 2:
+            src, dst = dst, src
+        assert graph.get_edge(src, dst)
+        assert graph.del_edge(src, dst)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=1_000_000)
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument(
+        "--background-edges",
+        type=int,
+        default=100_000,
+        help="number of edges in the graph that are not churned",
+    )
+    args = parser.parse_args()
+
+    for graph_type in ("graph", "digraph"):
+        graph = pydot.Dot(graph_type=graph_type)
+        for i in range(args.background_edges):
+            graph.add_edge(pydot.Edge(f"b{i}", f"b{i + 1}"))
+        elapsed = churn(graph, args.cycles, args.nodes)
+        print(
+            f"{graph_type:8} {args.cycles} cycles in {elapsed:.2f}s "
+            f"({args.cycles / elapsed:,.0f} cycles/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
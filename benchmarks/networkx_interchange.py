@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: 2025 pydot contributors
+#
+# SPDX-License-Identifier: MIT
+
+"""Benchmark conversions between pydot and NetworkX or igraph graphs.
+
+Compares `pydot.from_networkx` and `Graph.to_networkx` with the
+converters of `networkx.drawing.nx_pydot`, and times the igraph
+converters if igraph is installed. All of them run with the garbage
+collector paused by `pydot.gc_paused`. Requires NetworkX. Run with:
+
+    python benchmarks/networkx_interchange.py --edges 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+import networkx as nx
+from networkx.drawing import nx_pydot
+
+import pydot
+
+
+def make_graph(nodes: int, edges: int) -> nx.MultiDiGraph:
+    rng = random.Random(0)
+    graph = nx.MultiDiGraph()
+    graph.add_nodes_from(
+        (f"n{i}", {"color": ("red", "blue")[i % 2]}) for i in range(nodes)
+    )
+    graph.add_edges_from(
+        (
+            f"n{rng.randrange(nodes)}",
+            f"n{rng.randrange(nodes)}",
+            {"weight": str(i % 10)},
+        )
+        for i in range(edges)
+    )
+    return graph
+
+
+def timed(label: str, edges: int, func: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:28} {elapsed:6.2f}s ({edges / elapsed:,.0f} edges/s)",
+        flush=True,
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument(
+        "--skip-nx-pydot",
+        action="store_true",
+        help="don't time the converters of networkx.drawing.nx_pydot",
+    )
+    args = parser.parse_args()
+
+    nx_graph = make_graph(args.nodes, args.edges)
+    with pydot.gc_paused():
+        run(nx_graph, args.edges, args.skip_nx_pydot)
+
+
+def run(nx_graph: nx.MultiDiGraph, edges: int, skip_nx_pydot: bool) -> None:
+    graph = timed(
+        "pydot.from_networkx", edges, lambda: pydot.from_networkx(nx_graph)
+    )
+    timed("Graph.to_networkx", edges, graph.to_networkx)
+    if not skip_nx_pydot:
+        timed("nx_pydot.to_pydot", edges, lambda: nx_pydot.to_pydot(nx_graph))
+        timed("nx_pydot.from_pydot", edges, lambda: nx_pydot.from_pydot(graph))
+
+    try:
+        import igraph  # noqa: F401
+    except ImportError:
+        return
+    ig_graph = timed("Graph.to_igraph", edges, graph.to_igraph)
+    timed("pydot.from_igraph", edges, lambda: pydot.from_igraph(ig_graph))
+
+
+if __name__ == "__main__":
+    main()
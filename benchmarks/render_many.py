@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: 2025 pydot contributors
+#
+# SPDX-License-Identifier: MIT
+
+"""Benchmark rendering many small graphs, one by one and in parallel.
+
+Compares a loop over `Dot.create` with `pydot.render_many` for several
+numbers of workers. Requires Graphviz. Run with:
+
+    python benchmarks/render_many.py --graphs 2000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pydot
+
+
+def make_graphs(count: int, size: int) -> list[pydot.Dot]:
+    graphs = []
+    for i in range(count):
+        graph = pydot.Dot(f"G{i}")
+        for j in range(size):
+            graph.add_edge(pydot.Edge(f"n{j}", f"n{(j * 7 + i) % size}"))
+        graphs.append(graph)
+    return graphs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--graphs", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--format", default="svg")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    graphs = make_graphs(args.graphs, args.size)
+
+    start = time.perf_counter()
+    for graph in graphs:
+        graph.create(format=args.format)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'create':12} {args.graphs} graphs in {elapsed:.2f}s "
+        f"({args.graphs / elapsed:,.0f} graphs/s)"
+    )
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        for result in pydot.render_many(
+            graphs, format=args.format, workers=workers
+        ):
+            assert result.error is None, result.error
+        elapsed = time.perf_counter() - start
+        label = f"workers={workers}"
+        print(
+            f"{label:12} {args.graphs} graphs in {elapsed:.2f}s "
+            f"({args.graphs / elapsed:,.0f} graphs/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
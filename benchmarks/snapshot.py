@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: 2025 pydot contributors
+#
+# SPDX-License-Identifier: MIT
+
+"""Benchmark binary snapshots of large graphs.
+
+Compares `Dot.dump_binary`, `pydot.load_binary` and the loading of a
+single cluster with `pydot.GraphSnapshot` to pickling the graph, with
+the garbage collector paused by `pydot.gc_paused`. Run with:
+
+    python benchmarks/snapshot.py --edges 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pickle
+import random
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+import pydot
+
+
+def make_graph(nodes: int, edges: int, clusters: int) -> pydot.Dot:
+    rng = random.Random(0)
+    graph = pydot.Dot("G")
+    sgraphs = [pydot.Cluster(f"c{i}", label=f"C{i}") for i in range(clusters)]
+    for sgraph in sgraphs:
+        graph.add_subgraph(sgraph)
+    graph.add_edges(
+        pydot.Edge(
+            f"n{rng.randrange(nodes)}",
+            f"n{rng.randrange(nodes)}",
+            weight=str(i % 10),
+        )
+        for i in range(edges // 2)
+    )
+    for i in range(edges - edges // 2):
+        sgraphs[i % clusters].add_edge(
+            pydot.Edge(
+                f"n{rng.randrange(nodes)}",
+                f"n{rng.randrange(nodes)}",
+                color="red",
+            )
+        )
+    return graph
+
+
+def timed(label: str, func: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:24} {time.perf_counter() - start:6.2f}s", flush=True)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--clusters", type=int, default=10)
+    args = parser.parse_args()
+
+    graph = make_graph(args.nodes, args.edges, args.clusters)
+    with pydot.gc_paused():
+        run(graph)
+
+
+def run(graph: pydot.Dot) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "graph.bin")
+        timed("Dot.dump_binary", lambda: graph.dump_binary(path))
+        print(f"{'snapshot size':24} {os.path.getsize(path) >> 20:6} MiB")
+        timed("pydot.load_binary", lambda: pydot.load_binary(path))
+        with pydot.GraphSnapshot(path) as snapshot:
+            timed(
+                "GraphSnapshot cluster",
+                lambda: snapshot.load_subgraph("cluster_c0"),
+            )
+
+    data = timed("pickle.dumps", lambda: pickle.dumps(graph, protocol=5))
+    print(f"{'pickle size':24} {len(data) >> 20:6} MiB")
+    timed("pickle.loads", lambda: pickle.loads(data))
+
+
+if __name__ == "__main__":
+    main()
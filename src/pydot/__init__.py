@@ -16,6 +16,23 @@ _logger.debug("pydot initializing")
 _logger.debug("pydot %s", __version__)
 
 
-from pydot.classes import FrozenDict  # noqa: F401, E402
+from pydot.classes import (  # noqa: F401, E402
+    FrozenDict,
+    SharedAttributes,
+    intern_attributes,
+)
 from pydot.core import *  # noqa: F403, E402
 from pydot.exceptions import *  # noqa: E402, F403
+from pydot.render import (  # noqa: F401, E402
+    DirectoryRenderCache,
+    MemoryRenderCache,
+    RenderCache,
+    RenderPool,
+    RenderResult,
+    render_many,
+)
+from pydot.snapshot import (  # noqa: F401, E402
+    CompactPickle,
+    GraphSnapshot,
+    load_binary,
+)
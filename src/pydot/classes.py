@@ -7,7 +7,9 @@
 from __future__ import annotations
 
 import copy
-from typing import Any, Dict, Union
+import sys
+import weakref
+from typing import Any, Dict, Mapping, Union
 
 
 class FrozenDict(dict):  # type: ignore
@@ -86,6 +88,75 @@ class FrozenDict(dict):  # type: ignore
         return f"FrozenDict({dict_repr})"
 
 
+class SharedAttributes(FrozenDict):
+    """Immutable attribute dictionary, shared by several graph elements.
+
+    Instances are obtained from `intern_attributes()`, which returns the
+    same instance for equal attribute dictionaries. Elements holding a
+    shared dictionary replace it with a private copy the first time one
+    of their attributes is set through `set()` or the `set_*` methods,
+    so a change to one element never affects the others.
+
+    Unlike its base class, values are stored as given, without freezing
+    nested containers.
+    """
+
+    # The DOT output of the attributes, by the type of element using them
+    _formatted: dict[type, str]
+
+    def __new__(cls, *args: Any, **kw: Any) -> Any:
+        new = dict.__new__(cls)
+        dict.__init__(new, *args, **kw)
+        new._formatted = {}
+        return new
+
+    def __eq__(self, other: Any) -> bool:
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: Any) -> bool:
+        return dict.__ne__(self, other)
+
+    __hash__ = FrozenDict.__hash__
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (intern_attributes, (dict(self),))
+
+    def __repr__(self) -> str:
+        dict_repr = dict.__repr__(self)
+        return f"SharedAttributes({dict_repr})"
+
+
+_interned_attributes: weakref.WeakValueDictionary[
+    tuple[tuple[str, type, Any], ...], SharedAttributes
+] = weakref.WeakValueDictionary()
+
+
+def intern_attributes(attrs: Mapping[str, Any]) -> SharedAttributes:
+    """Get the shared, immutable instance of an attribute dictionary.
+
+    Attribute names and string values are interned as well. Raises
+    `TypeError` if any of the values is unhashable.
+    """
+    if isinstance(attrs, SharedAttributes):
+        return attrs
+    items = tuple(
+        (
+            sys.intern(k) if type(k) is str else k,
+            sys.intern(v) if type(v) is str else v,
+        )
+        for k, v in attrs.items()
+    )
+    # Equal values of different types, like 1, 1.0 and True, are
+    # output differently, so they must not share a dictionary.
+    key = tuple((k, type(v), v) for k, v in items)
+    shared = _interned_attributes.get(key)
+    if shared is None:
+        shared = SharedAttributes(items)
+        hash(shared)
+        _interned_attributes[key] = shared
+    return shared
+
+
 # Backwards-compatible typing alias
 AttributeDict = Dict[str, Any]
 EdgeEndpoint = Union[str, int, float, FrozenDict]
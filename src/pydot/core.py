@@ -6,25 +6,61 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import collections
+import contextlib
 import copy
 import errno
+import functools
+import gc
+import io
 import itertools
+import json
 import logging
+import math
 import os
 import re
+import shutil
 import subprocess
 import sys
+import threading
 import warnings
-from typing import TYPE_CHECKING, Any, Final, Sequence, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Final,
+    Generic,
+    Iterable,
+    Iterator,
+    KeysView,
+    Mapping,
+    NamedTuple,
+    NoReturn,
+    Sequence,
+    TypeVar,
+    Union,
+    cast,
+)
 
 if TYPE_CHECKING:
     # `typing_extensions` is always available in `TYPE_CHECKING` blocks,
     # even if not  installed
     from typing_extensions import Self, TypeAlias
 
+    from pydot.render import RenderCache, RenderPool
+
 import pydot
 from pydot._vendor import tempfile
-from pydot.classes import AttributeDict, EdgeEndpoint, FrozenDict
+from pydot.classes import (
+    AttributeDict,
+    EdgeEndpoint,
+    FrozenDict,
+    SharedAttributes,
+    intern_attributes,
+)
 
 _logger = logging.getLogger(__name__)
 _logger.debug("pydot core module initializing")
@@ -181,9 +217,12 @@ def __generate_format_methods(Klass: type) -> None:
             f: str = frmt,
             prog: str | None = None,
             encoding: str | None = None,
+            **kwargs: Any,
         ) -> bytes:
             """Refer to docstring of method `create`."""
-            return self.create(format=f, prog=prog, encoding=encoding)
+            return self.create(
+                format=f, prog=prog, encoding=encoding, **kwargs
+            )
 
         setattr(Klass, f"create_{frmt}", __create_method)
 
@@ -195,9 +234,10 @@ def __generate_format_methods(Klass: type) -> None:
             f: str = frmt,
             prog: str | None = None,
             encoding: str | None = None,
+            **kwargs: Any,
         ) -> None:
             """Refer to docstring of method `write`."""
-            self.write(path, format=f, prog=prog, encoding=encoding)
+            self.write(path, format=f, prog=prog, encoding=encoding, **kwargs)
 
         setattr(Klass, f"write_{frmt}", __write_method)
 
@@ -220,25 +260,108 @@ def get_executable_extension() -> str:
         return ""
 
 
-def call_graphviz(
-    program: str,
-    arguments: list[str],
-    working_dir: str | bytes,
-    **kwargs: Any,
-) -> tuple[bytes, bytes, subprocess.Popen[bytes]]:
-    if program in DEFAULT_PROGRAMS:
-        extension = get_executable_extension()
-        program += extension
+class GraphvizInstallation:
+    """The Graphviz installation found in the `$PATH`.
 
-    if arguments is None:
-        arguments = []
+    Finding a program in the `$PATH` and probing its capabilities take
+    time, so they are done once and cached, see `get_graphviz`.
+    Programs are run by their absolute path, so a missing program is
+    reported without trying to start it.
 
-    if "creationflags" not in kwargs and hasattr(
-        subprocess, "CREATE_NO_WINDOW"
-    ):
-        # Only on Windows OS:
-        # specify that the new process shall not create a new window
-        kwargs.update(creationflags=subprocess.CREATE_NO_WINDOW)
+    The installation can also be inspected, for example to fail early
+    if it lacks what an application needs:
+
+        graphviz = pydot.get_graphviz()
+        if "svg" not in graphviz.formats:
+            raise SystemExit(f"No SVG support in Graphviz {graphviz.version}")
+
+    @param env: the environment programs are run with, holding the
+      `$PATH` they are searched in.
+    """
+
+    def __init__(self, env: dict[str, str]) -> None:
+        self.env = env
+        self.extension = get_executable_extension()
+        self._paths: dict[str, str] = {}
+        self._banners: dict[str, bytes] = {}
+
+    def which(self, program: str) -> str | None:
+        """Get the absolute path of a program, or None if not found.
+
+        The names in `DEFAULT_PROGRAMS` get the platform's executable
+        extension. Paths are returned as they are.
+        """
+        path = self._paths.get(program)
+        if path is None:
+            if os.sep in program or (os.altsep and os.altsep in program):
+                return program
+            name = program
+            if name in DEFAULT_PROGRAMS:
+                name += self.extension
+            path = shutil.which(name, path=self.env["PATH"])
+            if path is None:
+                # Not cached, Graphviz may be installed later.
+                return None
+            self._paths[program] = path
+        return path
+
+    def banner(self, program: str = "dot") -> bytes:
+        """Get the version banner a program prints for `-V`."""
+        banner = self._banners.get(program)
+        if banner is None:
+            with _prog_not_found_error(program):
+                stdout_data, stderr_data, _ = call_graphviz(
+                    program=program, arguments=["-V"], working_dir=None
+                )
+            banner = self._banners[program] = stdout_data + stderr_data
+        return banner
+
+    @functools.cached_property
+    def version(self) -> str:
+        """The version of Graphviz, for example `'2.43.0'`."""
+        m = re.search(rb"version (\d+(?:\.\d+)*)", self.banner())
+        if m is None:
+            raise pydot.Error(f"Unknown Graphviz version: {self.banner()!r}")
+        return m.group(1).decode()
+
+    @functools.cached_property
+    def version_info(self) -> tuple[int, ...]:
+        """The version of Graphviz, as a tuple of integers."""
+        return tuple(int(part) for part in self.version.split("."))
+
+    @functools.cached_property
+    def formats(self) -> frozenset[str]:
+        """The output formats supported by `dot`."""
+        return self._choices("-T?")
+
+    @functools.cached_property
+    def layout_engines(self) -> frozenset[str]:
+        """The layout engines supported by `dot`."""
+        return self._choices("-K?")
+
+    def _choices(self, option: str) -> frozenset[str]:
+        """Get the values listed by `dot` for an unknown option value."""
+        with _prog_not_found_error("dot"):
+            stdout_data, stderr_data, _ = call_graphviz(
+                program="dot", arguments=[option], working_dir=None
+            )
+        message = (stdout_data + stderr_data).decode(errors="replace")
+        _, _, choices = message.partition("Use one of:")
+        return frozenset(choices.split())
+
+
+_graphviz: GraphvizInstallation | None = None
+
+
+def get_graphviz(refresh: bool = False) -> GraphvizInstallation:
+    """Get the Graphviz installation programs are run from.
+
+    The installation is found once and reused, as long as the
+    environment variables Graphviz is run with are unchanged. Pass
+    `refresh=True` to find it again anyway, for example after
+    installing Graphviz.
+    """
+    global _graphviz
 
     # explicitly inherit `$PATH`, on Windows too,
     # with `shell=False`
@@ -248,13 +371,42 @@ def call_graphviz(
         "SYSTEMROOT": os.environ.get("SYSTEMROOT", ""),
     }
 
-    program_with_args = [program] + arguments
+    graphviz = _graphviz
+    if refresh or graphviz is None or graphviz.env != env:
+        graphviz = _graphviz = GraphvizInstallation(env)
+    return graphviz
+
+
+def call_graphviz(
+    program: str,
+    arguments: list[str],
+    working_dir: str | bytes | None,
+    input: bytes | None = None,
+    limits: RenderLimits | None = None,
+    **kwargs: Any,
+) -> tuple[bytes, bytes, subprocess.Popen[bytes]]:
+    """Run a Graphviz program and collect its output.
+
+    If `input` is given, it is fed to the program's standard input,
+    while its output is being read. If `limits` is given, the program
+    is stopped when it exceeds them, raising `GraphvizLimitError`. Any
+    additional keyword arguments are passed to `subprocess.Popen`.
+
+    Returns the standard output, standard error and the process object.
+    """
+    program_with_args, env = _graphviz_command(program, arguments, kwargs)
 
     if sys.version_info < (3, 9):
         my_popen = subprocess.Popen  # pragma: no cover
     else:
         my_popen = subprocess.Popen[bytes]
 
+    if input is not None:
+        kwargs.update(stdin=subprocess.PIPE)
+
+    if limits is not None:
+        limits._prepare(kwargs)
+
     process = my_popen(
         program_with_args,
         env=env,
@@ -264,11 +416,257 @@ def call_graphviz(
         stdout=subprocess.PIPE,
         **kwargs,
     )
-    stdout_data, stderr_data = process.communicate()
+    if limits is None:
+        stdout_data, stderr_data = process.communicate(input)
+        return stdout_data, stderr_data, process
+
+    limits._apply(process.pid)
+    try:
+        stdout_data, stderr_data = process.communicate(
+            input, timeout=limits.timeout
+        )
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        limits._exceeded(program, "timeout")
+    limits._check(program, process.returncode, stderr_data)
+
+    return stdout_data, stderr_data, process
+
+
+async def acall_graphviz(
+    program: str,
+    arguments: list[str],
+    working_dir: str | bytes | None,
+    input: bytes | None = None,
+    limits: RenderLimits | None = None,
+    **kwargs: Any,
+) -> tuple[bytes, bytes, asyncio.subprocess.Process]:
+    """Run a Graphviz program from a coroutine and collect its output.
+
+    Like `call_graphviz`, but waits for the program without blocking the
+    event loop. Additional keyword arguments are passed to
+    `asyncio.create_subprocess_exec`. If the awaiting task is cancelled,
+    the program is killed.
+
+    Returns the standard output, standard error and the process object.
+    """
+    program_with_args, env = _graphviz_command(program, arguments, kwargs)
+
+    if input is not None:
+        kwargs.update(stdin=asyncio.subprocess.PIPE)
+
+    if limits is not None:
+        limits._prepare(kwargs)
+
+    process = await asyncio.create_subprocess_exec(
+        *program_with_args,
+        env=env,
+        cwd=working_dir,
+        stderr=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        **kwargs,
+    )
+    timeout = None
+    if limits is not None:
+        limits._apply(process.pid)
+        timeout = limits.timeout
+    try:
+        stdout_data, stderr_data = await asyncio.wait_for(
+            process.communicate(input), timeout
+        )
+    except BaseException as e:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        if limits is not None and isinstance(e, asyncio.TimeoutError):
+            limits._exceeded(program, "timeout")
+        raise
+    if limits is not None:
+        limits._check(program, process.returncode, stderr_data)
 
     return stdout_data, stderr_data, process
 
 
+class RenderLimits:
+    """Limits on the resources used by a run of a Graphviz program.
+
+    Pathological graphs can keep a layout engine busy for hours. Passing
+    limits to `Dot.create` (or `call_graphviz` and the other rendering
+    methods) stops the program when it exceeds them, raising
+    `GraphvizLimitError`.
+
+        limits = pydot.RenderLimits(timeout=30, memory=2 * 1024**3)
+        png = graph.create_png(limits=limits)
+
+    @param timeout: wall clock time in seconds.
+    @param cpu_time: CPU time in seconds, rounded up.
+    @param memory: size of the address space of the process, in bytes.
+
+    CPU time and memory limits are set as resource limits of the
+    process, which are not available on Windows. Where `prlimit` is
+    available, as on Linux, they are set right after the program has
+    started, so it runs without them for a short time. Exceeding the
+    memory limit makes allocations fail, so it is recognized by the
+    program reporting an out of memory error or exiting with `ENOMEM`.
+    Other crashes, like segmentation faults, are reported as ordinary
+    failures.
+
+    The same object can be used for many runs, from any thread. It
+    counts the runs in `runs` and the times each limit was exceeded in
+    `exceeded`, a `collections.Counter`, which can be exported as
+    metrics.
+    """
+
+    def __init__(
+        self,
+        timeout: float | None = None,
+        cpu_time: float | None = None,
+        memory: int | None = None,
+    ) -> None:
+        if sys.platform == "win32" and (
+            cpu_time is not None or memory is not None
+        ):
+            raise pydot.Error(
+                "CPU time and memory limits are not supported on Windows."
+            )
+
+        self.timeout = timeout
+        self.cpu_time = cpu_time
+        self.memory = memory
+
+        self.runs = 0
+        self.exceeded: collections.Counter[str] = collections.Counter()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"RenderLimits(timeout={self.timeout!r}, "
+            f"cpu_time={self.cpu_time!r}, memory={self.memory!r})"
+        )
+
+    def _rlimits(self) -> list[tuple[int, tuple[int, int]]]:
+        """Get the resource limits to set on the process."""
+        rlimits = []
+        if sys.platform != "win32":
+            import resource
+
+            if self.cpu_time is not None:
+                # SIGXCPU is sent at the soft limit, SIGKILL at the hard
+                cpu = math.ceil(self.cpu_time)
+                rlimits.append((resource.RLIMIT_CPU, (cpu, cpu + 1)))
+            if self.memory is not None:
+                memory = (self.memory, self.memory)
+                rlimits.append((resource.RLIMIT_AS, memory))
+        return rlimits
+
+    def _prepare(self, kwargs: dict[str, Any]) -> None:
+        """Add the process options applying the limits to `kwargs`."""
+        with self._lock:
+            self.runs += 1
+
+        rlimits = self._rlimits()
+        if sys.platform == "win32" or not rlimits:
+            return
+
+        import resource
+
+        if not hasattr(resource, "prlimit"):
+            # `prlimit` can't set the limits of another process, so they
+            # have to be set by the child before running the program.
+            def preexec_fn() -> None:
+                for which, value in rlimits:
+                    resource.setrlimit(which, value)
+
+            kwargs.update(preexec_fn=preexec_fn)
+
+    def _apply(self, pid: int) -> None:
+        """Set the resource limits of a process that was just started."""
+        if sys.platform == "win32":
+            return
+
+        import resource
+
+        if hasattr(resource, "prlimit"):
+            # Unlike `preexec_fn`, this is safe to use in threads.
+            for which, value in self._rlimits():
+                with contextlib.suppress(ProcessLookupError):
+                    resource.prlimit(pid, which, value)
+
+    def _exceeded(self, program: str, limit: str) -> NoReturn:
+        with self._lock:
+            self.exceeded[limit] += 1
+        value = getattr(self, limit)
+        _logger.warning("%s exceeded its %s limit (%s)", program, limit, value)
+        raise pydot.GraphvizLimitError(
+            f'"{program}" exceeded its {limit} limit ({value}).',
+            program=program,
+            limit=limit,
+        )
+
+    def _check(
+        self, program: str, returncode: int | None, stderr_data: bytes
+    ) -> None:
+        """Raise `GraphvizLimitError` if a run failed due to a limit."""
+        if not returncode:
+            return
+        if sys.platform == "win32":
+            return
+
+        import signal
+
+        if self.cpu_time is not None and returncode in (
+            -signal.SIGXCPU,
+            -signal.SIGKILL,
+        ):
+            self._exceeded(program, "cpu_time")
+        if self.memory is not None and (
+            returncode == errno.ENOMEM
+            or any(
+                message in stderr_data.lower()
+                for message in _OUT_OF_MEMORY_MESSAGES
+            )
+        ):
+            self._exceeded(program, "memory")
+
+
+# Reported by Graphviz, the C library and the C++ runtime when they fail
+# to allocate memory.
+_OUT_OF_MEMORY_MESSAGES: Final = (
+    b"out of memory",
+    b"cannot allocate memory",
+    b"bad_alloc",
+)
+
+
+def _graphviz_command(
+    program: str, arguments: list[str], kwargs: dict[str, Any]
+) -> tuple[list[str], dict[str, str]]:
+    """Build the command line and environment to run a Graphviz program.
+
+    Platform specific process options are added to `kwargs`. If the
+    program can't be found, `FileNotFoundError` is raised.
+    """
+    graphviz = get_graphviz()
+    path = graphviz.which(program)
+    if path is None:
+        raise FileNotFoundError(
+            errno.ENOENT, os.strerror(errno.ENOENT), program
+        )
+
+    if arguments is None:
+        arguments = []
+
+    if "creationflags" not in kwargs and hasattr(
+        subprocess, "CREATE_NO_WINDOW"
+    ):
+        # Only on Windows OS:
+        # specify that the new process shall not create a new window
+        kwargs.update(creationflags=subprocess.CREATE_NO_WINDOW)
+
+    return [path] + arguments, graphviz.env
+
+
 def make_quoted(s: str) -> str:
     """Transform a string into a quoted string, escaping specials."""
     replace = {
@@ -441,13 +839,30 @@ def graph_from_dot_file(
 
 
 def graph_from_edges(
-    edge_list: Sequence[Any], node_prefix: str = "", directed: bool = False
+    edge_list: Any,
+    node_prefix: str = "",
+    directed: bool = False,
+    source: str | None = None,
+    destination: str | None = None,
+    attributes: Mapping[str, str] | Sequence[str] | None = None,
 ) -> Dot:
     """Creates a basic graph out of an edge list.
 
-    The edge list has to be a list of tuples representing
-    the nodes connected by the edge.
+    The edge list can be an iterable of tuples representing the nodes
+    connected by the edge, optionally followed by a dictionary of
+    attributes for the edge:
+
+        [("a", "b"), ("b", "c", {"color": "red"})]
+
     The values can be anything: bool, int, float, str.
+
+    It can also be a table with a column per edge property: a NumPy
+    structured array, a pandas DataFrame or an Arrow table. The nodes
+    are taken from the `source` and `destination` columns, by default
+    the first two. The `attributes` columns become edge attributes,
+    given either as a list of column names or as a mapping from column
+    names to attribute names, for example `{"weight": "penwidth"}`.
+    Missing values (None or NaN) are left out.
     """
 
     if directed:
@@ -456,34 +871,109 @@ def graph_from_edges(
     else:
         graph = Dot(graph_type="graph")
 
-    for edge in edge_list:
-        if isinstance(edge[0], str):
-            src = node_prefix + edge[0]
-        else:
-            src = node_prefix + str(edge[0])
-
-        if isinstance(edge[1], str):
-            dst = node_prefix + edge[1]
-        else:
-            dst = node_prefix + str(edge[1])
+    columns = _table_columns(edge_list)
+    if columns is None:
+        if hasattr(edge_list, "tolist"):
+            # A 2-column array, converted to Python objects at once
+            edge_list = edge_list.tolist()
+        obj_dicts = [
+            _new_edge_obj_dict(
+                (f"{node_prefix}{edge[0]}", f"{node_prefix}{edge[1]}"),
+                dict(edge[2])
+                if len(edge) > 2 and isinstance(edge[2], Mapping)
+                else {},
+            )
+            for edge in edge_list
+        ]
+    else:
+        if source is None:
+            source = columns[0]
+        if destination is None:
+            destination = columns[1]
+        if attributes is None:
+            attributes = {}
+        elif not isinstance(attributes, Mapping):
+            attributes = {name: name for name in attributes}
+
+        srcs = _table_column(edge_list, source)
+        dsts = _table_column(edge_list, destination)
+        obj_dicts = [
+            _new_edge_obj_dict(
+                (f"{node_prefix}{src}", f"{node_prefix}{dst}"), {}
+            )
+            for src, dst in zip(srcs, dsts)
+        ]
+        for column, attribute in attributes.items():
+            values = _table_column(edge_list, column)
+            for obj_dict, value in zip(obj_dicts, values):
+                if not _is_missing(value):
+                    obj_dict["attributes"][attribute] = value
 
-        e = Edge(src, dst)
-        graph.add_edge(e)
+    graph._add_edge_obj_dicts(obj_dicts)
 
     return graph
 
 
+def _is_missing(value: Any) -> bool:
+    """Check if a table value is missing: None, NaN or `pandas.NA`."""
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return math.isnan(value)
+    pandas = sys.modules.get("pandas")
+    if pandas is None:
+        return False
+    try:
+        return bool(pandas.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _table_columns(table: Any) -> list[str] | None:
+    """Get the column names of a table, or None if it isn't one.
+
+    Supports NumPy structured arrays, pandas DataFrames and Arrow
+    tables.
+    """
+    dtype = getattr(table, "dtype", None)
+    if dtype is not None:
+        names = getattr(dtype, "names", None)
+        return list(names) if names else None
+    if hasattr(table, "column_names"):
+        return list(table.column_names)
+    if hasattr(table, "columns") and hasattr(table, "iloc"):
+        return list(table.columns)
+    return None
+
+
+def _table_column(table: Any, name: str) -> list[Any]:
+    """Get the values of a column of a table, as Python objects."""
+    column = table[name]
+    if hasattr(column, "to_pylist"):
+        return column.to_pylist()  # type: ignore[no-any-return]
+    return column.tolist()  # type: ignore[no-any-return]
+
+
 def graph_from_adjacency_matrix(
-    matrix: Sequence[Sequence[Any]],
+    matrix: Any,
     node_prefix: str = "",
     directed: bool = False,
+    weight_attribute: str | None = None,
 ) -> Dot:
     """Creates a basic graph out of an adjacency matrix.
 
-    The matrix has to be a list of rows of values
-    representing an adjacency matrix.
+    The matrix can be a list of rows of values representing an
+    adjacency matrix, a NumPy array (or anything convertible to one) or
+    a SciPy sparse matrix or array. Only the nonzero entries of arrays
+    and sparse matrices are visited.
     The values can be anything: bool, int, float, as long
     as they can evaluate to True or False.
+
+    Nodes are named after their 1-based position in the matrix,
+    prefixed with `node_prefix`. For undirected graphs, only the upper
+    triangle of the matrix is used. If `weight_attribute` is given,
+    each edge gets the value of its entry as that attribute, for
+    example `"weight"` or `"penwidth"`.
     """
 
     if directed:
@@ -491,41 +981,127 @@ def graph_from_adjacency_matrix(
     else:
         graph = Dot(graph_type="graph")
 
-    for row_index, row in enumerate(matrix):
-        if not directed:
-            # An undirected edge is represented once in the upper triangle.
-            skip = row_index
-            edge_values = row[skip:]
-        else:
-            skip = 0
-            edge_values = row
-
-        # Node IDs use 1-based matrix positions.
-        source_node = row_index + 1
-        node_dest = skip + 1
-
-        for edge_value in edge_values:
-            if edge_value:
-                graph.add_edge(
-                    Edge(
-                        f"{node_prefix}{source_node}",
-                        f"{node_prefix}{node_dest}",
-                    )
-                )
-            node_dest += 1
+    entries = _nonzero_entries(matrix, upper=not directed)
+    if entries is None:
+        entries = _nonzero_list_entries(matrix, upper=not directed)
+    rows, cols, values = entries
+
+    # Node IDs use 1-based matrix positions.
+    size = max(max(rows, default=-1), max(cols, default=-1)) + 1
+    names = [f"{node_prefix}{i}" for i in range(1, size + 1)]
+
+    if weight_attribute is None:
+        obj_dicts = [
+            _new_edge_obj_dict((names[r], names[c]), {})
+            for r, c in zip(rows, cols)
+        ]
+    else:
+        obj_dicts = [
+            _new_edge_obj_dict((names[r], names[c]), {weight_attribute: v})
+            for r, c, v in zip(rows, cols, values)
+        ]
+    graph._add_edge_obj_dicts(obj_dicts)
 
     return graph
 
 
+def _new_node_obj_dict(name: str, attributes: AttributeDict) -> AttributeDict:
+    """Build the obj_dict of a node, as `Node` would."""
+    return {
+        "attributes": attributes,
+        "type": "node",
+        "parent_graph": None,
+        "sequence": None,
+        "name": name,
+        "port": None,
+    }
+
+
+def _new_edge_obj_dict(
+    points: tuple[EdgeEndpoint, EdgeEndpoint], attributes: AttributeDict
+) -> AttributeDict:
+    """Build the obj_dict of an edge, as `Edge` would."""
+    return {
+        "points": points,
+        "attributes": attributes,
+        "type": "edge",
+        "parent_graph": None,
+        "sequence": None,
+    }
+
+
+def _nonzero_entries(
+    matrix: Any, upper: bool = False
+) -> tuple[list[int], list[int], list[Any]] | None:
+    """Find the nonzero entries of an array or sparse matrix.
+
+    Returns the row and column indices and the values of the entries, in
+    row-major order, or None if `matrix` is neither. If `upper` is true,
+    only entries in the upper triangle, diagonal included, are returned.
+    """
+    if hasattr(matrix, "tocoo"):
+        # SciPy sparse matrices and arrays
+        import numpy as np
+
+        # Duplicate entries add up, and may cancel each other out.
+        coo = matrix.tocoo(copy=True)
+        coo.sum_duplicates()
+        rows, cols, data = coo.row, coo.col, coo.data
+        # Explicitly stored zeros aren't edges.
+        keep = data.astype(bool)
+        if upper:
+            keep &= cols >= rows
+        rows, cols, data = rows[keep], cols[keep], data[keep]
+        order = np.lexsort((cols, rows))
+        return (
+            rows[order].tolist(),
+            cols[order].tolist(),
+            data[order].tolist(),
+        )
+
+    if not hasattr(matrix, "__array__"):
+        return None
+
+    import numpy as np
+
+    array = np.asarray(matrix)
+    rows, cols = np.nonzero(array)
+    if upper:
+        keep = cols >= rows
+        rows, cols = rows[keep], cols[keep]
+    return rows.tolist(), cols.tolist(), array[rows, cols].tolist()
+
+
+def _nonzero_list_entries(
+    matrix: Sequence[Sequence[Any]], upper: bool = False
+) -> tuple[list[int], list[int], list[Any]]:
+    """Find the nonzero entries of a matrix given as a list of rows.
+
+    Like `_nonzero_entries`, but any values evaluating to True count.
+    """
+    rows, cols, values = [], [], []
+    for row_index, row in enumerate(matrix):
+        # An undirected edge is represented once in the upper triangle.
+        skip = row_index if upper else 0
+        for col_index, value in enumerate(row[skip:], skip):
+            if value:
+                rows.append(row_index)
+                cols.append(col_index)
+                values.append(value)
+    return rows, cols, values
+
+
 def graph_from_incidence_matrix(
-    matrix: Sequence[Sequence[Any]],
+    matrix: Any,
     node_prefix: str = "",
     directed: bool = False,
 ) -> Dot:
     """Creates a basic graph out of an incidence matrix.
 
-    The matrix has to be a list of rows of values
-    representing an incidence matrix.
+    The matrix can be a list of rows of values representing an
+    incidence matrix, a NumPy array (or anything convertible to one) or
+    a SciPy sparse matrix or array. Arrays and sparse matrices are
+    processed in bulk, visiting only their nonzero entries.
     The values can be anything: bool, int, float, as long
     as they can evaluate to True or False.
     """
@@ -535,23 +1111,21 @@ def graph_from_incidence_matrix(
     else:
         graph = Dot(graph_type="graph")
 
-    for row in matrix:
-        nodes = []
-        c = 1
-
-        for node in row:
-            if node:
-                nodes.append(c * node)
-            c += 1
-            nodes.sort()
-
-        if len(nodes) == 2:
-            graph.add_edge(
-                Edge(
-                    f"{node_prefix}{abs(nodes[0])}",
-                    f"{node_prefix}{nodes[1]}",
-                )
-            )
+    pairs = _incidence_pairs(matrix)
+    if pairs is None:
+        pairs = []
+        for row in matrix:
+            nodes = [c * node for c, node in enumerate(row, 1) if node]
+            if len(nodes) == 2:
+                nodes.sort()
+                pairs.append((nodes[0], nodes[1]))
+
+    graph._add_edge_obj_dicts(
+        _new_edge_obj_dict(
+            (f"{node_prefix}{abs(src)}", f"{node_prefix}{dst}"), {}
+        )
+        for src, dst in pairs
+    )
 
     if not directed:
         graph.set_simplify(True)
@@ -559,6 +1133,284 @@ def graph_from_incidence_matrix(
     return graph
 
 
+_gc_pause_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextlib.contextmanager
+def gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector during bulk operations.
+
+    Building or converting large graphs allocates millions of containers
+    that all survive, and the collections they trigger only scan them
+    over and over. Wrapping such operations, like `from_networkx()`,
+    `Graph.to_networkx()` or `load_binary()`, in this context manager can
+    make them several times faster:
+
+        with pydot.gc_paused():
+            graph = pydot.from_networkx(nx_graph)
+
+    The collector is paused for the whole process. Nested and concurrent
+    uses are counted: it is only enabled again when the last of them
+    ends, and only if it was enabled when the first began.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_pause_lock:
+        if not _gc_pauses:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_pause_lock:
+            _gc_pauses -= 1
+            if not _gc_pauses and _gc_was_enabled:
+                gc.enable()
+
+
+def from_networkx(nx_graph: Any) -> Dot:
+    """Creates a graph out of a NetworkX graph.
+
+    Directed graphs become digraphs. Graphs that are neither
+    multigraphs nor have self-loops become strict graphs, as with
+    `networkx.drawing.nx_pydot.to_pydot`. Nodes are named after their
+    string representation, quoted if needed, and both nodes and edges
+    keep their attributes.
+
+    The `name` of the NetworkX graph, and its `graph`, `node` and `edge`
+    graph attributes, set the name of the graph, its attributes and its
+    default node and edge attributes. Subgraphs described by the
+    `subgraphs` graph attribute, as set by `Graph.to_networkx`, are
+    recreated, along with the nodes and edges declared in them.
+    """
+    import networkx as nx
+
+    strict = not nx_graph.is_multigraph() and not any(
+        True for _ in nx.selfloop_edges(nx_graph)
+    )
+    graph = _new_converted_graph(
+        nx_graph.graph, nx_graph.is_directed(), strict
+    )
+
+    if nx_graph.is_multigraph():
+        edge_list = list(nx_graph.edges(keys=True, data=True))
+        edges = [(u, v, attrs) for u, v, _, attrs in edge_list]
+    else:
+        edge_list = edges = list(nx_graph.edges(data=True))
+
+    subgraphs = nx_graph.graph.get("subgraphs", [])
+    if subgraphs:
+        # Subgraphs list edges as in `edge_list`, without their data.
+        edge_ids = [edge[:-1] for edge in edge_list]
+        positions = {edge_id: i for i, edge_id in enumerate(edge_ids)}
+        if not nx_graph.is_directed():
+            # Undirected edges may be listed either way round.
+            for i, edge_id in enumerate(edge_ids):
+                positions.setdefault((edge_id[1], edge_id[0], *edge_id[2:]), i)
+        subgraphs = [
+            {
+                **entry,
+                "edges": [
+                    positions[tuple(edge_id)]
+                    for edge_id in entry.get("edges", [])
+                    if tuple(edge_id) in positions
+                ],
+            }
+            for entry in subgraphs
+        ]
+
+    _add_converted_elements(graph, nx_graph.nodes, edges, subgraphs)
+    return graph
+
+
+def from_igraph(ig_graph: Any) -> Dot:
+    """Creates a graph out of an igraph graph.
+
+    Nodes are named after the `name` vertex attribute if there is one,
+    and after the vertex IDs otherwise. The other vertex and edge
+    attributes become node and edge attributes, None values being left
+    out. Graph attributes are used as by `from_networkx`, the edges of
+    subgraphs being given by their edge IDs; the graph is strict if
+    its `strict` graph attribute is set.
+    """
+    graph_attributes = {key: ig_graph[key] for key in ig_graph.attributes()}
+    graph = _new_converted_graph(
+        graph_attributes,
+        ig_graph.is_directed(),
+        bool(graph_attributes.get("strict")),
+    )
+
+    vertex_attributes = ig_graph.vs.attributes()
+    if "name" in vertex_attributes:
+        names = ig_graph.vs["name"]
+    else:
+        names = list(range(ig_graph.vcount()))
+    nodes = _attribute_rows(ig_graph.vs, names, vertex_attributes)
+
+    edge_attributes = _attribute_rows(
+        ig_graph.es, range(ig_graph.ecount()), ig_graph.es.attributes()
+    )
+    edges = [
+        (names[u], names[v], edge_attributes[i])
+        for i, (u, v) in enumerate(ig_graph.get_edgelist())
+    ]
+
+    _add_converted_elements(
+        graph, nodes, edges, graph_attributes.get("subgraphs", [])
+    )
+    return graph
+
+
+def _attribute_rows(
+    sequence: Any, keys: Iterable[Any], attributes: Iterable[str]
+) -> dict[Any, AttributeDict]:
+    """Turn igraph attribute columns into a dictionary per element."""
+    rows: dict[Any, AttributeDict] = {key: {} for key in keys}
+    for attribute in attributes:
+        if attribute == "name":
+            continue
+        for row, value in zip(rows.values(), sequence[attribute]):
+            if value is not None:
+                row[attribute] = value
+    return rows
+
+
+def _new_converted_graph(
+    graph_attributes: Mapping[str, Any], directed: bool, strict: bool
+) -> Dot:
+    """Create the graph converted from another library."""
+    graph = Dot(
+        graph_name=graph_attributes.get("name") or "G",
+        graph_type="digraph" if directed else "graph",
+        strict=strict,
+        **graph_attributes.get("graph", {}),
+    )
+    _set_converted_defaults(graph, graph_attributes)
+    return graph
+
+
+def _set_converted_defaults(
+    graph: Graph, graph_attributes: Mapping[str, Any]
+) -> None:
+    if graph_attributes.get("node"):
+        graph.set_node_defaults(**graph_attributes["node"])
+    if graph_attributes.get("edge"):
+        graph.set_edge_defaults(**graph_attributes["edge"])
+
+
+def _add_converted_elements(
+    graph: Dot,
+    nodes: Mapping[Any, AttributeDict],
+    edges: Sequence[tuple[Any, Any, AttributeDict]],
+    subgraphs: Sequence[Mapping[str, Any]],
+) -> None:
+    """Add the elements converted from another library, in bulk.
+
+    Nodes are given by key, with their attributes, and edges as
+    `(source key, destination key, attributes)` tuples. Subgraphs are
+    described as by `Graph.to_networkx`, with their edges given by
+    position in `edges`. Nodes are declared with their attributes in
+    the first subgraph listing them, or else in `graph`.
+    """
+    names = {key: _converted_id(key) for key in nodes}
+
+    # One list of elements per subgraph, followed by one for `graph`.
+    node_obj_dicts: list[list[AttributeDict]] = [[] for _ in subgraphs]
+    declared: set[Any] = set()
+    for position, entry in enumerate(subgraphs):
+        for key in entry.get("nodes", []):
+            name = names.get(key)
+            if name is None:
+                name = names[key] = _converted_id(key)
+            attributes = {} if key in declared else dict(nodes.get(key, {}))
+            declared.add(key)
+            node_obj_dicts[position].append(
+                _new_node_obj_dict(name, attributes)
+            )
+    node_obj_dicts.append(
+        [
+            _new_node_obj_dict(names[key], dict(attributes))
+            for key, attributes in nodes.items()
+            if key not in declared
+        ]
+    )
+
+    placed: dict[int, int] = {}
+    for position, entry in enumerate(subgraphs):
+        for i in entry.get("edges", []):
+            placed.setdefault(i, position)
+    edge_obj_dicts: list[list[AttributeDict]] = [[] for _ in node_obj_dicts]
+    for i, (src, dst, attributes) in enumerate(edges):
+        edge_obj_dicts[placed.get(i, -1)].append(
+            _new_edge_obj_dict((names[src], names[dst]), dict(attributes))
+        )
+
+    # Subgraphs are added empty, so that adding them doesn't have to
+    # update their elements.
+    graph._add_node_obj_dicts(node_obj_dicts[-1])
+    sgraphs: list[Graph] = []
+    for entry, node_list, edge_list in zip(
+        subgraphs, node_obj_dicts, edge_obj_dicts
+    ):
+        sgraph = Subgraph(entry.get("name", ""), **entry.get("graph", {}))
+        parent = entry.get("parent")
+        (graph if parent is None else sgraphs[parent]).add_subgraph(sgraph)
+        _set_converted_defaults(sgraph, entry)
+        sgraph._add_node_obj_dicts(node_list)
+        sgraph._add_edge_obj_dicts(edge_list)
+        sgraphs.append(sgraph)
+    graph._add_edge_obj_dicts(edge_obj_dicts[-1])
+
+
+def _converted_id(key: Any) -> str:
+    """Name a node converted from another library, quoted if needed."""
+    name = str(key)
+    if ":" in name:
+        # Would otherwise be taken for a port.
+        return make_quoted(name)
+    return quote_id_if_necessary(name)
+
+
+def _incidence_pairs(matrix: Any) -> list[tuple[Any, Any]] | None:
+    """Find the edges of an incidence matrix given as an array.
+
+    Each row with exactly two nonzero entries is an edge. Both entries
+    are multiplied by their 1-based column position and returned in
+    ascending order. Returns None if `matrix` isn't an array or a
+    sparse matrix.
+    """
+    if hasattr(matrix, "tocoo"):
+        import numpy as np
+
+        # Duplicate entries add up, and may cancel each other out.
+        coo = matrix.tocoo(copy=True)
+        coo.sum_duplicates()
+        keep = coo.data.astype(bool)
+        rows, cols, data = coo.row[keep], coo.col[keep], coo.data[keep]
+        order = np.lexsort((cols, rows))
+        rows, cols, data = rows[order], cols[order], data[order]
+        counts = np.bincount(rows, minlength=coo.shape[0])
+        selected = counts[rows] == 2
+        cols, data = cols[selected], data[selected]
+    elif hasattr(matrix, "__array__"):
+        import numpy as np
+
+        array = np.asarray(matrix)
+        nonzero = array.astype(bool)
+        edge_rows = np.flatnonzero(nonzero.sum(axis=1) == 2)
+        rows, cols = np.nonzero(nonzero[edge_rows])
+        data = array[edge_rows[rows], cols]
+    else:
+        return None
+
+    # Consecutive entries are the two ends of an edge.
+    nodes = ((cols + 1) * data).reshape(-1, 2)
+    nodes.sort(axis=1)
+    return [(src, dst) for src, dst in nodes.tolist()]
+
+
 class Common:
     """Common information to several classes.
 
@@ -609,7 +1461,7 @@ class Common:
 
         which are defined for standard graphviz attributes.
         """
-        self.obj_dict["attributes"][name] = value
+        self._mutable_attributes()[name] = value
 
     def get(self, name: str) -> Any:
         """Get an attribute value by name.
@@ -624,9 +1476,20 @@ class Common:
         return self.obj_dict["attributes"].get(name, None)
 
     def get_attributes(self) -> AttributeDict:
-        """Get attributes of the object"""
+        """Get attributes of the object.
+
+        If the attributes are shared with other elements, see
+        `Graph.intern_attributes`, the returned dictionary is read-only.
+        """
         return cast(AttributeDict, self.obj_dict.get("attributes", {}))
 
+    def _mutable_attributes(self) -> AttributeDict:
+        """Get the attributes for modification, unsharing them if needed."""
+        attrs = self.obj_dict["attributes"]
+        if isinstance(attrs, SharedAttributes):
+            attrs = self.obj_dict["attributes"] = dict(attrs)
+        return cast(AttributeDict, attrs)
+
     def set_sequence(self, seq: int) -> None:
         """Set sequence"""
         self.obj_dict["sequence"] = seq
@@ -668,10 +1531,19 @@ class Common:
 
         The `prefix` string will be prepended if and only if some
         output is generated."""
-        attrs = self.formatted_attr_list()
-        if not attrs:
+        shared = self.obj_dict["attributes"]
+        if isinstance(shared, SharedAttributes):
+            # Immutable, so it only ever has to be formatted once for
+            # each type of element
+            joined = shared._formatted.get(type(self))
+            if joined is None:
+                joined = ", ".join(self.formatted_attr_list())
+                shared._formatted[type(self)] = joined
+        else:
+            joined = ", ".join(self.formatted_attr_list())
+        if not joined:
             return ""
-        return f"{prefix}[{', '.join(attrs)}]"
+        return f"{prefix}[{joined}]"
 
 
 class Node(Common):
@@ -739,7 +1611,7 @@ class Node(Common):
             styles = styles.split(",")
             styles.append(style)
 
-        self.obj_dict["attributes"]["style"] = ",".join(styles)
+        self._mutable_attributes()["style"] = ",".join(styles)
 
     def to_string(self, indent: Any = "", indent_level: int = 1) -> str:
         """Return string representation of node in DOT language."""
@@ -958,43 +1830,237 @@ class Edge(Common):
 __generate_attribute_methods(Edge, EDGE_ATTRIBUTES)
 
 
-class Graph(Common):
-    """Class representing a graph in Graphviz's dot language.
+class _HierarchyIndex:
+    """Maps names of elements to the graphs containing them.
 
-    This class implements the methods to work on a representation
-    of a graph in Graphviz's dot language.
+    Covers a whole graph hierarchy, see `Dot.find_node`. The tables map
+    node names and edge points to the obj_dicts of the graphs in which
+    they are stored.
+    """
 
-    graph(  graph_name='G', graph_type='digraph',
-        strict=False, suppress_disconnected=False, attribute=value, ...)
+    def __init__(self, graph_obj_dict: AttributeDict) -> None:
+        self.nodes: dict[Any, list[AttributeDict]] = {}
+        self.edges: dict[Any, list[AttributeDict]] = {}
+        self.add_graph(graph_obj_dict)
 
-    graph_name:
-        the graph's name
-    graph_type:
-        can be 'graph' or 'digraph'
-    suppress_disconnected:
-        if True, remove disconnected nodes from the graph.
-    simplify:
-        if True it will avoid displaying equal edges, i.e.
-        only one edge between two nodes, removing the
-        duplicated ones.
+    @staticmethod
+    def add(
+        table: dict[Any, list[AttributeDict]],
+        key: Any,
+        graph_obj_dict: AttributeDict,
+    ) -> None:
+        graphs = table.setdefault(key, [])
+        if not any(g is graph_obj_dict for g in graphs):
+            graphs.append(graph_obj_dict)
 
-    All the attributes defined in the Graphviz dot language should
-    be supported.
+    @staticmethod
+    def discard(
+        table: dict[Any, list[AttributeDict]],
+        key: Any,
+        graph_obj_dict: AttributeDict,
+    ) -> None:
+        graphs = [g for g in table.get(key, []) if g is not graph_obj_dict]
+        if graphs:
+            table[key] = graphs
+        else:
+            table.pop(key, None)
 
-    Attributes can be set through the dynamically generated methods:
+    def add_graph(self, graph_obj_dict: AttributeDict) -> None:
+        """Add a graph and all its subgraphs to the index."""
+        for name in graph_obj_dict.get("nodes", {}):
+            self.add(self.nodes, name, graph_obj_dict)
+        for points in graph_obj_dict.get("edges", {}):
+            self.add(self.edges, points, graph_obj_dict)
+        for sgraphs in graph_obj_dict.get("subgraphs", {}).values():
+            for sgraph in sgraphs:
+                self.add_graph(sgraph)
 
-     set_[attribute name], i.e. set_size, set_fontname
 
-    or using the instance's attributes:
+_E = TypeVar("_E", bound=Common)
 
-     Graph.obj_dict['attributes'][attribute name], i.e.
 
-        graph_instance.obj_dict['attributes']['label']
-        graph_instance.obj_dict['attributes']['fontname']
+class ElementView(Generic[_E]):
+    """Live, read-only view of one kind of element in a graph.
+
+    Views are returned by the `Graph.nodes`, `Graph.edges` and
+    `Graph.subgraphs` properties. They always reflect the current
+    contents of the graph, and unlike the `get_*_list()` methods they
+    don't build a list of wrapper objects each time they are used.
+
+    Wrapper objects are created on demand during iteration and are
+    cached by the view, so iterating over the same graph repeatedly
+    hands out the same wrapper instances.
     """
 
-    def __init__(
-        self,
+    _store_key: ClassVar[str]
+    _wrapper_class: ClassVar[Callable[..., Any]]
+
+    def __init__(self, graph: Graph) -> None:
+        self._graph = graph
+        self._wrappers: dict[int, _E] = {}
+
+    @property
+    def _store(self) -> dict[Any, list[AttributeDict]]:
+        return cast(
+            "dict[Any, list[AttributeDict]]",
+            self._graph.obj_dict[self._store_key],
+        )
+
+    def _wrap(self, obj_dict: AttributeDict) -> _E:
+        wrapper = self._wrappers.get(id(obj_dict))
+        if wrapper is None or wrapper.obj_dict is not obj_dict:
+            wrapper = cast(_E, self._wrapper_class(obj_dict=obj_dict))
+            self._wrappers[id(obj_dict)] = wrapper
+        return wrapper
+
+    def _obj_dicts(self) -> Iterator[AttributeDict]:
+        # Snapshot the buckets, so that the graph can be modified
+        # while iterating over one of its views.
+        for obj_dicts in list(self._store.values()):
+            yield from obj_dicts
+
+    def _key_of(self, item: Any) -> Any:
+        if isinstance(item, Common):
+            return item.get_name()  # type: ignore[attr-defined]
+        return item
+
+    def _bucket(self, key: Any) -> list[AttributeDict]:
+        try:
+            return self._store.get(key, [])
+        except TypeError:
+            # Unhashable keys can't be in the graph
+            return []
+
+    def __len__(self) -> int:
+        return sum(map(len, self._store.values()))
+
+    def __bool__(self) -> bool:
+        return any(self._store.values())
+
+    def __iter__(self) -> Iterator[_E]:
+        if len(self._wrappers) > 2 * len(self) + 16:
+            # Drop wrappers of elements that are gone from the graph
+            self._wrappers.clear()
+        return map(self._wrap, self._obj_dicts())
+
+    def __contains__(self, item: object) -> bool:
+        bucket = self._bucket(self._key_of(item))
+        if isinstance(item, Common):
+            return any(obj is item.obj_dict for obj in bucket)
+        return bool(bucket)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self.keys())!r})"
+
+    def keys(self) -> KeysView[Any]:
+        """Return a live view of the keys the elements are stored under."""
+        return self._store.keys()
+
+    def filter(
+        self, predicate: Callable[[_E], bool] | None = None, **attrs: Any
+    ) -> Iterator[_E]:
+        """Iterate over the elements matching all the given criteria.
+
+        Keyword arguments select elements by attribute value, e.g.
+        `graph.nodes.filter(shape="box")`. Those are checked before any
+        wrapper object is created. If `predicate` is given, it is called
+        with each remaining element and has to return a true value for
+        the element to be included.
+        """
+        for obj_dict in self._obj_dicts():
+            obj_attrs = obj_dict.get("attributes", {})
+            if any(obj_attrs.get(k) != v for k, v in attrs.items()):
+                continue
+            element = self._wrap(obj_dict)
+            if predicate is None or predicate(element):
+                yield element
+
+
+class NodeView(ElementView[Node]):
+    """Live view of the nodes of a graph, see `ElementView`.
+
+    Membership can be tested with a node name or a `Node`.
+    """
+
+    _store_key = "nodes"
+    _wrapper_class = Node
+
+
+class EdgeView(ElementView[Edge]):
+    """Live view of the edges of a graph, see `ElementView`.
+
+    Membership can be tested with a `(source, destination)` tuple or an
+    `Edge`.
+    """
+
+    _store_key = "edges"
+    _wrapper_class = Edge
+
+    def _key_of(self, item: Any) -> Any:
+        if isinstance(item, Edge):
+            return (item.get_source(), item.get_destination())
+        if isinstance(item, list):
+            return tuple(item)
+        return item
+
+    def _bucket(self, key: Any) -> list[AttributeDict]:
+        if not (isinstance(key, tuple) and len(key) == 2):
+            return []
+        bucket = super()._bucket
+        keys = self._graph._edge_keys(*key)
+        return [obj for k in keys for obj in bucket(k)]
+
+
+class SubgraphView(ElementView["Subgraph"]):
+    """Live view of the subgraphs of a graph, see `ElementView`.
+
+    Membership can be tested with a subgraph name or a `Subgraph`.
+    """
+
+    _store_key = "subgraphs"
+
+    @staticmethod
+    def _wrapper_class(obj_dict: AttributeDict) -> Subgraph:
+        return Subgraph(obj_dict=obj_dict)
+
+
+class Graph(Common):
+    """Class representing a graph in Graphviz's dot language.
+
+    This class implements the methods to work on a representation
+    of a graph in Graphviz's dot language.
+
+    graph(  graph_name='G', graph_type='digraph',
+        strict=False, suppress_disconnected=False, attribute=value, ...)
+
+    graph_name:
+        the graph's name
+    graph_type:
+        can be 'graph' or 'digraph'
+    suppress_disconnected:
+        if True, remove disconnected nodes from the graph.
+    simplify:
+        if True it will avoid displaying equal edges, i.e.
+        only one edge between two nodes, removing the
+        duplicated ones.
+
+    All the attributes defined in the Graphviz dot language should
+    be supported.
+
+    Attributes can be set through the dynamically generated methods:
+
+     set_[attribute name], i.e. set_size, set_fontname
+
+    or using the instance's attributes:
+
+     Graph.obj_dict['attributes'][attribute name], i.e.
+
+        graph_instance.obj_dict['attributes']['label']
+        graph_instance.obj_dict['attributes']['fontname']
+    """
+
+    def __init__(
+        self,
         graph_name: str = "G",
         obj_dict: AttributeDict | None = None,
         graph_type: str = "digraph",
@@ -1030,6 +2096,9 @@ class Graph(Common):
 
             self.set_parent_graph(self)
 
+    # Built on the topmost graph by `Dot.find_node` and friends
+    _hierarchy_index: _HierarchyIndex | None = None
+
     def __eq__(self, other: object) -> bool:
         if isinstance(other, Graph):
             return self.obj_dict is other.obj_dict
@@ -1147,6 +2216,28 @@ class Graph(Common):
         self.obj_dict["current_child_sequence"] = seq + 1
         return seq
 
+    def _edge_keys(self, src: Any, dst: Any) -> list[tuple[Any, Any]]:
+        """Get the keys under which edges from src to dst can be stored.
+
+        Edges are stored under their `(source, destination)` points as
+        added. In undirected graphs an edge linking two nodes may have
+        been added in either direction, so both keys are returned.
+        """
+        if src == dst or self.get_top_graph_type() != "graph":
+            return [(src, dst)]
+        return [(src, dst), (dst, src)]
+
+    def _get_hierarchy_index(self) -> _HierarchyIndex | None:
+        """Get the index of the hierarchy, if one is being maintained."""
+        return getattr(self.get_parent_graph(), "_hierarchy_index", None)
+
+    def _unindex(self, store_key: str, key: Any) -> None:
+        """Remove key from the hierarchy index if it's gone from store."""
+        index = self._get_hierarchy_index()
+        if index is not None and not self.obj_dict[store_key].get(key):
+            table = index.nodes if store_key == "nodes" else index.edges
+            index.discard(table, key, self.obj_dict)
+
     def __enter__(self) -> Self:
         """Enter the runtime context for this graph.
 
@@ -1198,6 +2289,34 @@ class Graph(Common):
 
         graph_node.set_sequence(self.get_next_sequence_number())
 
+        index = self._get_hierarchy_index()
+        if index is not None:
+            index.add(index.nodes, graph_node.get_name(), self.obj_dict)
+
+    def _add_node_obj_dicts(self, obj_dicts: Iterable[AttributeDict]) -> None:
+        """Store nodes given as obj_dicts, in bulk."""
+        nodes = self.obj_dict["nodes"]
+        parent_graph = self.get_parent_graph()
+        index = self._get_hierarchy_index()
+        seq = self.obj_dict.get("current_child_sequence", 1)
+
+        for obj_dict in obj_dicts:
+            obj_dict["sequence"] = seq
+            obj_dict["parent_graph"] = parent_graph
+            seq += 1
+
+            name = obj_dict["name"]
+            node_list = nodes.get(name)
+            if node_list is None:
+                nodes[name] = [obj_dict]
+            else:
+                node_list.append(obj_dict)
+
+            if index is not None:
+                index.add(index.nodes, name, self.obj_dict)
+
+        self.obj_dict["current_child_sequence"] = seq
+
     def del_node(self, name: str | Node, index: int | None = None) -> bool:
         """Delete a node from the graph.
 
@@ -1221,10 +2340,10 @@ class Graph(Common):
         if name in self.obj_dict["nodes"]:
             if index is not None and index < len(self.obj_dict["nodes"][name]):
                 del self.obj_dict["nodes"][name][index]
-                return True
             else:
                 del self.obj_dict["nodes"][name]
-                return True
+            self._unindex("nodes", name)
+            return True
 
         return False
 
@@ -1268,6 +2387,21 @@ class Graph(Common):
 
         return node_objs
 
+    @functools.cached_property
+    def nodes(self) -> NodeView:
+        """Live view of the nodes in the graph.
+
+        Unlike `get_node_list()`, the view doesn't build a new list of
+        Node instances every time it is used. It supports `len()`,
+        iteration, membership tests by name or Node and filtering by
+        attribute values:
+
+            len(graph.nodes)
+            "a" in graph.nodes
+            boxes = list(graph.nodes.filter(shape="box"))
+        """
+        return NodeView(self)
+
     def add_edge(self, graph_edge: Edge) -> None:
         """Adds an edge object to the graph.
 
@@ -1291,6 +2425,50 @@ class Graph(Common):
         graph_edge.set_sequence(self.get_next_sequence_number())
         graph_edge.set_parent_graph(self.get_parent_graph())
 
+        index = self._get_hierarchy_index()
+        if index is not None:
+            index.add(index.edges, edge_points, self.obj_dict)
+
+    def add_edges(self, graph_edges: Iterable[Edge]) -> None:
+        """Adds several edge objects to the graph.
+
+        Equivalent to calling `add_edge` for each of them, but faster
+        for large numbers of edges.
+        """
+        obj_dicts = []
+        for graph_edge in graph_edges:
+            if not isinstance(graph_edge, Edge):
+                raise TypeError(
+                    "add_edges() received a non edge class object: "
+                    + str(graph_edge)
+                )
+            obj_dicts.append(graph_edge.obj_dict)
+        self._add_edge_obj_dicts(obj_dicts)
+
+    def _add_edge_obj_dicts(self, obj_dicts: Iterable[AttributeDict]) -> None:
+        """Store edges given as obj_dicts, in bulk."""
+        edges = self.obj_dict["edges"]
+        parent_graph = self.get_parent_graph()
+        index = self._get_hierarchy_index()
+        seq = self.obj_dict.get("current_child_sequence", 1)
+
+        for obj_dict in obj_dicts:
+            obj_dict["sequence"] = seq
+            obj_dict["parent_graph"] = parent_graph
+            seq += 1
+
+            edge_points = obj_dict["points"]
+            edge_list = edges.get(edge_points)
+            if edge_list is None:
+                edges[edge_points] = [obj_dict]
+            else:
+                edge_list.append(obj_dict)
+
+            if index is not None:
+                index.add(index.edges, edge_points, self.obj_dict)
+
+        self.obj_dict["current_child_sequence"] = seq
+
     def del_edge(
         self, src_or_list: Any, dst: Any = None, index: int | None = None
     ) -> bool:
@@ -1322,17 +2500,24 @@ class Graph(Common):
         if isinstance(dst, Node):
             dst = dst.get_name()
 
-        if (src, dst) in self.obj_dict["edges"]:
-            if index is not None and index < len(
-                self.obj_dict["edges"][(src, dst)]
-            ):
-                del self.obj_dict["edges"][(src, dst)][index]
-                return True
-            else:
-                del self.obj_dict["edges"][(src, dst)]
-                return True
+        edges = self.obj_dict["edges"]
+        keys = [k for k in self._edge_keys(src, dst) if k in edges]
+        if not keys:
+            return False
 
-        return False
+        if index is not None:
+            # Position among all matching edges, as listed by get_edge()
+            for key in keys:
+                if index < len(edges[key]):
+                    del edges[key][index]
+                    self._unindex("edges", key)
+                    return True
+                index -= len(edges[key])
+
+        for key in keys:
+            del edges[key]
+            self._unindex("edges", key)
+        return True
 
     def get_edge(self, src_or_list: Any, dst: Any = None) -> list[Edge]:
         """Retrieve an edge from the graph.
@@ -1345,31 +2530,16 @@ class Graph(Common):
         An empty list is returned otherwise.
         """
         if isinstance(src_or_list, (list, tuple)) and dst is None:
-            edge_points = tuple(src_or_list)
-            edge_points_reverse = (edge_points[1], edge_points[0])
+            src, dst = src_or_list
         else:
-            edge_points = (src_or_list, dst)
-            edge_points_reverse = (dst, src_or_list)
-
-        match = []
-
-        if edge_points in self.obj_dict["edges"] or (
-            self.get_top_graph_type() == "graph"
-            and edge_points_reverse in self.obj_dict["edges"]
-        ):
-            edges_obj_dict = self.obj_dict["edges"].get(
-                edge_points,
-                self.obj_dict["edges"].get(edge_points_reverse, None),
-            )
-
-            for edge_obj_dict in edges_obj_dict:
-                match.append(
-                    Edge(
-                        edge_points[0], edge_points[1], obj_dict=edge_obj_dict
-                    )
-                )
+            src = src_or_list
 
-        return match
+        edges = self.obj_dict["edges"]
+        return [
+            Edge(obj_dict=edge_obj_dict)
+            for key in self._edge_keys(src, dst)
+            for edge_obj_dict in edges.get(key, ())
+        ]
 
     def get_edges(self) -> list[Edge]:
         return self.get_edge_list()
@@ -1388,6 +2558,15 @@ class Graph(Common):
 
         return edge_objs
 
+    @functools.cached_property
+    def edges(self) -> EdgeView:
+        """Live view of the edges in the graph.
+
+        Refer to the `nodes` property for more information. Membership
+        is tested with a `(source, destination)` tuple or an Edge.
+        """
+        return EdgeView(self)
+
     def add_subgraph(self, sgraph: Subgraph) -> None:
         """Adds a subgraph object to the graph.
 
@@ -1410,6 +2589,10 @@ class Graph(Common):
         sgraph.set_sequence(self.get_next_sequence_number())
         sgraph.set_parent_graph(self.get_parent_graph())
 
+        index = self._get_hierarchy_index()
+        if index is not None:
+            index.add_graph(sgraph.obj_dict)
+
     def get_subgraph(self, name: str) -> list[Subgraph]:
         """Retrieve a subgraph from the graph.
 
@@ -1449,6 +2632,389 @@ class Graph(Common):
 
         return sgraph_objs
 
+    @functools.cached_property
+    def subgraphs(self) -> SubgraphView:
+        """Live view of the subgraphs in the graph.
+
+        Refer to the `nodes` property for more information.
+        """
+        return SubgraphView(self)
+
+    def intern_attributes(self) -> None:
+        """Share equal attribute dictionaries between graph elements.
+
+        The attribute dictionaries of all nodes and edges in the graph
+        and its subgraphs are replaced by shared, immutable instances
+        obtained from `pydot.intern_attributes()`. Elements with equal
+        attributes end up holding the same dictionary, which cuts down
+        memory use of graphs where many elements are styled alike, and
+        each distinct dictionary is formatted only once when the graph
+        is converted to a string.
+
+        Setting an attribute through `set()` or the `set_*` methods
+        gives the element a private copy again. The shared dictionaries
+        can't be modified in place: code writing to
+        `obj_dict["attributes"]` directly has to use `set()` instead.
+        Elements with unhashable attribute values are left untouched.
+        """
+        for store_key in ("nodes", "edges"):
+            for obj_dicts in self.obj_dict[store_key].values():
+                for obj_dict in obj_dicts:
+                    try:
+                        obj_dict["attributes"] = intern_attributes(
+                            obj_dict["attributes"]
+                        )
+                    except TypeError:
+                        pass
+        for obj_dicts in self.obj_dict["subgraphs"].values():
+            for obj_dict in obj_dicts:
+                Graph(obj_dict=obj_dict).intern_attributes()
+
+    def clone(self, deep: bool = False) -> Self:
+        """Copy the graph, with its nodes, edges and subgraphs.
+
+        The hierarchy is copied in a single pass over it, instead of
+        following the reference of every element to its parent graph
+        like `copy.deepcopy()` does. The clone is a top level graph: it
+        is the parent graph of all its elements and subgraphs.
+
+        Attribute values are shared with the original graph, only the
+        dictionaries holding them are copied. Dictionaries obtained from
+        `intern_attributes()` are immutable, so they aren't copied at
+        all: an element of the clone gets a private copy the first time
+        one of its attributes is set. Cloning an interned template graph
+        thus mostly copies the structure of the graph. With `deep`,
+        mutable attribute values, like lists, are copied as well.
+        """
+        clone = type(self).__new__(type(self))
+        memo: dict[int, Any] = {}
+
+        def copy_attributes(attrs: AttributeDict) -> AttributeDict:
+            if isinstance(attrs, SharedAttributes):
+                return attrs
+            if deep and not all(type(v) is str for v in attrs.values()):
+                return copy.deepcopy(attrs, memo)
+            return dict(attrs)
+
+        def copy_graph(graph_obj_dict: AttributeDict) -> AttributeDict:
+            new = dict(graph_obj_dict)
+            new["parent_graph"] = clone
+            new["attributes"] = copy_attributes(graph_obj_dict["attributes"])
+            for store_key in ("nodes", "edges"):
+                new[store_key] = {
+                    key: [
+                        {
+                            **obj,
+                            "parent_graph": clone,
+                            "attributes": copy_attributes(obj["attributes"]),
+                        }
+                        for obj in obj_dicts
+                    ]
+                    for key, obj_dicts in graph_obj_dict[store_key].items()
+                }
+            new["subgraphs"] = {
+                name: [copy_graph(sgraph) for sgraph in sgraphs]
+                for name, sgraphs in graph_obj_dict["subgraphs"].items()
+            }
+            return new
+
+        clone.obj_dict = copy_graph(self.obj_dict)
+        return clone
+
+    def node_index(self) -> dict[str, int]:
+        """Number the nodes of the graph and its subgraphs.
+
+        Returns a dictionary mapping node names to consecutive integers,
+        starting at 0, in the order the nodes are first found. Nodes that
+        are only declared implicitly, by the edges using them, are
+        included. Names are given as Graphviz knows them, without quotes
+        and ports.
+
+        These numbers are the rows and columns of `to_adjacency_matrix()`
+        and the entries of `to_edge_array()`.
+        """
+        return self._edge_table()[0]
+
+    def to_edge_array(self) -> Any:
+        """Get the edges of the graph and its subgraphs as an array.
+
+        Returns a NumPy array of shape `(n, 2)`, holding the numbers of
+        the source and destination nodes of each edge, as given by
+        `node_index()`. Edges from or to subgraphs are left out.
+
+        Requires NumPy.
+        """
+        import numpy as np
+
+        _, sources, destinations, _ = self._edge_table()
+        array = np.empty((len(sources), 2), dtype=np.intp)
+        array[:, 0] = sources
+        array[:, 1] = destinations
+        return array
+
+    def to_adjacency_matrix(
+        self, sparse: bool = True, weight: str | None = None
+    ) -> Any:
+        """Get the adjacency matrix of the graph and its subgraphs.
+
+        Rows and columns are numbered as given by `node_index()`. Each
+        entry holds the number of edges from the node of its row to the
+        node of its column. If `weight` is given, entries hold the sum of
+        the values of that attribute of these edges instead, edges that
+        don't have the attribute counting as 1. The matrix of an
+        undirected graph is symmetric. Edges from or to subgraphs are
+        left out.
+
+        Returns a SciPy sparse array in CSR format if `sparse` is true,
+        or a NumPy array otherwise. Requires NumPy, and SciPy for
+        sparse arrays.
+        """
+        import numpy as np
+
+        names, sources, destinations, values = self._edge_table(weight)
+        rows = np.array(sources, dtype=np.intp)
+        cols = np.array(destinations, dtype=np.intp)
+        if values is None:
+            data = np.ones(len(rows), dtype=np.int64)
+        else:
+            data = np.array(values, dtype=np.float64)
+
+        if self.get_top_graph_type() == "graph":
+            # Undirected edges are entered both ways, loops only once.
+            mirror = rows != cols
+            rows, cols = (
+                np.concatenate((rows, cols[mirror])),
+                np.concatenate((cols, rows[mirror])),
+            )
+            data = np.concatenate((data, data[mirror]))
+
+        shape = (len(names), len(names))
+        if sparse:
+            import scipy.sparse
+
+            # Parallel edges are summed up by the conversion to CSR.
+            return scipy.sparse.coo_array(
+                (data, (rows, cols)), shape=shape
+            ).tocsr()
+
+        matrix = np.zeros(shape, dtype=data.dtype)
+        np.add.at(matrix, (rows, cols), data)
+        return matrix
+
+    def to_networkx(self) -> Any:
+        """Convert the graph to a NetworkX graph.
+
+        Returns a `MultiDiGraph` or `MultiGraph`, or a `DiGraph` or
+        `Graph` for strict graphs, holding the nodes and edges of the
+        graph and all its subgraphs. Nodes are named as Graphviz knows
+        them, without quotes, and get the attributes of all their
+        declarations. Edges keep their attributes, and the ports of
+        their endpoints as `tailport` and `headport` attributes. Edges
+        from or to subgraphs are left out.
+
+        Following the conventions of `networkx.drawing.nx_pydot`, the
+        graph attributes and the default node and edge attributes are
+        stored as the `graph`, `node` and `edge` entries of the `graph`
+        dictionary of the result. Its `subgraphs` entry lists the
+        subgraphs, as dictionaries with these same entries, plus:
+
+        - `name`: the name of the subgraph,
+        - `parent`: the position of the enclosing subgraph in the list,
+          or None,
+        - `nodes`: the nodes declared in the subgraph,
+        - `edges`: the edges declared in the subgraph, as `(u, v)` or,
+          in multigraphs, `(u, v, key)` tuples.
+
+        `pydot.from_networkx` converts such graphs back, subgraphs
+        included. Requires NetworkX.
+        """
+        import networkx as nx
+
+        nodes, edges, subgraphs, graph_attributes = self._elements()
+
+        if self.get_strict():
+            nx_class = nx.DiGraph if self._directed() else nx.Graph
+        else:
+            nx_class = nx.MultiDiGraph if self._directed() else nx.MultiGraph
+        nx_graph = nx_class()
+        nx_graph.graph.update(graph_attributes)
+        nx_graph.add_nodes_from(nodes.items())
+        keys = nx_graph.add_edges_from(edges)
+
+        if subgraphs:
+            edge_ids: list[tuple[Any, ...]]
+            if nx_graph.is_multigraph():
+                edge_ids = [(u, v, k) for (u, v, _), k in zip(edges, keys)]
+            else:
+                edge_ids = [(u, v) for u, v, _ in edges]
+            for entry in subgraphs:
+                entry["edges"] = [edge_ids[i] for i in entry["edges"]]
+            nx_graph.graph["subgraphs"] = subgraphs
+
+        return nx_graph
+
+    def to_igraph(self) -> Any:
+        """Convert the graph to an igraph graph.
+
+        Vertices are numbered as given by `node_index()`, and their
+        `name` attribute holds the node names. The attributes of nodes
+        and edges become vertex and edge attributes, set to None on the
+        elements that don't have them. Graph attributes are stored as
+        with `to_networkx()`, the edges of subgraphs being given by
+        their edge IDs. The `strict` graph attribute is set for strict
+        graphs.
+
+        `pydot.from_igraph` converts such graphs back, subgraphs
+        included. Requires igraph.
+        """
+        import igraph
+
+        nodes, edges, subgraphs, graph_attributes = self._elements()
+
+        numbers = {name: i for i, name in enumerate(nodes)}
+        ig_graph = igraph.Graph(
+            n=len(nodes),
+            edges=[(numbers[u], numbers[v]) for u, v, _ in edges],
+            directed=self._directed(),
+        )
+        ig_graph.vs["name"] = list(nodes)
+        for key in dict.fromkeys(k for a in nodes.values() for k in a):
+            ig_graph.vs[key] = [a.get(key) for a in nodes.values()]
+        for key in dict.fromkeys(k for _, _, a in edges for k in a):
+            ig_graph.es[key] = [a.get(key) for _, _, a in edges]
+
+        for key, value in graph_attributes.items():
+            ig_graph[key] = value
+        if self.get_strict():
+            ig_graph["strict"] = True
+        if subgraphs:
+            ig_graph["subgraphs"] = subgraphs
+
+        return ig_graph
+
+    def _directed(self) -> bool:
+        return self.get_top_graph_type() == "digraph"
+
+    def _elements(
+        self,
+    ) -> tuple[
+        dict[str, AttributeDict],
+        list[tuple[str, str, AttributeDict]],
+        list[AttributeDict],
+        AttributeDict,
+    ]:
+        """Collect the elements of the hierarchy, for conversions.
+
+        Returns the attributes of the nodes by name, in the order of
+        `node_index()`, the edges as `(source, destination, attributes)`
+        tuples, the subgraphs, described as by `to_networkx()` but with
+        their edges given by position in the edge list, and the graph
+        attributes, name and defaults. Edge attributes may be those of
+        the edges themselves, and must not be modified.
+        """
+        nodes: dict[str, AttributeDict] = {}
+        edges: list[tuple[str, str, AttributeDict]] = []
+        subgraphs: list[AttributeDict] = []
+        endpoints: dict[Any, tuple[str | None, str | None]] = {}
+
+        def endpoint(ep: Any) -> tuple[str | None, str | None]:
+            # Endpoints are shared by many edges, parse each once.
+            parsed = endpoints.get(ep)
+            if parsed is None:
+                parsed = endpoints[ep] = (_graphviz_id(ep), _endpoint_port(ep))
+            return parsed
+
+        def visit(graph_obj_dict: AttributeDict, position: int | None) -> None:
+            entry = root if position is None else subgraphs[position]
+            for name, obj_dicts in graph_obj_dict["nodes"].items():
+                if name in _DEFAULT_NAMES:
+                    for obj in obj_dicts:
+                        entry[name].update(obj["attributes"])
+                    continue
+                node_id = str(_graphviz_id(name))
+                attributes = nodes.setdefault(node_id, {})
+                for obj in obj_dicts:
+                    attributes.update(obj["attributes"])
+                entry["nodes"].append(node_id)
+
+            for points, obj_dicts in graph_obj_dict["edges"].items():
+                (src, tailport), (dst, headport) = map(endpoint, points)
+                if src is None or dst is None:
+                    continue
+                nodes.setdefault(src, {})
+                nodes.setdefault(dst, {})
+                first = len(edges)
+                if tailport is None and headport is None:
+                    edges.extend(
+                        (src, dst, obj["attributes"]) for obj in obj_dicts
+                    )
+                else:
+                    ports = {"tailport": tailport, "headport": headport}
+                    ports = {k: v for k, v in ports.items() if v is not None}
+                    edges.extend(
+                        (src, dst, {**ports, **obj["attributes"]})
+                        for obj in obj_dicts
+                    )
+                entry["edges"].extend(range(first, len(edges)))
+
+            for sgraphs in graph_obj_dict["subgraphs"].values():
+                for sgraph in sgraphs:
+                    subgraphs.append(_new_graph_entry(sgraph, position))
+                    visit(sgraph, len(subgraphs) - 1)
+
+        root = _new_graph_entry(self.obj_dict, None)
+        visit(self.obj_dict, None)
+
+        # Like nx_pydot, leave out what isn't set.
+        graph_attributes = {
+            key: root[key]
+            for key in ("name", "graph", "node", "edge")
+            if root[key]
+        }
+        return nodes, edges, subgraphs, graph_attributes
+
+    def _edge_table(
+        self, weight: str | None = None
+    ) -> tuple[dict[str, int], list[int], list[int], list[float] | None]:
+        """Number the nodes of the hierarchy and list its edges.
+
+        Returns the node numbers, as `node_index()`, and the numbers of
+        the sources and destinations of the edges. If `weight` is given,
+        also returns the value of that attribute for each edge.
+        """
+        names: dict[str, int] = {}
+        sources: list[int] = []
+        destinations: list[int] = []
+        values: list[float] | None = None if weight is None else []
+
+        def number(ep: Any) -> int | None:
+            name = _graphviz_id(ep)
+            if name is None:
+                return None
+            return names.setdefault(name, len(names))
+
+        def visit(graph_obj_dict: AttributeDict) -> None:
+            for name in graph_obj_dict["nodes"]:
+                if name not in _DEFAULT_NAMES:
+                    number(name)
+            for (src, dst), obj_dicts in graph_obj_dict["edges"].items():
+                src_number, dst_number = number(src), number(dst)
+                if src_number is None or dst_number is None:
+                    continue
+                sources.extend([src_number] * len(obj_dicts))
+                destinations.extend([dst_number] * len(obj_dicts))
+                if values is not None:
+                    values.extend(
+                        _numeric_attribute(obj["attributes"].get(weight))
+                        for obj in obj_dicts
+                    )
+            for sgraphs in graph_obj_dict["subgraphs"].values():
+                for sgraph in sgraphs:
+                    visit(sgraph)
+
+        visit(self.obj_dict)
+        return names, sources, destinations, values
+
     def set_parent_graph(self, parent_graph: Common | None) -> None:
         self.obj_dict["parent_graph"] = parent_graph
 
@@ -1504,21 +3070,10 @@ class Graph(Common):
             f"{child_indent}{a};\n" for a in self.formatted_attr_list()
         )
 
-        edges_done = set()
-
         edge_obj_dicts = []
         for k in self.obj_dict["edges"]:
             edge_obj_dicts.extend(self.obj_dict["edges"][k])
 
-        if edge_obj_dicts:
-            edge_ep_set = set(
-                itertools.chain.from_iterable(
-                    obj["points"] for obj in edge_obj_dicts
-                )
-            )
-        else:
-            edge_ep_set = set()
-
         node_obj_dicts = []
         for k in self.obj_dict["nodes"]:
             node_obj_dicts.extend(self.obj_dict["nodes"][k])
@@ -1534,7 +3089,22 @@ class Graph(Common):
         obj_list.sort(key=lambda x: x[0])
 
         skip_disconnected = self.get_suppress_disconnected()
+        if skip_disconnected:
+            # Parallel edges share their points, which are also the key
+            # they're stored under, so only the keys have to be checked.
+            edge_ep_set = set(
+                itertools.chain.from_iterable(
+                    points
+                    for points, objs in self.obj_dict["edges"].items()
+                    if objs
+                )
+            )
+
         simplify = self.get_simplify()
+        if simplify:
+            # Points of the edges output so far.
+            edges_done: set[tuple[Any, Any]] = set()
+            undirected = self.get_top_graph_type() == "graph"
 
         for _, obj in obj_list:
             if obj["type"] == "node":
@@ -1549,16 +3119,18 @@ class Graph(Common):
                 graph.append(f"{node_str}\n")
 
             elif obj["type"] == "edge":
-                edge = Edge(obj_dict=obj)
-
-                if simplify and edge in edges_done:
-                    continue
-
-                edge_str = edge.to_string(
+                if simplify:
+                    points = tuple(obj["points"])
+                    if points in edges_done or (
+                        undirected and points[::-1] in edges_done
+                    ):
+                        continue
+                    edges_done.add(points)
+
+                edge_str = Edge(obj_dict=obj).to_string(
                     indent=indent, indent_level=indent_level + 1
                 )
                 graph.append(f"{edge_str}\n")
-                edges_done.add(edge)
 
             else:
                 sgraph_str = Subgraph(obj_dict=obj).to_string(
@@ -1721,6 +3293,18 @@ class Dot(Graph):
         self.shape_files = state.get("shape_files", [])
         self.formats = state.get("formats", OUTPUT_FORMATS)
 
+    def clone(self, deep: bool = False) -> Self:
+        """Copy the graph, see `Graph.clone`.
+
+        The program, shape files and formats used to render the graph
+        are copied as well.
+        """
+        clone = super().clone(deep)
+        clone.prog = self.prog
+        clone.shape_files = list(self.shape_files)
+        clone.formats = set(self.formats)
+        return clone
+
     def set_shape_files(self, file_paths: str | Sequence[str]) -> None:
         """Add the paths of the required image files.
 
@@ -1752,12 +3336,96 @@ class Dot(Graph):
         """
         self.prog = prog
 
+    def _get_index(self) -> tuple[Graph, _HierarchyIndex]:
+        """Get the topmost graph and its hierarchy index.
+
+        The index is built on first use, and from then on kept up to
+        date by the methods adding and deleting graph elements.
+        """
+        top = self.get_parent_graph() or self
+        if top._hierarchy_index is None:
+            top._hierarchy_index = _HierarchyIndex(top.obj_dict)
+        return top, top._hierarchy_index
+
+    def find_node(self, name: str) -> list[Node]:
+        """Retrieve nodes from anywhere in the graph hierarchy.
+
+        Like `get_node`, but nodes declared within subgraphs and
+        clusters, at any depth, are returned as well.
+        """
+        _, index = self._get_index()
+        return [
+            Node(obj_dict=obj_dict)
+            for graph_obj_dict in index.nodes.get(name, [])
+            for obj_dict in graph_obj_dict["nodes"].get(name, [])
+        ]
+
+    def _find_edge_keys(
+        self, src_or_list: Any, dst: Any = None
+    ) -> list[tuple[Any, Any]]:
+        if isinstance(src_or_list, (list, tuple)) and dst is None:
+            src, dst = src_or_list
+        else:
+            src = src_or_list
+        return self._edge_keys(src, dst)
+
+    def find_edges(self, src_or_list: Any, dst: Any = None) -> list[Edge]:
+        """Retrieve edges from anywhere in the graph hierarchy.
+
+        Like `get_edge`, but edges declared within subgraphs and
+        clusters, at any depth, are returned as well.
+        """
+        _, index = self._get_index()
+        return [
+            Edge(obj_dict=obj_dict)
+            for key in self._find_edge_keys(src_or_list, dst)
+            for graph_obj_dict in index.edges.get(key, [])
+            for obj_dict in graph_obj_dict["edges"].get(key, [])
+        ]
+
+    def containing_subgraph(self, element: Any) -> list[Graph]:
+        """Get the graphs in the hierarchy containing an element.
+
+        `element` can be a node name or `Node`, or the points of an
+        edge as a `(source, destination)` tuple or an `Edge`. A list is
+        returned, holding the topmost graph and/or the `Subgraph`
+        instances in which the element is declared, as `Cluster` for
+        clusters.
+        """
+        top, index = self._get_index()
+
+        if isinstance(element, Node):
+            element = element.get_name()
+        elif isinstance(element, Edge):
+            element = (element.get_source(), element.get_destination())
+
+        if isinstance(element, (list, tuple)):
+            graph_obj_dicts: list[AttributeDict] = []
+            for key in self._find_edge_keys(element):
+                for g in index.edges.get(key, []):
+                    if not any(g is other for other in graph_obj_dicts):
+                        graph_obj_dicts.append(g)
+        else:
+            graph_obj_dicts = index.nodes.get(element, [])
+
+        return [
+            top
+            if g is top.obj_dict
+            else Cluster(obj_dict=g)
+            if _is_cluster(g)
+            else Subgraph(obj_dict=g)
+            for g in graph_obj_dicts
+        ]
+
     def write(
         self,
         path: str | bytes,
         prog: str | None = None,
         format: str = "raw",
         encoding: str | None = None,
+        pool: RenderPool | None = None,
+        cache: RenderCache | None = None,
+        limits: RenderLimits | None = None,
     ) -> bool:
         """Writes a graph to a file.
 
@@ -1781,6 +3449,10 @@ class Dot(Graph):
 
         The encoding is passed to `open` [1].
 
+        The `pool`, `cache` and `limits` arguments are used for rendering,
+        see `create`. Unless `pool` or `cache` are given, the program
+        writes the file itself, so its output isn't held in memory.
+
         [1] https://docs.python.org/3/library/functions.html#open
         """
         if prog is None:
@@ -1789,8 +3461,18 @@ class Dot(Graph):
             s = self.to_string()
             with open(path, mode="w", encoding=encoding) as f:
                 f.write(s)
+        elif pool is None and cache is None:
+            # Let the program write the file, rather than buffering it.
+            self.write_multi({format: path}, prog, encoding, limits)
         else:
-            b = self.create(prog, format, encoding=encoding)
+            b = self.create(
+                prog,
+                format,
+                encoding=encoding,
+                pool=pool,
+                cache=cache,
+                limits=limits,
+            )
             with open(path, mode="wb") as f:
                 f.write(b)
         return True
@@ -1800,13 +3482,18 @@ class Dot(Graph):
         prog: list[str] | tuple[str] | str | None = None,
         format: str = "ps",
         encoding: str | None = None,
+        pool: RenderPool | None = None,
+        cache: RenderCache | None = None,
+        limits: RenderLimits | None = None,
     ) -> bytes:
         """Creates and returns a binary image for the graph.
 
-        create will write the graph to a temporary dot file in the
-        encoding specified by `encoding` and process it with the
-        program given by 'prog' (which defaults to `self.prog`, initially
-        'dot'), reading the binary image output and returning it as `bytes`.
+        create will serialize the graph in the encoding specified by
+        `encoding` and feed it to the program given by 'prog' (which
+        defaults to `self.prog`, initially 'dot') through its standard
+        input, reading the binary image output and returning it as `bytes`.
+        The graph isn't written to disk; a temporary directory is only
+        created to hold copies of the `shape_files`, if there are any.
 
         There's also the preferred possibility of using:
 
@@ -1854,64 +3541,884 @@ class Dot(Graph):
           If you haven't added Graphviz to your `$PATH` on Windows,
           then you may want to give the absolute path to the
           executable (for example, to `dot.exe`) in `prog`.
-        """
-        if prog is None:
-            prog = self.prog
 
-        assert prog is not None
+        @param pool: a `pydot.RenderPool`, to render the graph together
+          with the graphs that other threads render through the same
+          pool, using fewer Graphviz processes.
 
-        if isinstance(prog, (list, tuple)):
-            prog, args = prog[0], prog[1:]
+        @param cache: a `pydot.RenderCache`, holding the output of
+          earlier renders. If it holds the output for the same DOT data,
+          program, arguments, format, shape files and Graphviz version,
+          the output is returned without running Graphviz. Otherwise,
+          the output is added to the cache.
+
+        @param limits: `pydot.RenderLimits` to stop the program at, in
+          which case `GraphvizLimitError` is raised.
+        """
+        prog, args = self._split_prog(prog)
+        dot_data = self._encode_dot(encoding)
+        arguments = [f"-T{format}"] + args
+
+        key = None
+        if cache is not None:
+            key = cache.key(prog, arguments, dot_data, self.shape_files)
+            data = cache.get(key)
+            if data is not None:
+                return data
+
+        if pool is not None:
+            future = pool._submit_data(
+                dot_data, prog, args, format, self.shape_files, limits
+            )
+            data = future.result()
         else:
-            args = []  # type: ignore
+            data = _render(prog, arguments, dot_data, self.shape_files, limits)
+
+        if cache is not None and key is not None:
+            cache.put(key, data)
+        return data
 
-        # temp file
+    def create_stream(
+        self,
+        prog: list[str] | tuple[str] | str | None = None,
+        format: str = "ps",
+        encoding: str | None = None,
+        chunk_size: int = 64 * 1024,
+        limits: RenderLimits | None = None,
+    ) -> Iterator[bytes]:
+        """Creates a binary image for the graph, as an iterator of chunks.
+
+        Like `create`, but the output of the program is yielded as it is
+        produced, in chunks of at most `chunk_size` bytes, instead of
+        being collected in memory. This is suited to large outputs, and
+        to sending them on while they are being rendered:
+
+            with open("graph.svg", "wb") as f:
+                for chunk in graph.create_stream(format="svg"):
+                    f.write(chunk)
+
+        Errors are reported by raising the same exceptions as `create`,
+        after the output has been consumed. If the iterator is closed
+        before, the program is killed.
+        """
+        prog, args = self._split_prog(prog)
+        arguments = [f"-T{format}"] + args
+        return _stream(
+            prog,
+            arguments,
+            self._encode_dot(encoding),
+            self.shape_files,
+            chunk_size,
+            limits,
+        )
+
+    def create_multi(
+        self,
+        formats: Sequence[str],
+        prog: list[str] | tuple[str] | str | None = None,
+        encoding: str | None = None,
+        limits: RenderLimits | None = None,
+    ) -> dict[str, bytes]:
+        """Creates binary images for the graph in several formats.
+
+        Like `create`, but runs the layout only once and renders its
+        result in each of `formats`. Returns a dictionary mapping each
+        format to its output.
+
+            outputs = graph.create_multi(["png", "cmapx"])
+        """
+        prog, args = self._split_prog(prog)
+        formats = list(dict.fromkeys(formats))
+
+        # Outputs are written to a temporary directory, but the program
+        # runs in the same directory as for `create`.
         with tempfile.TemporaryDirectory(
             ignore_cleanup_errors=True
-        ) as tmp_dir:  # type: ignore
-            fp = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
-            fp.close()
-            self.write(fp.name, encoding=encoding)
+        ) as tmp_dir, _shape_files_dir(  # type: ignore
+            self.shape_files
+        ) as working_dir:
+            outputs = {
+                fmt: os.path.join(tmp_dir, f"pydot-output-{i}")
+                for i, fmt in enumerate(formats)
+            }
+            self._render_files(
+                prog, args, outputs, encoding, working_dir, limits
+            )
 
-            # For each of the image files, copy it to the temporary directory
-            # with the same filename as the original
-            for img in self.shape_files:
-                outfile = os.path.join(tmp_dir, os.path.basename(img))
-                with open(img, "rb") as img_in, open(outfile, "wb") as img_out:
-                    img_data = img_in.read()
-                    img_out.write(img_data)
+            result = {}
+            for fmt, path in outputs.items():
+                with open(path, "rb") as f:
+                    result[fmt] = f.read()
+        return result
 
-            arguments = [f"-T{format}"] + args + [fp.name]  # type: ignore
+    def write_multi(
+        self,
+        paths: Mapping[str, str | bytes],
+        prog: list[str] | tuple[str] | str | None = None,
+        encoding: str | None = None,
+        limits: RenderLimits | None = None,
+    ) -> bool:
+        """Writes the graph to several files, in different formats.
 
-            try:
-                stdout_data, stderr_data, process = call_graphviz(
+        `paths` maps formats to the path of the file to write in that
+        format. Graphviz runs the layout once and writes each file
+        itself, to a temporary file that is copied to the path once
+        rendering succeeded, so a failed render leaves existing files
+        untouched. As for `write`, the format 'raw' writes the DOT string
+        of the graph.
+
+            graph.write_multi({"png": "g.png", "svg": "g.svg"})
+        """
+        paths = dict(paths)
+        raw_path = paths.pop("raw", None)
+        if raw_path is not None:
+            self.write(raw_path, format="raw", encoding=encoding)
+
+        if paths:
+            prog, args = self._split_prog(prog)
+            # Outputs are rendered to a temporary directory and copied to
+            # their paths once the program succeeded. Copying writes
+            # through symbolic links and special files like the program
+            # would, and keeps the permissions of existing files.
+            with tempfile.TemporaryDirectory(
+                ignore_cleanup_errors=True
+            ) as tmp_dir, _shape_files_dir(  # type: ignore
+                self.shape_files
+            ) as working_dir:
+                outputs = {
+                    fmt: os.path.join(tmp_dir, f"pydot-output-{i}")
+                    for i, fmt in enumerate(paths)
+                }
+                self._render_files(
+                    prog, args, outputs, encoding, working_dir, limits
+                )
+                for fmt, tmp_path in outputs.items():
+                    with open(tmp_path, "rb") as src, open(
+                        paths[fmt], "wb"
+                    ) as dst:
+                        shutil.copyfileobj(src, dst)
+        return True
+
+    def _render_files(
+        self,
+        prog: str,
+        args: list[str],
+        outputs: dict[str, str],
+        encoding: str | None,
+        working_dir: str | None,
+        limits: RenderLimits | None,
+    ) -> None:
+        """Run a Graphviz program writing an output file per format."""
+        arguments = list(args)
+        for fmt, path in outputs.items():
+            arguments += [f"-T{fmt}", f"-o{path}"]
+
+        with _prog_not_found_error(prog):
+            stdout_data, stderr_data, process = call_graphviz(
+                program=prog,
+                arguments=arguments,
+                working_dir=working_dir,
+                input=self._encode_dot(encoding),
+                limits=limits,
+            )
+
+        _check_graphviz_result(
+            prog, arguments, process.returncode, stdout_data, stderr_data
+        )
+
+    async def awrite(
+        self,
+        path: str | bytes,
+        prog: list[str] | tuple[str] | str | None = None,
+        format: str = "raw",
+        encoding: str | None = None,
+        limits: RenderLimits | None = None,
+    ) -> bool:
+        """Writes a graph to a file, without blocking the event loop.
+
+        Coroutine version of `write`, rendering the graph with `acreate`.
+        """
+        if format == "raw":
+            s = self.to_string()
+            with open(path, mode="w", encoding=encoding) as f:
+                f.write(s)
+        else:
+            b = await self.acreate(
+                prog, format, encoding=encoding, limits=limits
+            )
+            with open(path, mode="wb") as f:
+                f.write(b)
+        return True
+
+    async def acreate(
+        self,
+        prog: list[str] | tuple[str] | str | None = None,
+        format: str = "ps",
+        encoding: str | None = None,
+        limits: RenderLimits | None = None,
+    ) -> bytes:
+        """Creates and returns a binary image for the graph.
+
+        Coroutine version of `create`, taking the same arguments and
+        raising the same errors. The Graphviz program runs as an asyncio
+        subprocess, so many graphs can be rendered concurrently from a
+        single event loop. If the task awaiting it is cancelled, the
+        program is killed.
+        """
+        prog, args = self._split_prog(prog)
+        arguments = [f"-T{format}"] + args
+        dot_data = self._encode_dot(encoding)
+
+        with _shape_files_dir(self.shape_files) as working_dir:
+            with _prog_not_found_error(prog):
+                stdout_data, stderr_data, process = await acall_graphviz(
                     program=prog,
                     arguments=arguments,
-                    working_dir=tmp_dir,
+                    working_dir=working_dir,
+                    input=dot_data,
+                    limits=limits,
                 )
-            except OSError as e:
-                if e.errno == errno.ENOENT:
-                    args = list(e.args)  # type: ignore
-                    args[1] = f'"{prog}" not found in path.'  # type: ignore
-                    raise OSError(*args)
+
+        _check_graphviz_result(
+            prog, arguments, process.returncode, stdout_data, stderr_data
+        )
+
+        return stdout_data
+
+    def layout(
+        self,
+        prog: list[str] | tuple[str] | str | None = None,
+        encoding: str | None = None,
+        limits: RenderLimits | None = None,
+    ) -> dict[str, Any]:
+        """Run the layout engine and store its results in the graph.
+
+        The graph is laid out by the program given by `prog` (as for
+        `create`), and the resulting coordinates are set as attributes
+        of the graph, its clusters, nodes and edges: `bb` and `lp` on
+        graphs, `pos`, `width` and `height` on nodes, and `pos` (the
+        spline control points) and `lp` on edges. Nodes that are only
+        declared implicitly, by the edges using them, are added to the
+        graph so they get a position too.
+
+        The laid out graph can then be restyled and rendered again
+        without running the layout again, by rendering it with
+        `neato -n2`, which uses the stored positions as they are:
+
+            graph.layout()
+            graph.get_node("a")[0].set_color("red")
+            png = graph.create_png(prog=["neato", "-n2"])
+
+        Returns the layout, as decoded from the `json0` output format
+        of Graphviz.
+        """
+        data: dict[str, Any] = json.loads(
+            self.create(
+                prog=prog, format="json0", encoding=encoding, limits=limits
+            )
+        )
+        self._apply_layout(data)
+        return data
+
+    def layout_positions(
+        self,
+        prog: list[str] | tuple[str] | str | None = None,
+        encoding: str | None = None,
+        limits: RenderLimits | None = None,
+        store: bool = False,
+    ) -> LayoutPositions:
+        """Run the layout engine and get its results as NumPy arrays.
+
+        The graph is laid out as by `layout()`, but the coordinates are
+        returned as arrays, ready for numeric processing or for drawing
+        the graph with other tools, see `LayoutPositions`. Nodes are
+        numbered as given by `node_index()`.
+
+        If `store` is true, the layout is also stored in the attributes
+        of the graph and its elements, as by `layout()`.
+
+        Requires NumPy.
+        """
+        data: dict[str, Any] = json.loads(
+            self.create(
+                prog=prog, format="json0", encoding=encoding, limits=limits
+            )
+        )
+        if store:
+            self._apply_layout(data)
+        return _layout_positions(data, self.node_index())
+
+    def dump_binary(self, path: str | os.PathLike[str]) -> None:
+        """Save the graph to a binary snapshot file.
+
+        Snapshots are much faster to load than DOT files, and smaller
+        than pickles: values and attribute dictionaries are stored once
+        and shared by all elements using them. Load them again with
+        `pydot.load_binary`, or load only some subgraphs of them with
+        `pydot.GraphSnapshot`.
+        """
+        from pydot import snapshot
+
+        snapshot._dump(self, path)
+
+    def _apply_layout(self, data: dict[str, Any]) -> None:
+        """Store the layout decoded from `json0` output in the graph."""
+        nodes: dict[str, list[AttributeDict]] = {}
+        edges: dict[tuple[str, str], collections.deque[AttributeDict]] = {}
+        graphs: dict[str, list[AttributeDict]] = {}
+
+        # Collect the elements in the order they are output, which is
+        # the order in which Graphviz numbers parallel edges.
+        def collect(graph_obj_dict: AttributeDict) -> None:
+            elements = [
+                obj
+                for store in ("nodes", "edges", "subgraphs")
+                for objs in graph_obj_dict[store].values()
+                for obj in objs
+            ]
+            elements.sort(key=lambda obj: obj["sequence"])
+            for obj in elements:
+                if obj["type"] == "node":
+                    name = _graphviz_id(obj["name"])
+                    if name is not None and name not in _DEFAULT_NAMES:
+                        nodes.setdefault(name, []).append(obj)
+                elif obj["type"] == "edge":
+                    src, dst = (_graphviz_id(ep) for ep in obj["points"])
+                    if src is not None and dst is not None:
+                        edges.setdefault(
+                            (src, dst), collections.deque()
+                        ).append(obj)
                 else:
-                    raise  # pragma: no cover
-
-        if process.returncode != 0:
-            code = process.returncode
-            print(
-                f'"{prog}" with args {arguments} returned code: {code}\n\n'
-                f"stdout, stderr:\n"
-                f" {stdout_data.decode('utf-8', errors='replace')}\n"
-                f" {stderr_data.decode('utf-8', errors='replace')}\n"
+                    name = _graphviz_id(obj["name"])
+                    if name is not None:
+                        graphs.setdefault(name, []).append(obj)
+                    collect(obj)
+
+        collect(self.obj_dict)
+
+        _set_layout_attributes([self.obj_dict], data, _GRAPH_LAYOUT_ATTRS)
+
+        sgraph_objects, node_objects = _layout_objects(data)
+        for obj in sgraph_objects:
+            sgraph_obj_dicts = graphs.get(obj["name"], [])
+            _set_layout_attributes(sgraph_obj_dicts, obj, _GRAPH_LAYOUT_ATTRS)
+
+        names: dict[int, str] = {}
+        for obj in node_objects:
+            names[obj["_gvid"]] = obj["name"]
+            node_obj_dicts = nodes.get(obj["name"])
+            if node_obj_dicts is None:
+                node = Node(quote_id_if_necessary(obj["name"]))
+                self.add_node(node)
+                node_obj_dicts = [node.obj_dict]
+            _set_layout_attributes(node_obj_dicts, obj, _NODE_LAYOUT_ATTRS)
+
+        undirected = self.get_top_graph_type() == "graph"
+        for obj in data.get("edges", []):
+            src = names.get(obj["tail"], "")
+            dst = names.get(obj["head"], "")
+            candidates = edges.get((src, dst))
+            if not candidates and undirected:
+                candidates = edges.get((dst, src))
+            if candidates:
+                edge_obj_dict = candidates.popleft()
+                _set_layout_attributes(
+                    [edge_obj_dict], obj, _EDGE_LAYOUT_ATTRS
+                )
+
+    def _split_prog(
+        self, prog: list[str] | tuple[str] | str | None
+    ) -> tuple[str, list[str]]:
+        """Split `prog` into the program and its extra arguments."""
+        if prog is None:
+            prog = self.prog
+
+        assert prog is not None
+
+        if isinstance(prog, (list, tuple)):
+            return prog[0], list(prog[1:])
+        return prog, []
+
+    def _encode_dot(self, encoding: str | None) -> bytes:
+        """Serialize the graph as input for a Graphviz program.
+
+        The result is encoded just like `write()` would write it to a
+        file, using the encoding specified by `encoding`.
+        """
+        buffer = io.BytesIO()
+        with io.TextIOWrapper(buffer, encoding=encoding) as f:
+            f.write(self.to_string())
+            f.flush()
+            return buffer.getvalue()
+
+
+class LayoutPositions(NamedTuple):
+    """The coordinates of a layout, as returned by `Dot.layout_positions`.
+
+    @param nodes: numbers of the nodes, by name, as `Graph.node_index()`.
+    @param positions: array of shape `(n, d)`, the node centers, `d`
+        being the number of dimensions of the layout: 2, unless set
+        otherwise by the `dim` or `dimen` attribute of the graph.
+    @param sizes: array of shape `(n, 2)`, the node widths and heights.
+    @param edges: array of shape `(m, 2)`, the numbers of the tail and
+        head nodes of each edge, in the order of the Graphviz output.
+    @param points: array of shape `(k, d)`, the spline control points of
+        all edges.
+    @param offsets: array of shape `(m + 1,)`, the control points of edge
+        `i` being `points[offsets[i]:offsets[i + 1]]`.
+    @param bounding_box: array `[x0, y0, x1, y1]`, the bounding box of the
+        graph.
+
+    Coordinates and sizes are in points, as in the `pos` attributes set
+    by Graphviz. Entries of nodes missing from the layout are NaN.
+    """
+
+    nodes: dict[str, int]
+    positions: Any
+    sizes: Any
+    edges: Any
+    points: Any
+    offsets: Any
+    bounding_box: Any
+
+
+def _layout_positions(
+    data: dict[str, Any], index: dict[str, int]
+) -> LayoutPositions:
+    """Convert a layout decoded from `json0` output into arrays."""
+    import numpy as np
+
+    numbers: dict[int, int] = {}
+    rows: list[int] = []
+    placed: list[int] = []
+    centers: list[list[str]] = []
+    sizes: list[tuple[str, str]] = []
+    for obj in _layout_objects(data)[1]:
+        number = index.setdefault(obj["name"], len(index))
+        numbers[obj["_gvid"]] = number
+        rows.append(number)
+        if "pos" in obj:
+            placed.append(number)
+            centers.append(obj["pos"].split(","))
+        sizes.append((obj.get("width", "nan"), obj.get("height", "nan")))
+
+    # Layouts in more dimensions, set by `dim` or `dimen`, give more
+    # coordinates.
+    positions = np.full(
+        (len(index), _layout_dimensions(map(len, centers))), np.nan
+    )
+    node_sizes = np.full((len(index), 2), np.nan)
+    if placed:
+        positions[placed] = np.array(centers, dtype=np.float64)
+    if rows:
+        # Graphviz gives sizes in inches.
+        node_sizes[rows] = np.array(sizes, dtype=np.float64) * 72
+
+    edges = data.get("edges", [])
+    ends = np.array(
+        [(numbers[e["tail"]], numbers[e["head"]]) for e in edges],
+        dtype=np.intp,
+    ).reshape(-1, 2)
+
+    # Splines are lists of "x,y" points, separated by ";" if there are
+    # several, and preceded by the ends of arrows at their start ("s,")
+    # and end ("e,").
+    coordinates: list[str] = []
+    counts = [0]
+    for edge in edges:
+        tokens = [
+            t
+            for t in edge.get("pos", "").replace(";", " ").split()
+            if t[0] not in "es"
+        ]
+        coordinates.extend(tokens)
+        counts.append(len(tokens))
+    dimensions = _layout_dimensions(t.count(",") + 1 for t in coordinates)
+    points = np.array(
+        ",".join(coordinates).split(",") if coordinates else [],
+        dtype=np.float64,
+    ).reshape(-1, dimensions)
+
+    bounding_box = np.full(4, np.nan)
+    if "bb" in data:
+        bounding_box[:] = np.array(data["bb"].split(","), dtype=np.float64)
+
+    return LayoutPositions(
+        nodes=index,
+        positions=positions,
+        sizes=node_sizes,
+        edges=ends,
+        points=points,
+        offsets=np.cumsum(counts),
+        bounding_box=bounding_box,
+    )
+
+
+def _layout_dimensions(counts: Iterable[int]) -> int:
+    """Get the number of coordinates of the points of a layout."""
+    dimensions = set(counts)
+    if len(dimensions) > 1:
+        raise ValueError(
+            "Layout points have different numbers of coordinates: "
+            f"{sorted(dimensions)}"
+        )
+    return dimensions.pop() if dimensions else 2
+
+
+def _layout_objects(
+    data: dict[str, Any],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Split the objects of `json0` output into subgraphs and nodes.
+
+    Graphviz lists the `_subgraph_cnt` subgraphs first, even empty ones
+    that have no other key telling them apart from nodes.
+    """
+    objects = data.get("objects", [])
+    count = data.get("_subgraph_cnt", 0)
+    return objects[:count], objects[count:]
+
+
+def _is_cluster(graph_obj_dict: AttributeDict) -> bool:
+    """Check if Graphviz lays out a subgraph as a cluster."""
+    name = _graphviz_id(graph_obj_dict.get("name"))
+    if name is not None and name[:7].lower() == "cluster":
+        return True
+    return str(graph_obj_dict["attributes"].get("cluster")).lower() == "true"
+
+
+_DEFAULT_NAMES: Final = frozenset(("graph", "node", "edge"))
+
+# Attributes set by layout engines, as found in `json0` output.
+_GRAPH_LAYOUT_ATTRS: Final = ("bb", "lp", "lheight", "lwidth")
+_NODE_LAYOUT_ATTRS: Final = ("pos", "width", "height", "xlp", "rects")
+_EDGE_LAYOUT_ATTRS: Final = ("pos", "lp", "head_lp", "tail_lp", "xlp")
+
+_re_quoted_id: Final = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def _graphviz_id(ep: Any) -> str | None:
+    """Get the name Graphviz knows a node, edge endpoint or graph by.
+
+    Quotes and ports are removed. Returns None for subgraphs used as
+    edge endpoints.
+    """
+    if isinstance(ep, (int, float)):
+        return str(ep)
+    if not isinstance(ep, str):
+        return None
+    m = _re_quoted_id.match(ep)
+    if m:
+        return m.group(1).replace('\\"', '"')
+    return ep.split(":", 1)[0]
+
+
+def _endpoint_port(ep: Any) -> str | None:
+    """Get the port of an edge endpoint, None if it has none."""
+    if not isinstance(ep, str):
+        return None
+    m = _re_quoted_id.match(ep)
+    if m:
+        port = ep[m.end() + 1 :] if ep[m.end() :].startswith(":") else ""
+    else:
+        _, _, port = ep.partition(":")
+    return port or None
+
+
+def _new_graph_entry(
+    graph_obj_dict: AttributeDict, parent: int | None
+) -> AttributeDict:
+    """Describe a graph of a hierarchy, see `Graph.to_networkx`."""
+    return {
+        "name": _graphviz_id(graph_obj_dict["name"]) or "",
+        "parent": parent,
+        "graph": dict(graph_obj_dict["attributes"]),
+        "node": {},
+        "edge": {},
+        "nodes": [],
+        "edges": [],
+    }
+
+
+def _numeric_attribute(value: Any) -> float:
+    """Get the number held by an attribute value, 1 if it is unset."""
+    if value is None:
+        return 1.0
+    if isinstance(value, str):
+        value = value.strip('"')
+    return float(value)
+
+
+def _set_layout_attributes(
+    obj_dicts: list[AttributeDict],
+    layout: dict[str, Any],
+    names: Sequence[str],
+) -> None:
+    """Copy the layout attributes in `names` to elements."""
+    values = [(name, layout[name]) for name in names if name in layout]
+    for obj_dict in obj_dicts:
+        element = Common(obj_dict)
+        for name, value in values:
+            element.set(name, value)
+
+
+class _StagingDirectories:
+    """Directories holding the shape files of graphs, reused by renders.
+
+    Directories are looked up by the identity of the shape files, that
+    is their paths, inodes, sizes and modification times, so that a
+    directory is never reused once a file has been changed. The least
+    recently used directories beyond `size` are deleted, once no render
+    uses them anymore, and all of them at exit.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._dirs: collections.OrderedDict[tuple[Any, ...], str] = (
+            collections.OrderedDict()
+        )
+        self._users: dict[str, int] = {}
+        atexit.register(self.clear)
+
+    @contextlib.contextmanager
+    def use(self, shape_files: Sequence[str]) -> Iterator[str]:
+        """Provide a directory holding the shape files."""
+        key = tuple(_file_identity(path) for path in shape_files)
+
+        with self._lock:
+            path = self._dirs.get(key)
+            if path is not None:
+                self._dirs.move_to_end(key)
+                self._users[path] += 1
+
+        if path is None:
+            # Staged without holding the lock, as it may involve copies
+            new_path = tempfile.mkdtemp()  # type: ignore
+            try:
+                _stage_shape_files(shape_files, new_path)
+            except BaseException:
+                shutil.rmtree(new_path, ignore_errors=True)
+                raise
+            with self._lock:
+                path = self._dirs.setdefault(key, new_path)
+                self._users[path] = self._users.get(path, 0) + 1
+            if path != new_path:
+                shutil.rmtree(new_path, ignore_errors=True)
+
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._users[path] -= 1
+                self._evict(self.size)
+
+    def clear(self) -> None:
+        """Delete the directories not in use."""
+        with self._lock:
+            self._evict(0)
+
+    def _evict(self, size: int) -> None:
+        unused = [k for k, path in self._dirs.items() if not self._users[path]]
+        for key in unused[: max(0, len(self._dirs) - size)]:
+            path = self._dirs.pop(key)
+            del self._users[path]
+            shutil.rmtree(path, ignore_errors=True)
+
+
+_staging_directories = _StagingDirectories(size=8)
+
+
+def _file_identity(path: str) -> tuple[Any, ...]:
+    st = os.stat(path)
+    return (
+        os.path.abspath(path),
+        st.st_dev,
+        st.st_ino,
+        st.st_size,
+        st.st_mtime_ns,
+    )
+
+
+@contextlib.contextmanager
+def _shape_files_dir(shape_files: Sequence[str]) -> Iterator[str | None]:
+    """Provide a directory holding the shape files, to run Graphviz in.
+
+    The directory is shared by the renders of graphs using the same
+    shape files. Yields None if there are no shape files.
+    """
+    if not shape_files:
+        yield None
+        return
+
+    with _staging_directories.use(shape_files) as staging_dir:
+        yield staging_dir
+
+
+def _stage_shape_files(shape_files: Sequence[str], directory: str) -> None:
+    """Link or copy shape files to the directory Graphviz is run in."""
+    # For each of the image files, place it in the directory
+    # with the same filename as the original
+    for img in shape_files:
+        outfile = os.path.join(directory, os.path.basename(img))
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(outfile)
+        try:
+            os.link(img, outfile)
+            continue
+        except OSError:
+            pass
+        try:
+            os.symlink(os.path.abspath(img), outfile)
+            continue
+        except OSError:
+            pass
+        # Uses `sendfile` or similar where available.
+        shutil.copyfile(img, outfile)
+
+
+def _render(
+    prog: str,
+    arguments: list[str],
+    dot_data: bytes,
+    shape_files: Sequence[str],
+    limits: RenderLimits | None = None,
+) -> bytes:
+    """Run a Graphviz program on DOT data and return its output."""
+    with _shape_files_dir(shape_files) as working_dir:
+        with _prog_not_found_error(prog):
+            stdout_data, stderr_data, process = call_graphviz(
+                program=prog,
+                arguments=arguments,
+                working_dir=working_dir,
+                input=dot_data,
+                limits=limits,
+            )
+
+    _check_graphviz_result(
+        prog, arguments, process.returncode, stdout_data, stderr_data
+    )
+
+    return stdout_data
+
+
+def _stream(
+    prog: str,
+    arguments: list[str],
+    dot_data: bytes,
+    shape_files: Sequence[str],
+    chunk_size: int,
+    limits: RenderLimits | None,
+) -> Iterator[bytes]:
+    """Run a Graphviz program on DOT data, yielding its output in chunks."""
+    kwargs: dict[str, Any] = {}
+    with _shape_files_dir(shape_files) as working_dir:
+        with _prog_not_found_error(prog):
+            program_with_args, env = _graphviz_command(prog, arguments, kwargs)
+            if limits is not None:
+                limits._prepare(kwargs)
+            process = subprocess.Popen(
+                program_with_args,
+                env=env,
+                cwd=working_dir,
+                shell=False,
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                **kwargs,
             )
+        assert process.stdin and process.stdout and process.stderr
+        stdin, stdout, stderr = process.stdin, process.stdout, process.stderr
+
+        # Feeding the input and draining the errors happen in threads, so
+        # that the program never blocks on a full pipe.
+        stderr_chunks: list[bytes] = []
+
+        def feed() -> None:
+            with contextlib.suppress(BrokenPipeError), stdin:
+                stdin.write(dot_data)
+
+        threads = [
+            threading.Thread(target=feed, daemon=True),
+            threading.Thread(
+                target=lambda: stderr_chunks.append(stderr.read()),
+                daemon=True,
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+
+        timer = None
+        timed_out = threading.Event()
+        if limits is not None:
+            limits._apply(process.pid)
+            if limits.timeout is not None:
+
+                def stop() -> None:
+                    timed_out.set()
+                    process.kill()
+
+                timer = threading.Timer(limits.timeout, stop)
+                timer.start()
+
+        try:
+            with stdout:
+                while chunk := os.read(stdout.fileno(), chunk_size):
+                    yield chunk
+            process.wait()
+        finally:
+            if process.returncode is None:
+                # The consumer stopped early, or the timeout fired.
+                process.kill()
+                process.wait()
+            if timer is not None:
+                timer.cancel()
+            for thread in threads:
+                thread.join()
+            stderr.close()
+
+    stderr_data = b"".join(stderr_chunks)
+    if limits is not None:
+        if timed_out.is_set():
+            limits._exceeded(prog, "timeout")
+        limits._check(prog, process.returncode, stderr_data)
+    _check_graphviz_result(
+        prog, arguments, process.returncode, b"", stderr_data
+    )
+
 
-        assert process.returncode == 0, (
-            f'"{prog}" with args {arguments} '
-            f"returned code: {process.returncode}"
+@contextlib.contextmanager
+def _prog_not_found_error(prog: str) -> Iterator[None]:
+    """Reword the error raised when a Graphviz program doesn't exist."""
+    try:
+        yield
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            args = list(e.args)
+            args[1] = f'"{prog}" not found in path.'
+            raise OSError(*args)
+        else:
+            raise  # pragma: no cover
+
+
+def _check_graphviz_result(
+    prog: str,
+    arguments: list[str],
+    returncode: int | None,
+    stdout_data: bytes,
+    stderr_data: bytes,
+) -> None:
+    """Report a Graphviz program's failure and raise `AssertionError`."""
+    if returncode != 0:
+        print(
+            f'"{prog}" with args {arguments} returned code: {returncode}\n\n'
+            f"stdout, stderr:\n"
+            f" {stdout_data.decode('utf-8', errors='replace')}\n"
+            f" {stderr_data.decode('utf-8', errors='replace')}\n"
         )
 
-        return stdout_data
+    assert returncode == 0, (
+        f'"{prog}" with args {arguments} returned code: {returncode}'
+    )
 
 
 __generate_format_methods(Dot)
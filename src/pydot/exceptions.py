@@ -28,3 +28,16 @@ class Error(PydotException):
 
     def __str__(self) -> str:
         return self.value
+
+
+class GraphvizLimitError(Error):
+    """A Graphviz program was stopped for exceeding a resource limit.
+
+    `limit` names the limit that was exceeded, one of `'timeout'`,
+    `'cpu_time'` and `'memory'`, see `RenderLimits`.
+    """
+
+    def __init__(self, value: str, program: str, limit: str) -> None:
+        super().__init__(value)
+        self.program = program
+        self.limit = limit
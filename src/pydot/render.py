@@ -0,0 +1,563 @@
+# SPDX-FileCopyrightText: 2025 pydot contributors
+#
+# SPDX-License-Identifier: MIT
+
+"""Rendering of many graphs with few Graphviz processes."""
+
+from __future__ import annotations
+
+import abc
+import collections
+import contextlib
+import functools
+import hashlib
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Iterable, Iterator, NamedTuple, Sequence
+
+import pydot
+import pydot.core
+from pydot._vendor import tempfile
+
+_logger = logging.getLogger(__name__)
+_logger.debug("pydot render module initializing")
+
+
+class _RenderJob:
+    """A graph waiting to be rendered by a `RenderPool`."""
+
+    def __init__(
+        self,
+        dot_data: bytes,
+        prog: str,
+        args: list[str],
+        format: str,
+        shape_files: Sequence[str],
+        limits: pydot.core.RenderLimits | None,
+    ) -> None:
+        self.dot_data = dot_data
+        self.prog = prog
+        self.args = args
+        self.format = format
+        self.shape_files = list(shape_files)
+        self.limits = limits
+        self.future: Future[bytes] = Future()
+
+    @property
+    def arguments(self) -> list[str]:
+        return [f"-T{self.format}"] + self.args
+
+    @property
+    def batch_key(self) -> tuple[object, ...] | None:
+        """Jobs with equal keys can be rendered by the same process.
+
+        Limits apply to single graphs, so jobs with limits are rendered
+        on their own and have no key.
+        """
+        if self.limits is not None:
+            return None
+        return (
+            self.prog,
+            tuple(self.args),
+            self.format,
+            tuple(self.shape_files),
+        )
+
+    def run(self) -> None:
+        """Render the graph on its own and resolve the future."""
+        try:
+            data = pydot.core._render(
+                self.prog,
+                self.arguments,
+                self.dot_data,
+                self.shape_files,
+                self.limits,
+            )
+        except Exception as e:
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(data)
+
+
+class RenderPool:
+    """Renders graphs using a bounded number of Graphviz processes.
+
+    Starting a Graphviz program costs more than laying out and rendering
+    most small graphs, because of the plugins and fonts it loads. A
+    `RenderPool` amortizes this cost when many graphs are rendered
+    concurrently: graphs submitted while all its workers are busy are
+    queued, and each worker takes a batch of queued graphs that use the
+    same program, arguments and format, and renders all of them with a
+    single run of the program. Each graph is written to its own input
+    file and Graphviz writes each result to a separate output file
+    (`-O`), so results are never mixed up.
+
+    If Graphviz reports an error for a batch, its graphs are rendered
+    again one by one, so that errors are reported for the right graph,
+    exactly as `Dot.create` would.
+
+        with pydot.RenderPool(workers=4) as pool:
+            png = graph.create_png(pool=pool)
+
+    A pool can be shared by any number of threads. Its worker threads
+    are started on demand and stop when the pool is closed.
+
+    @param workers: maximum number of concurrent Graphviz processes,
+      defaults to the number of CPUs.
+    @param max_batch: maximum number of graphs rendered by one process.
+    """
+
+    def __init__(self, workers: int | None = None, max_batch: int = 64):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1 or max_batch < 1:
+            raise ValueError("workers and max_batch must be at least 1")
+
+        self.workers = workers
+        self.max_batch = max_batch
+
+        self._pending: collections.deque[_RenderJob] = collections.deque()
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._idle = 0
+        self._closed = False
+
+    def __enter__(self) -> RenderPool:
+        return self
+
+    def __exit__(
+        self, exc_type: object, exc_val: object, exc_tb: object
+    ) -> None:
+        self.close()
+
+    def submit(
+        self,
+        graph: pydot.core.Dot,
+        prog: list[str] | tuple[str] | str | None = None,
+        format: str = "ps",
+        encoding: str | None = None,
+        limits: pydot.core.RenderLimits | None = None,
+    ) -> Future[bytes]:
+        """Queue a graph for rendering.
+
+        The arguments have the same meaning as for `Dot.create`. The
+        graph is serialized before this method returns, so it can be
+        modified right away. Returns a `concurrent.futures.Future`
+        resolving to the output of the program.
+        """
+        prog, args = graph._split_prog(prog)
+        return self._submit_data(
+            graph._encode_dot(encoding),
+            prog,
+            args,
+            format,
+            graph.shape_files,
+            limits,
+        )
+
+    def _submit_data(
+        self,
+        dot_data: bytes,
+        prog: str,
+        args: list[str],
+        format: str,
+        shape_files: Sequence[str],
+        limits: pydot.core.RenderLimits | None = None,
+    ) -> Future[bytes]:
+        """Queue DOT data for rendering."""
+        job = _RenderJob(dot_data, prog, args, format, shape_files, limits)
+
+        with self._condition:
+            if self._closed:
+                raise pydot.Error("Cannot submit graphs to a closed pool.")
+            self._pending.append(job)
+            if self._idle:
+                self._condition.notify()
+            elif len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"pydot-render-{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+
+        return job.future
+
+    def create(
+        self,
+        graph: pydot.core.Dot,
+        prog: list[str] | tuple[str] | str | None = None,
+        format: str = "ps",
+        encoding: str | None = None,
+        limits: pydot.core.RenderLimits | None = None,
+    ) -> bytes:
+        """Render a graph and return the output, like `Dot.create`."""
+        return self.submit(graph, prog, format, encoding, limits).result()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the workers, once all queued graphs are rendered.
+
+        If `wait` is true, wait for the workers to finish.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _take_batch(self) -> list[_RenderJob]:
+        """Take the oldest pending job and compatible ones off the queue."""
+        first = self._pending.popleft()
+        batch = [first]
+        if first.batch_key is not None:
+            remaining: collections.deque[_RenderJob] = collections.deque()
+            while self._pending:
+                job = self._pending.popleft()
+                if (
+                    len(batch) < self.max_batch
+                    and job.batch_key == first.batch_key
+                ):
+                    batch.append(job)
+                else:
+                    remaining.append(job)
+            self._pending = remaining
+        return [
+            job for job in batch if job.future.set_running_or_notify_cancel()
+        ]
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                self._idle += 1
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                self._idle -= 1
+                if not self._pending:
+                    return
+                batch = self._take_batch()
+
+            if len(batch) == 1:
+                batch[0].run()
+            elif batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch: list[_RenderJob]) -> None:
+        """Render several graphs with a single run of a program."""
+        first = batch[0]
+        names = [f"g{i}.gv" for i in range(len(batch))]
+        _logger.debug("rendering %d graphs with %s", len(batch), first.prog)
+
+        results: list[bytes | None] = [None] * len(batch)
+        try:
+            # The program runs in the same directory as for a single graph,
+            # so that relative paths in the graphs resolve the same way.
+            # Input and output files are kept apart, in a temporary one.
+            with tempfile.TemporaryDirectory(
+                ignore_cleanup_errors=True
+            ) as tmp_dir, pydot.core._shape_files_dir(  # type: ignore
+                first.shape_files
+            ) as working_dir:
+                paths = [os.path.join(tmp_dir, name) for name in names]
+                for path, job in zip(paths, batch):
+                    with open(path, "wb") as f:
+                        f.write(job.dot_data)
+
+                with pydot.core._prog_not_found_error(first.prog):
+                    _, _, process = pydot.core.call_graphviz(
+                        program=first.prog,
+                        arguments=first.arguments + ["-O"] + paths,
+                        working_dir=working_dir,
+                    )
+
+                if process.returncode == 0:
+                    # The output file name is the input file name, followed
+                    # by an extension derived from the format.
+                    outputs = {
+                        out.split(".gv.", 1)[0]: out
+                        for out in os.listdir(tmp_dir)
+                        if ".gv." in out
+                    }
+                    for i, name in enumerate(names):
+                        out = outputs.get(name[: -len(".gv")])
+                        if out is not None:
+                            with open(os.path.join(tmp_dir, out), "rb") as f:
+                                results[i] = f.read()
+        except Exception as e:
+            for job in batch:
+                job.future.set_exception(e)
+            return
+
+        for job, data in zip(batch, results):
+            if data is None:
+                job.run()
+            else:
+                job.future.set_result(data)
+
+
+class RenderResult(NamedTuple):
+    """The outcome of rendering one of the graphs given to `render_many`.
+
+    Exactly one of `data` and `error` is not None.
+    """
+
+    position: int
+    graph: pydot.core.Dot
+    data: bytes | None
+    error: BaseException | None
+
+
+def render_many(
+    graphs: Iterable[pydot.core.Dot],
+    format: str = "ps",
+    prog: list[str] | tuple[str] | str | None = None,
+    encoding: str | None = None,
+    workers: int | None = None,
+    pool: RenderPool | None = None,
+    limits: pydot.core.RenderLimits | None = None,
+) -> Iterator[RenderResult]:
+    """Render many graphs in parallel, yielding results as they complete.
+
+    The graphs are rendered by a `RenderPool`, with at most `workers`
+    Graphviz processes running at a time (by default, one per CPU). If
+    `pool` is given, it is used instead of a new pool and is left open.
+
+    Results are yielded in completion order, as `RenderResult` tuples
+    holding the position of the graph in `graphs`. A graph that fails to
+    render doesn't stop the others: its result holds the error that
+    `Dot.create` would have raised instead of the output.
+
+    `graphs` may be a lazy iterable; only a bounded number of graphs is
+    serialized ahead of the rendering.
+
+    If `limits` are given, each graph is rendered by its own process,
+    stopped if it exceeds them.
+    """
+    own_pool = pool is None
+    if pool is None:
+        pool = RenderPool(workers)
+    limit = pool.workers * pool.max_batch
+    pending: dict[Future[bytes], tuple[int, pydot.core.Dot]] = {}
+    done: queue.SimpleQueue[Future[bytes]] = queue.SimpleQueue()
+
+    def result(future: Future[bytes]) -> RenderResult:
+        position, graph = pending.pop(future)
+        error = future.exception()
+        if error is None:
+            return RenderResult(position, graph, future.result(), None)
+        return RenderResult(position, graph, None, error)
+
+    try:
+        for position, graph in enumerate(graphs):
+            try:
+                future = pool.submit(graph, prog, format, encoding, limits)
+            except Exception as e:
+                yield RenderResult(position, graph, None, e)
+                continue
+            pending[future] = (position, graph)
+            future.add_done_callback(done.put)
+            if len(pending) >= limit:
+                yield result(done.get())
+            while not done.empty():
+                yield result(done.get())
+        while pending:
+            yield result(done.get())
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_pool:
+            pool.close(wait=False)
+
+
+class RenderCache(abc.ABC):
+    """Base class of caches for the output of Graphviz programs.
+
+    A cache is passed to `Dot.create` (or `Dot.write` and the
+    `create_*`/`write_*` methods) as `cache`. Outputs are stored under a
+    key derived from all the inputs of the program: the DOT data, the
+    program and its arguments (including the format), the names and
+    contents of the shape files, and the version of Graphviz.
+
+    Subclasses implement `get` and `put`. Implementations must be safe
+    to use from several threads.
+    """
+
+    def key(
+        self,
+        prog: str,
+        arguments: list[str],
+        dot_data: bytes,
+        shape_files: Sequence[str],
+    ) -> str:
+        """Compute the cache key of a render."""
+        h = hashlib.sha256()
+
+        def add(data: bytes) -> None:
+            h.update(len(data).to_bytes(8, "big"))
+            h.update(data)
+
+        add(pydot.core.get_graphviz().banner(prog))
+        for arg in [prog, *arguments]:
+            add(arg.encode())
+        add(dot_data)
+        for path in shape_files:
+            add(os.path.basename(path).encode())
+            add(_file_digest(pydot.core._file_identity(path)))
+        return h.hexdigest()
+
+    @abc.abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Return the output stored under `key`, or None."""
+
+    @abc.abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        """Store an output under `key`."""
+
+
+@functools.lru_cache(maxsize=256)
+def _file_digest(identity: tuple[object, ...]) -> bytes:
+    """Hash the contents of a file, given its `_file_identity`.
+
+    The identity changes along with the file, so digests are only
+    computed again for changed files.
+    """
+    path = identity[0]
+    assert isinstance(path, str)
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+class MemoryRenderCache(RenderCache):
+    """A least recently used cache of outputs held in memory.
+
+    @param max_bytes: the maximum total size of the outputs held.
+      Outputs larger than this are not cached.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: collections.OrderedDict[str, bytes] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        """Remove all outputs from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class DirectoryRenderCache(RenderCache):
+    """A cache of outputs stored as files in a directory.
+
+    The directory is created if needed, and can be shared by several
+    processes. When the total size of the files exceeds `max_bytes`,
+    the least recently used ones are deleted.
+
+    @param path: the directory holding the cache.
+    @param max_bytes: the maximum total size of the files, or None for
+      no limit.
+    """
+
+    _suffix = ".out"
+
+    def __init__(self, path: str, max_bytes: int | None = 1024**3):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        # The total size of the files, as far as this instance knows.
+        # Only scanned again when it exceeds `max_bytes`, as other
+        # processes may have changed the directory meanwhile.
+        self._size = sum(size for _, size, _ in self._scan())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.path, key + self._suffix)
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # The modification time records the last use, for eviction.
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        try:
+            replaced = os.stat(path).st_size
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += len(data) - replaced
+            if self.max_bytes is not None and self._size > self.max_bytes:
+                self._evict(self.max_bytes)
+
+    def _scan(self) -> list[tuple[float, int, str]]:
+        """List the modification times, sizes and paths of the files."""
+        files = []
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if not entry.name.endswith(self._suffix):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, entry.path))
+        return files
+
+    def _evict(self, max_bytes: int) -> None:
+        """Delete the least recently used files beyond `max_bytes`."""
+        files = sorted(self._scan())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        """Remove all outputs from the cache."""
+        with self._lock:
+            self._evict(0)
@@ -0,0 +1,826 @@
+# SPDX-FileCopyrightText: 2025 pydot contributors
+#
+# SPDX-License-Identifier: MIT
+
+"""Binary snapshots of graphs, for fast saving and loading.
+
+A snapshot stores a graph hierarchy in columns of fixed-size integers,
+which are loaded with a few bulk copies instead of being parsed:
+
+- a table of all distinct values used in the graph (names, attribute
+  keys and values), strings being stored as one UTF-8 text,
+- a table of all distinct attribute dictionaries, as lists of value
+  numbers,
+- a table of the graphs, in preorder, so that the subgraphs of each
+  graph are stored right after it,
+- node and edge tables, with a column per property, in which the
+  elements of each graph are stored together.
+
+Snapshots are written by `Dot.dump_binary` and read by `load_binary`
+or, to load only some subgraphs, `GraphSnapshot`.
+"""
+
+from __future__ import annotations
+
+import array
+import itertools
+import logging
+import mmap
+import os
+import pickle
+import struct
+import sys
+from typing import Any, Iterable, Iterator
+
+import pydot
+import pydot.core
+from pydot.classes import FrozenDict, SharedAttributes, intern_attributes
+
+_logger = logging.getLogger(__name__)
+_logger.debug("pydot snapshot module initializing")
+
+_MAGIC = b"PYDOTBIN"
+_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<QQ")
+
+# A 32-bit unsigned type, "I" on all common platforms.
+_U32 = next(code for code in "ILH" if array.array(code).itemsize == 4)
+
+# Sections of a snapshot, in file order, with their array type codes.
+_SECTIONS = {
+    "value_tags": "B",
+    "value_text_offsets": "Q",
+    "value_text": "",
+    "value_payloads": "q",
+    "pickle_offsets": "Q",
+    "pickles": "",
+    "attribute_offsets": "Q",
+    "attribute_flags": "B",
+    "attribute_keys": _U32,
+    "attribute_values": _U32,
+    "graphs": "q",
+    "node_names": _U32,
+    "node_ports": _U32,
+    "node_attributes": _U32,
+    "node_sequences": "q",
+    "edge_sources": _U32,
+    "edge_destinations": _U32,
+    "edge_attributes": _U32,
+    "edge_sequences": "q",
+    "dot": _U32,
+}
+
+# Value tags. Values other than strings have a payload: the value of
+# integers, the bits of floats, the position of a pickled value or of a
+# subgraph used as an edge endpoint, or 0.
+_STR, _NONE, _FALSE, _TRUE, _INT, _FLOAT, _PICKLE, _ENDPOINT = range(8)
+
+# Fields of the rows of the graph table.
+_GRAPH_FIELDS = (
+    "name",
+    "type",
+    "flags",
+    "attributes",
+    "current_child_sequence",
+    "sequence",
+    "parent",
+    "node_start",
+    "node_stop",
+    "edge_start",
+    "edge_stop",
+    "end",
+)
+_GRAPH_WIDTH = len(_GRAPH_FIELDS)
+(
+    _NAME,
+    _TYPE,
+    _FLAGS,
+    _ATTRIBUTES,
+    _CHILD_SEQUENCE,
+    _SEQUENCE,
+    _PARENT,
+    _NODE_START,
+    _NODE_STOP,
+    _EDGE_START,
+    _EDGE_STOP,
+    _END,
+) = range(_GRAPH_WIDTH)
+
+# Graph flags
+_STRICT = 1
+_SUPPRESS_DISCONNECTED = 2
+_SIMPLIFY = 4
+_HAS_SHOW_KEYWORD = 8
+_SHOW_KEYWORD = 16
+
+# Sequence numbers of elements that don't have one.
+_NO_SEQUENCE = -1
+
+
+class _Encoder:
+    """Convert a graph hierarchy into the sections of a snapshot."""
+
+    def __init__(self) -> None:
+        self.values: dict[Any, int] = {}
+        self.value_tags = array.array("B")
+        self.value_text: list[str] = []
+        self.value_text_offsets = array.array("Q", [0])
+        self.value_payloads = array.array("q")
+        self.pickles: list[bytes] = []
+        self.pickle_offsets = array.array("Q", [0])
+        self.endpoints: list[FrozenDict] = []
+
+        self.attributes: dict[Any, int] = {}
+        self.attribute_items: dict[Any, int] = {}
+        self.shared_attributes: dict[int, int] = {}
+        self.attribute_offsets = array.array("Q", [0])
+        self.attribute_flags = array.array("B")
+        self.attribute_keys = array.array(_U32)
+        self.attribute_values = array.array(_U32)
+
+        self.graphs = array.array("q")
+        self.node_names = array.array(_U32)
+        self.node_ports = array.array(_U32)
+        self.node_attributes = array.array(_U32)
+        self.node_sequences = array.array("q")
+        self.edge_sources = array.array(_U32)
+        self.edge_destinations = array.array(_U32)
+        self.edge_attributes = array.array(_U32)
+        self.edge_sequences = array.array("q")
+        self.dot = array.array(_U32)
+
+        self._text_length = 0
+
+    def value(self, value: Any) -> int:
+        """Get the number of a value, adding it to the table if needed."""
+        # Equal values of different types, like 1 and True, are kept
+        # apart. Tuples are never equal to strings.
+        key = value if type(value) is str else (type(value), value)
+        try:
+            number = self.values.get(key)
+        except TypeError:
+            # Unhashable values are pickled, and never shared.
+            return self._add_value(value, None)
+        if number is None:
+            number = self._add_value(value, key)
+        return number
+
+    def numbers(self, values: list[Any]) -> list[int]:
+        """Get the numbers of many values, mostly known strings."""
+        known = self.values
+        value = self.value
+        return [
+            known[item] if type(item) is str and item in known else value(item)
+            for item in values
+        ]
+
+    def _add_value(self, value: Any, key: Any) -> int:
+        number = len(self.value_tags)
+        if key is not None:
+            self.values[key] = number
+
+        if isinstance(value, str):
+            self.value_tags.append(_STR)
+            self.value_text.append(value)
+            self._text_length += len(value)
+            self.value_text_offsets.append(self._text_length)
+            return number
+
+        self.value_text_offsets.append(self._text_length)
+        if value is None:
+            self.value_tags.append(_NONE)
+            self.value_payloads.append(0)
+        elif value is False or value is True:
+            self.value_tags.append(_TRUE if value else _FALSE)
+            self.value_payloads.append(0)
+        elif type(value) is int and -(2**63) <= value < 2**63:
+            self.value_tags.append(_INT)
+            self.value_payloads.append(value)
+        elif type(value) is float:
+            self.value_tags.append(_FLOAT)
+            bits = struct.unpack("<q", struct.pack("<d", value))[0]
+            self.value_payloads.append(bits)
+        elif isinstance(value, FrozenDict) and "nodes" in value:
+            # A subgraph used as edge endpoint, stored after the others
+            self.value_tags.append(_ENDPOINT)
+            self.value_payloads.append(len(self.endpoints))
+            self.endpoints.append(value)
+        else:
+            self.value_tags.append(_PICKLE)
+            self.value_payloads.append(len(self.pickles))
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            self.pickles.append(data)
+            self.pickle_offsets.append(self.pickle_offsets[-1] + len(data))
+        return number
+
+    def attribute_dict(self, attributes: Any) -> int:
+        """Get the number of an attribute dictionary, adding it if needed."""
+        if type(attributes) is dict:
+            # Most elements have equal attributes, found by their items
+            # without numbering them all again. Types are compared too,
+            # since 1 == True.
+            try:
+                key = (
+                    tuple(attributes.items()),
+                    tuple(map(type, attributes.values())),
+                )
+                number = self.attribute_items.get(key)
+            except TypeError:
+                return self._add_attribute_dict(attributes, False)
+            if number is None:
+                number = self.attribute_items[key] = self._add_attribute_dict(
+                    attributes, False
+                )
+            return number
+
+        shared = isinstance(attributes, SharedAttributes)
+        if shared:
+            # Interned, so equal dictionaries are the same object.
+            number = self.shared_attributes.get(id(attributes))
+            if number is None:
+                number = self.shared_attributes[id(attributes)] = (
+                    self._add_attribute_dict(attributes, True)
+                )
+            return number
+        return self._add_attribute_dict(attributes, False)
+
+    def _add_attribute_dict(self, attributes: Any, shared: bool) -> int:
+        value = self.value
+        keys = tuple(map(value, attributes))
+        values = tuple(map(value, attributes.values()))
+        key = (shared, keys, values)
+        number = self.attributes.get(key)
+        if number is None:
+            number = self.attributes[key] = len(self.attribute_flags)
+            self.attribute_flags.append(shared)
+            self.attribute_keys.extend(keys)
+            self.attribute_values.extend(values)
+            self.attribute_offsets.append(len(self.attribute_keys))
+        return number
+
+    def graph(self, obj_dict: Any, parent: int) -> None:
+        """Add a graph and its subgraphs, in preorder."""
+        position = len(self.graphs) // _GRAPH_WIDTH
+        flags = (
+            _STRICT * bool(obj_dict.get("strict"))
+            | _SUPPRESS_DISCONNECTED
+            * bool(obj_dict.get("suppress_disconnected"))
+            | _SIMPLIFY * bool(obj_dict.get("simplify"))
+        )
+        if "show_keyword" in obj_dict:
+            flags |= _HAS_SHOW_KEYWORD
+            if obj_dict["show_keyword"]:
+                flags |= _SHOW_KEYWORD
+        sequence = obj_dict.get("sequence")
+
+        value = self.value
+        attribute_dict = self.attribute_dict
+
+        nodes = [
+            (name, node)
+            for name, bucket in obj_dict["nodes"].items()
+            for node in bucket
+        ]
+        node_start = len(self.node_names)
+        self.node_names.extend(self.numbers([name for name, _ in nodes]))
+        self.node_ports.extend(
+            self.numbers([node.get("port") for _, node in nodes])
+        )
+        self.node_attributes.extend(
+            [attribute_dict(node["attributes"]) for _, node in nodes]
+        )
+        self.node_sequences.extend(_sequences(node for _, node in nodes))
+
+        edges = [
+            (points, edge)
+            for points, bucket in obj_dict["edges"].items()
+            for edge in bucket
+        ]
+        edge_start = len(self.edge_sources)
+        self.edge_sources.extend(self.numbers([pts[0] for pts, _ in edges]))
+        self.edge_destinations.extend(
+            self.numbers([pts[1] for pts, _ in edges])
+        )
+        self.edge_attributes.extend(
+            [attribute_dict(edge["attributes"]) for _, edge in edges]
+        )
+        self.edge_sequences.extend(_sequences(edge for _, edge in edges))
+
+        row = [
+            value(obj_dict.get("name")),
+            value(obj_dict.get("type")),
+            flags,
+            attribute_dict(obj_dict["attributes"]),
+            obj_dict.get("current_child_sequence", 1),
+            _NO_SEQUENCE if sequence is None else sequence,
+            parent,
+            node_start,
+            len(self.node_names),
+            edge_start,
+            len(self.edge_sources),
+            0,  # Set once the subgraphs are added
+        ]
+        self.graphs.extend(row)
+
+        for sgraphs in obj_dict["subgraphs"].values():
+            for sgraph in sgraphs:
+                self.graph(sgraph, position)
+        self.graphs[position * _GRAPH_WIDTH + _END] = (
+            len(self.graphs) // _GRAPH_WIDTH
+        )
+
+    def hierarchy(self, obj_dict: Any) -> None:
+        """Add a whole graph hierarchy."""
+        self.graph(obj_dict, -1)
+        # Subgraphs used as edge endpoints follow, as separate
+        # hierarchies, in the order they are first used. They can use
+        # other subgraphs as endpoints in turn.
+        for endpoint in itertools.count():
+            if endpoint == len(self.endpoints):
+                break
+            self.graph(self.endpoints[endpoint], -1)
+
+    def sections(self) -> list[Any]:
+        """Get the contents of the sections, in file order."""
+        contents = {
+            name: getattr(self, name)
+            for name in _SECTIONS
+            if name not in ("value_text", "pickles")
+        }
+        contents["value_text"] = "".join(self.value_text).encode()
+        contents["pickles"] = b"".join(self.pickles)
+        return [contents[name] for name in _SECTIONS]
+
+
+def _sequences(obj_dicts: Iterable[Any]) -> list[int]:
+    return [
+        _NO_SEQUENCE if obj.get("sequence") is None else obj["sequence"]
+        for obj in obj_dicts
+    ]
+
+
+def _encode(graph: pydot.core.Graph) -> list[Any]:
+    """Encode a graph as a list of buffers, in the snapshot format."""
+    encoder = _Encoder()
+    encoder.hierarchy(graph.obj_dict)
+    if isinstance(graph, pydot.core.Dot):
+        value = encoder.value
+        encoder.dot.append(value(graph.prog))
+        encoder.dot.append(len(graph.shape_files))
+        encoder.dot.extend(map(value, graph.shape_files))
+        encoder.dot.append(len(graph.formats))
+        encoder.dot.extend(map(value, sorted(graph.formats)))
+    sections = encoder.sections()
+    if sys.byteorder == "big":
+        for contents in sections:
+            if isinstance(contents, array.array):
+                contents.byteswap()
+
+    header = bytearray(_HEADER.pack(_MAGIC, _VERSION, len(sections)))
+    offset = len(header) + _SECTION.size * len(sections)
+    buffers: list[Any] = [header]
+    for contents in sections:
+        size = memoryview(contents).nbytes
+        padding = -offset % 8
+        if padding:
+            buffers.append(bytes(padding))
+            offset += padding
+        header += _SECTION.pack(offset, size)
+        buffers.append(contents)
+        offset += size
+    return buffers
+
+
+class _Decoder:
+    """Materialize graphs from the sections of a snapshot."""
+
+    def __init__(self, buffer: Any) -> None:
+        self._view = memoryview(buffer).cast("B")
+        try:
+            self._check_header()
+        except BaseException:
+            self._view.release()
+            raise
+        self._sections = {
+            name: _SECTION.unpack_from(
+                self._view, _HEADER.size + i * _SECTION.size
+            )
+            for i, name in enumerate(_SECTIONS)
+        }
+        self.graphs = self.column("graphs")
+        self.value_tags = self.column("value_tags")
+        self._text: str | None = None
+        self._text_offsets: array.array[int] | None = None
+        self._payloads: dict[int, int] | None = None
+        self._values: dict[int, Any] = {}
+        self._all_values: list[Any] | None = None
+        self._attributes: dict[int, Any] = {}
+        self._endpoint_graphs: list[int] | None = None
+        self._endpoints: dict[int, FrozenDict] = {}
+
+    def release(self) -> None:
+        self._view.release()
+
+    def _check_header(self) -> None:
+        if self._view.nbytes < _HEADER.size + len(_SECTIONS) * _SECTION.size:
+            raise pydot.Error("Not a pydot graph snapshot")
+        magic, version, count = _HEADER.unpack_from(self._view)
+        if magic != _MAGIC:
+            raise pydot.Error("Not a pydot graph snapshot")
+        if version != _VERSION or count != len(_SECTIONS):
+            raise pydot.Error(
+                f"Unsupported pydot graph snapshot version: {version}"
+            )
+
+    def raw(self, name: str) -> memoryview:
+        offset, size = self._sections[name]
+        return self._view[offset : offset + size]
+
+    def column(
+        self, name: str, start: int = 0, stop: int | None = None
+    ) -> array.array[Any]:
+        """Copy a column, or the rows `start` to `stop` of it."""
+        column = array.array(_SECTIONS[name])
+        offset, size = self._sections[name]
+        width = column.itemsize
+        end = offset + size if stop is None else offset + stop * width
+        with self._view[offset + start * width : end] as data:
+            column.frombytes(data)
+        if sys.byteorder == "big":
+            column.byteswap()
+        return column
+
+    def graph_row(self, position: int) -> array.array[int]:
+        start = position * _GRAPH_WIDTH
+        return self.graphs[start : start + _GRAPH_WIDTH]
+
+    # Values
+
+    def text(self) -> tuple[str, array.array[int]]:
+        if self._text is None or self._text_offsets is None:
+            with self.raw("value_text") as data:
+                self._text = str(data, "utf-8")
+            self._text_offsets = self.column("value_text_offsets")
+        return self._text, self._text_offsets
+
+    def payloads(self) -> dict[int, int]:
+        """Map the numbers of values other than strings to payloads."""
+        if self._payloads is None:
+            others = itertools.compress(
+                itertools.count(), (tag != _STR for tag in self.value_tags)
+            )
+            self._payloads = dict(zip(others, self.column("value_payloads")))
+        return self._payloads
+
+    def value(self, number: int) -> Any:
+        if self._all_values is not None:
+            return self._all_values[number]
+        try:
+            return self._values[number]
+        except KeyError:
+            pass
+        tag = self.value_tags[number]
+        if tag == _STR:
+            text, offsets = self.text()
+            value = text[offsets[number] : offsets[number + 1]]
+        else:
+            value = self._other_value(tag, self.payloads()[number])
+        self._values[number] = value
+        return value
+
+    def all_values(self) -> list[Any]:
+        """Decode all values at once, faster than one by one."""
+        if self._all_values is None:
+            text, offsets = self.text()
+            values: list[Any] = [
+                text[start:stop] for start, stop in zip(offsets, offsets[1:])
+            ]
+            for number, payload in self.payloads().items():
+                tag = self.value_tags[number]
+                values[number] = self._other_value(tag, payload)
+            self._all_values = values
+        return self._all_values
+
+    def _other_value(self, tag: int, payload: int) -> Any:
+        if tag == _NONE:
+            return None
+        if tag == _FALSE:
+            return False
+        if tag == _TRUE:
+            return True
+        if tag == _INT:
+            return payload
+        if tag == _FLOAT:
+            return struct.unpack("<d", struct.pack("<q", payload))[0]
+        if tag == _PICKLE:
+            start, stop = self.column("pickle_offsets", payload, payload + 2)
+            offset = self._sections["pickles"][0]
+            with self._view[offset + start : offset + stop] as data:
+                return pickle.loads(data)
+        if tag == _ENDPOINT:
+            return self.endpoint(payload)
+        raise pydot.Error(f"Invalid value in pydot graph snapshot: {tag}")
+
+    def attribute_dict(self, number: int) -> Any:
+        """Get a new attribute dictionary, or a shared one."""
+        try:
+            attributes = self._attributes[number]
+        except KeyError:
+            start, stop = self.column("attribute_offsets", number, number + 2)
+            flags = self.column("attribute_flags", number, number + 1)
+            attributes = self._attributes[number] = self._attribute_dict(
+                self.column("attribute_keys", start, stop),
+                self.column("attribute_values", start, stop),
+                flags[0],
+            )
+        if isinstance(attributes, SharedAttributes):
+            return attributes
+        return dict(attributes)
+
+    def all_attributes(self) -> None:
+        """Decode all attribute dictionaries at once."""
+        offsets = self.column("attribute_offsets")
+        keys = self.column("attribute_keys")
+        values = self.column("attribute_values")
+        for number, (flag, start, stop) in enumerate(
+            zip(self.column("attribute_flags"), offsets, offsets[1:])
+        ):
+            self._attributes[number] = self._attribute_dict(
+                keys[start:stop], values[start:stop], flag
+            )
+
+    def _attribute_dict(
+        self, keys: array.array[int], values: array.array[int], shared: int
+    ) -> Any:
+        value = self.value
+        attributes = {value(k): value(v) for k, v in zip(keys, values)}
+        if shared:
+            return intern_attributes(attributes)
+        return attributes
+
+    # Graphs
+
+    def endpoint(self, ordinal: int) -> FrozenDict:
+        """Get a subgraph used as edge endpoint."""
+        if self._endpoint_graphs is None:
+            # Hierarchies following the first one hold the endpoints.
+            self._endpoint_graphs = []
+            position = self.graph_row(0)[_END]
+            while position < len(self.graphs) // _GRAPH_WIDTH:
+                self._endpoint_graphs.append(position)
+                position = self.graph_row(position)[_END]
+        try:
+            return self._endpoints[ordinal]
+        except KeyError:
+            pass
+        position = self._endpoint_graphs[ordinal]
+        sgraph = pydot.core.Subgraph(obj_dict={})
+        # Parsed endpoints belong to a graph of their own.
+        self.build(position, sgraph.obj_dict, sgraph)
+        endpoint = self._endpoints[ordinal] = FrozenDict(sgraph.obj_dict)
+        return endpoint
+
+    def build(
+        self,
+        position: int,
+        obj_dict: dict[str, Any],
+        top_graph: pydot.core.Graph,
+    ) -> int:
+        """Fill the obj_dict of the graph at `position` and its subgraphs.
+
+        `top_graph` becomes the parent graph of all elements. Returns
+        the position following the subgraphs of the graph.
+        """
+        row = self.graph_row(position)
+        value = self.value
+        attribute_dict = self.attribute_dict
+        flags = row[_FLAGS]
+
+        obj_dict["attributes"] = attribute_dict(row[_ATTRIBUTES])
+        obj_dict["name"] = value(row[_NAME])
+        obj_dict["type"] = value(row[_TYPE])
+        obj_dict["strict"] = bool(flags & _STRICT)
+        obj_dict["suppress_disconnected"] = bool(
+            flags & _SUPPRESS_DISCONNECTED
+        )
+        obj_dict["simplify"] = bool(flags & _SIMPLIFY)
+        obj_dict["current_child_sequence"] = row[_CHILD_SEQUENCE]
+
+        nodes: dict[Any, list[dict[str, Any]]] = {}
+        start, stop = row[_NODE_START], row[_NODE_STOP]
+        columns = zip(
+            self.column("node_names", start, stop),
+            self.column("node_ports", start, stop),
+            self.column("node_attributes", start, stop),
+            self.column("node_sequences", start, stop),
+        )
+        for name_number, port, attributes, sequence in columns:
+            name = value(name_number)
+            node = {
+                "attributes": attribute_dict(attributes),
+                "type": "node",
+                "parent_graph": top_graph,
+                "sequence": None if sequence == _NO_SEQUENCE else sequence,
+                "name": name,
+                "port": value(port),
+            }
+            bucket = nodes.get(name)
+            if bucket is None:
+                nodes[name] = [node]
+            else:
+                bucket.append(node)
+
+        edges: dict[Any, list[dict[str, Any]]] = {}
+        start, stop = row[_EDGE_START], row[_EDGE_STOP]
+        columns = zip(
+            self.column("edge_sources", start, stop),
+            self.column("edge_destinations", start, stop),
+            self.column("edge_attributes", start, stop),
+            self.column("edge_sequences", start, stop),
+        )
+        for src, dst, attributes, sequence in columns:
+            points = (value(src), value(dst))
+            edge = {
+                "points": points,
+                "attributes": attribute_dict(attributes),
+                "type": "edge",
+                "parent_graph": top_graph,
+                "sequence": None if sequence == _NO_SEQUENCE else sequence,
+            }
+            bucket = edges.get(points)
+            if bucket is None:
+                edges[points] = [edge]
+            else:
+                bucket.append(edge)
+
+        subgraphs: dict[Any, list[dict[str, Any]]] = {}
+        child = position + 1
+        while child < row[_END]:
+            sgraph: dict[str, Any] = {}
+            next_child = self.build(child, sgraph, top_graph)
+            subgraphs.setdefault(sgraph["name"], []).append(sgraph)
+            child = next_child
+
+        obj_dict["nodes"] = nodes
+        obj_dict["edges"] = edges
+        obj_dict["subgraphs"] = subgraphs
+        obj_dict["parent_graph"] = top_graph
+        if row[_SEQUENCE] != _NO_SEQUENCE:
+            obj_dict["sequence"] = row[_SEQUENCE]
+        if flags & _HAS_SHOW_KEYWORD:
+            obj_dict["show_keyword"] = bool(flags & _SHOW_KEYWORD)
+        return int(row[_END])
+
+    def load(self, graph_class: type[pydot.core.Graph]) -> Any:
+        """Materialize the whole graph, as an instance of `graph_class`."""
+        self.all_values()
+        self.all_attributes()
+        # Like pickle, don't call the constructor of the class
+        graph = graph_class.__new__(graph_class)
+        graph.obj_dict = {}
+        self.build(0, graph.obj_dict, graph)
+        if isinstance(graph, pydot.core.Dot):
+            dot = iter(self.column("dot"))
+            graph.prog = self.value(next(dot))
+            count = next(dot)
+            graph.shape_files = [
+                self.value(v) for v in itertools.islice(dot, count)
+            ]
+            count = next(dot)
+            graph.formats = {
+                self.value(v) for v in itertools.islice(dot, count)
+            }
+        return graph
+
+    def subgraph_positions(self) -> Iterator[int]:
+        """Iterate over the positions of the subgraphs of the graph."""
+        return iter(range(1, self.graph_row(0)[_END]))
+
+
+class GraphSnapshot:
+    """A graph snapshot file, opened for loading.
+
+    The file is memory-mapped, and the graph is only materialized when
+    requested: either as a whole, by `load()`, or only some subgraphs of
+    it, by `load_subgraph()`. Only the parts of the file holding these
+    subgraphs are read.
+
+        with pydot.GraphSnapshot("graph.bin") as snapshot:
+            clusters = snapshot.load_subgraph("cluster_0")
+
+    Snapshots hold attribute values of types other than strings,
+    numbers, booleans and None pickled. Like pickles, they should only
+    be loaded from trusted sources.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        with open(path, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                raise pydot.Error("Not a pydot graph snapshot")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._decoder = _Decoder(self._mmap)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def load(self) -> pydot.core.Dot:
+        """Materialize the whole graph."""
+        graph: pydot.core.Dot = self._decoder.load(pydot.core.Dot)
+        return graph
+
+    def subgraph_names(self) -> list[str]:
+        """Get the names of all the subgraphs, nested ones included."""
+        decoder = self._decoder
+        return [
+            decoder.value(decoder.graph_row(position)[_NAME])
+            for position in decoder.subgraph_positions()
+        ]
+
+    def load_subgraph(self, name: str) -> list[pydot.core.Subgraph]:
+        """Materialize the subgraphs named `name`, nested ones included.
+
+        The subgraphs are returned as separate graphs, with the nodes,
+        edges and subgraphs they contain. Like other subgraphs without a
+        parent graph, their edges are output as undirected by
+        `to_string()`.
+        """
+        decoder = self._decoder
+        sgraphs = []
+        for position in decoder.subgraph_positions():
+            if decoder.value(decoder.graph_row(position)[_NAME]) == name:
+                sgraph = pydot.core.Subgraph(obj_dict={})
+                decoder.build(position, sgraph.obj_dict, sgraph)
+                sgraphs.append(sgraph)
+        return sgraphs
+
+    def close(self) -> None:
+        self._decoder.release()
+        self._mmap.close()
+
+    def __enter__(self) -> GraphSnapshot:
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+
+def load_binary(path: str | os.PathLike[str]) -> pydot.core.Dot:
+    """Load a graph saved by `Dot.dump_binary`.
+
+    Like pickles, snapshots should only be loaded from trusted sources,
+    see `GraphSnapshot`.
+    """
+    with GraphSnapshot(path) as snapshot:
+        return snapshot.load()
+
+
+class CompactPickle:
+    """Wrapper pickling a graph as a compact snapshot.
+
+    Graphs are normally pickled as their nested element dictionaries,
+    which refer back to their parent graphs. Wrapping a graph pickles
+    it in the format of `Dot.dump_binary` instead, which is several
+    times smaller and faster to load, for example to send it to another
+    process:
+
+        pool.apply_async(work, (pydot.CompactPickle(graph),))
+
+    Unpickling gives the graph itself, not the wrapper. With pickle
+    protocol 5, the snapshot is a single `pickle.PickleBuffer` that can
+    be transferred out-of-band.
+
+    The graph is rebuilt from the snapshot, so nodes, edges and
+    subgraphs pickled along with the wrapper aren't part of the
+    unpickled graph. Only the elements of the graph and, for a `Dot`,
+    its program, shape files and formats are kept, and the graph is
+    made a top level graph. Like other pickles, these should only be
+    loaded from trusted sources.
+
+    @param graph: the graph to pickle.
+    """
+
+    def __init__(self, graph: pydot.core.Graph) -> None:
+        self.graph = graph
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        data: Any = b"".join(_encode(self.graph))
+        if int(protocol) >= 5:
+            data = pickle.PickleBuffer(data)
+        return (_unpickle, (type(self.graph), data))
+
+
+def _unpickle(graph_class: type[pydot.core.Graph], data: Any) -> Any:
+    decoder = _Decoder(data)
+    try:
+        return decoder.load(graph_class)
+    finally:
+        decoder.release()
+
+
+def _dump(graph: pydot.core.Graph, path: str | os.PathLike[str]) -> None:
+    _logger.debug("writing snapshot of graph %r to %s", graph.get_name(), path)
+    with open(path, "wb") as f:
+        for buffer in _encode(graph):
+            f.write(buffer)
@@ -6,12 +6,18 @@
 
 from __future__ import annotations
 
+import asyncio
 import copy
+import gc
+import json
 import os
 import pickle
+import signal
 import string
 import subprocess
+import sys
 import textwrap
+import threading
 import typing as T
 from pathlib import Path
 
@@ -246,6 +252,47 @@ def test_dot_pickling() -> None:
     assert g2.shape_files[0] == "dummy.png"
 
 
+def test_graph_pickling_elements() -> None:
+    g = pydot.graph_from_dot_data(
+        "digraph G { a; a -> b; subgraph cluster_x { c; } }"
+    )[0]
+    node, edge = g.get_node("a")[0], g.get_edges()[0]
+    sgraph = g.get_subgraph("cluster_x")[0]
+
+    g2, node2, edge2, sgraph2 = pickle.loads(
+        pickle.dumps((g, node, edge, sgraph))
+    )
+    assert node2.get_parent_graph() is g2
+    assert edge2.get_parent_graph() is g2
+    assert sgraph2.get_parent_graph() is g2
+    assert g2.get_subgraph("cluster_x")[0].get_parent_graph() is g2
+
+
+def test_compact_pickle() -> None:
+    g = pydot.graph_from_dot_data(
+        "digraph G { a [pos=1]; a:n -> b; subgraph cluster_x { c; } }"
+    )[0]
+    g.get_node("a")[0].set("points", [1, 2])
+    g.set_prog("neato")
+
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        data = pickle.dumps(pydot.CompactPickle(g), protocol=protocol)
+        g2 = pickle.loads(data)
+        assert isinstance(g2, pydot.Dot)
+        assert g2.to_string() == g.to_string()
+        assert g2.prog == "neato"
+        assert g2.get_parent_graph() is g2
+
+    buffers: list[pickle.PickleBuffer] = []
+    data = pickle.dumps(
+        pydot.CompactPickle(g), protocol=5, buffer_callback=buffers.append
+    )
+    assert len(buffers) == 1
+    assert len(data) < 100
+    g2 = pickle.loads(data, buffers=buffers)
+    assert g2.to_string() == g.to_string()
+
+
 def test_unicode_ids() -> None:
     node1 = '"aánñoöüé€"'
     node2 = '"îôø®çßΩ"'
@@ -847,6 +894,20 @@ def test_edge_point_object_cluster() -> None:
     assert g.get_edges()[0].to_string() == "cluster_a -> cluster_b;"
 
 
+def test_add_edges() -> None:
+    g = pydot.Dot("G")
+    g.add_edge(pydot.Edge("a", "b"))
+    assert g.find_edges("a", "b")  # Builds the hierarchy index
+    g.add_edges([pydot.Edge("b", "c"), pydot.Edge("a", "b", color="red")])
+    s = " ".join(g.to_string().split())
+    assert s == "digraph G { a -> b; b -> c; a -> b [color=red]; }"
+    assert len(g.find_edges("a", "b")) == 2
+    assert g.get_edge("b", "c")[0].get_parent_graph() is g
+
+    with pytest.raises(TypeError):
+        g.add_edges([pydot.Node("a")])
+
+
 def test_graph_from_adjacency_matrix() -> None:
     # Directed graphs use every truthy cell.
     g = pydot.graph_from_adjacency_matrix(
@@ -889,6 +950,44 @@ def test_graph_from_adjacency_matrix() -> None:
     assert s == "digraph G { node_1 -> node_2; node_2 -> node_1; }"
 
 
+def test_graph_from_adjacency_matrix_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    sparse = pytest.importorskip("scipy.sparse")
+
+    matrix = [[0, 2, 0], [1, 0, 0], [0, 3, 1]]
+    for directed in (True, False):
+        expected = pydot.graph_from_adjacency_matrix(
+            matrix, "n", directed
+        ).to_string()
+        for converted in (
+            np.array(matrix),
+            np.array(matrix, dtype=bool),
+            sparse.csr_matrix(matrix),
+            sparse.coo_array(matrix).T.T,
+        ):
+            g = pydot.graph_from_adjacency_matrix(converted, "n", directed)
+            assert g.to_string() == expected
+
+    # Explicitly stored zeros aren't edges.
+    m = sparse.csr_matrix(([0, 5], ([0, 1], [1, 0])), shape=(2, 2))
+    g = pydot.graph_from_adjacency_matrix(
+        m, directed=True, weight_attribute="weight"
+    )
+    s = " ".join(g.to_string().split())
+    assert s == "digraph G { 2 -> 1 [weight=5]; }"
+
+    # Duplicate entries add up, here to zero for one of them.
+    m = sparse.coo_array(
+        ([2, -2, 1, 2], ([0, 0, 1, 1], [1, 1, 0, 0])), shape=(2, 2)
+    )
+    g = pydot.graph_from_adjacency_matrix(
+        m, directed=True, weight_attribute="weight"
+    )
+    s = " ".join(g.to_string().split())
+    assert s == "digraph G { 2 -> 1 [weight=3]; }"
+    assert m.nnz == 4
+
+
 def test_graph_from_incidence_matrix() -> None:
     g = pydot.graph_from_incidence_matrix(
         [[-1, 1, 0], [1, -1, 0], [0, 1, -1]], directed=True
@@ -903,6 +1002,40 @@ def test_graph_from_incidence_matrix() -> None:
     assert s == "graph G { 1 -- 2; 2 -- 3; }"
 
 
+def test_graph_from_incidence_matrix_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    sparse = pytest.importorskip("scipy.sparse")
+
+    rng = np.random.default_rng(0)
+    matrix = rng.choice([-2, -1, 0, 0, 0, 1, 3], size=(40, 8))
+    matrix[0] = [-1, 1, 0, 0, 0, 0, 0, 0]
+    matrix[1] = [0, 0, -1, -1, 0, 0, 0, 0]
+    for directed in (True, False):
+        for converted in (
+            matrix,
+            matrix.astype(float),
+            sparse.csr_matrix(matrix),
+            sparse.coo_array(matrix).T.T,
+        ):
+            if hasattr(converted, "toarray"):
+                rows = converted.toarray().tolist()
+            else:
+                rows = converted.tolist()
+            expected = pydot.graph_from_incidence_matrix(rows, "n", directed)
+            g = pydot.graph_from_incidence_matrix(converted, "n", directed)
+            assert g.to_string() == expected.to_string()
+
+    # Duplicate entries add up, and may cancel each other out.
+    for data, cols, expected in (
+        ([1, -1, 1, 1], [0, 0, 1, 2], "graph G { 2 -- 3; }"),
+        ([1, 1, 1], [0, 0, 2], "graph G { 2 -- 3; }"),
+    ):
+        m = sparse.coo_array((data, ([0] * len(data), cols)), shape=(1, 3))
+        g = pydot.graph_from_incidence_matrix(m)
+        assert " ".join(g.to_string().split()) == expected
+        assert m.nnz == len(data)
+
+
 def test_graph_from_edges() -> None:
     edge_list = [
         ("a", "b"),
@@ -927,6 +1060,276 @@ def test_graph_from_edges() -> None:
     assert str(g2).strip() == expected2
 
 
+def test_graph_from_edges_attributes() -> None:
+    g = pydot.graph_from_edges(
+        [("a", "b", {"color": "red"}), ["b", 1]], directed=True
+    )
+    s = " ".join(g.to_string().split())
+    assert s == "digraph G { a -> b [color=red]; b -> 1; }"
+
+    # Other extra items, like weights, are ignored as they used to be
+    g = pydot.graph_from_edges([(1, 2, 0.5), "abc", [3, 4, 5]])
+    s = " ".join(g.to_string().split())
+    assert s == "graph G { 1 -- 2; a -- b; 3 -- 4; }"
+
+
+def test_graph_from_edges_dataframe() -> None:
+    pd = pytest.importorskip("pandas")
+
+    table = pd.DataFrame(
+        {
+            "src": ["a", "b", "c"],
+            "dst": ["b", "c", "a"],
+            "w": pd.array([1, None, 3], dtype="Int64"),
+            "c": [None, "red", float("nan")],
+        }
+    )
+    g = pydot.graph_from_edges(table, attributes=["w", "c"])
+    s = " ".join(g.to_string().split())
+    assert s == "graph G { a -- b [w=1]; b -- c [c=red]; c -- a [w=3]; }"
+
+
+def test_graph_from_edges_arrays() -> None:
+    np = pytest.importorskip("numpy")
+
+    g = pydot.graph_from_edges(np.array([[1, 2], [2, 3]]), "n")
+    s = " ".join(g.to_string().split())
+    assert s == "graph G { n1 -- n2; n2 -- n3; }"
+
+    table = np.array(
+        [("a", "b", 2.0, "x"), ("b", "c", np.nan, "y")],
+        dtype=[("to", "U1"), ("from", "U1"), ("weight", "f8"), ("l", "U1")],
+    )
+    g = pydot.graph_from_edges(
+        table,
+        source="from",
+        destination="to",
+        attributes={"weight": "penwidth", "l": "label"},
+        directed=True,
+    )
+    s = " ".join(g.to_string().split())
+    assert s == (
+        "digraph G { b -> a [penwidth=2.0, label=x]; c -> b [label=y]; }"
+    )
+
+    g = pydot.graph_from_edges(table, attributes=["weight"])
+    s = " ".join(g.to_string().split())
+    assert s == "graph G { a -- b [weight=2.0]; b -- c; }"
+
+
+def test_graph_to_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("scipy.sparse")
+
+    g = pydot.Dot(graph_type="digraph")
+    g.set_node_defaults(shape="box")
+    g.add_node(pydot.Node("a"))
+    g.add_edge(pydot.Edge("b", '"c"', weight="2.5"))
+    g.add_edge(pydot.Edge("b:p", "c"))
+    sg = pydot.Cluster("x")
+    sg.add_edge(pydot.Edge("a", "d"))
+    sg.add_edge(pydot.Edge("d", "d", weight=3))
+    g.add_subgraph(sg)
+
+    assert g.node_index() == {"a": 0, "b": 1, "c": 2, "d": 3}
+    assert g.to_edge_array().tolist() == [[1, 2], [1, 2], [0, 3], [3, 3]]
+
+    expected = [[0, 0, 0, 1], [0, 0, 2, 0], [0, 0, 0, 0], [0, 0, 0, 1]]
+    assert g.to_adjacency_matrix(sparse=False).tolist() == expected
+    assert g.to_adjacency_matrix().toarray().tolist() == expected
+    weighted = g.to_adjacency_matrix(weight="weight")
+    assert weighted[1, 2] == 3.5
+    assert weighted[3, 3] == 3.0
+
+    g.set_type("graph")
+    matrix = g.to_adjacency_matrix(sparse=False)
+    assert (matrix == matrix.T).all()
+    assert matrix[3, 3] == 1
+    assert matrix[2, 1] == 2
+
+    adjacency = np.array([[0, 1, 0], [1, 0, 1], [0, 1, 1]])
+    g = pydot.graph_from_adjacency_matrix(adjacency)
+    assert g.node_index() == {"1": 0, "2": 1, "3": 2}
+    assert (g.to_adjacency_matrix(sparse=False) == adjacency).all()
+
+    empty = pydot.Dot()
+    assert empty.to_edge_array().shape == (0, 2)
+    assert empty.to_adjacency_matrix().shape == (0, 0)
+
+
+CONVERSION_DOT = """digraph G {
+rankdir=LR;
+node [shape=box];
+a [color=red];
+"x:y";
+a -> b [weight=1];
+a:p -> b;
+subgraph cluster_1 {
+label=C;
+edge [style=dashed];
+c;
+b -> c;
+subgraph inner {
+d [shape=circle];
+}
+}
+c -> d;
+}
+"""
+
+
+def _assert_converted(g: pydot.Dot) -> None:
+    assert g.get_type() == "digraph"
+    assert g.get_attributes() == {"rankdir": "LR"}
+    assert g.get_node_defaults() == [{"shape": "box"}]
+    assert g.find_node("a")[0].get_attributes() == {"color": "red"}
+    assert g.find_node('"x:y"')
+    assert [e.get_attributes() for e in g.find_edges("a", "b")] == [
+        {"weight": "1"},
+        {"tailport": "p"},
+    ]
+    (cluster,) = g.get_subgraph("cluster_1")
+    assert cluster.get_attributes() == {"label": "C"}
+    assert cluster.get_edge_defaults() == [{"style": "dashed"}]
+    assert cluster.get_node("c")
+    assert cluster.get_edge("b", "c")
+    (inner,) = cluster.get_subgraph("inner")
+    assert inner.get_node("d")[0].get_attributes() == {"shape": "circle"}
+    assert g.get_edge("c", "d")
+
+
+def test_networkx_conversion() -> None:
+    nx = pytest.importorskip("networkx")
+
+    g = pydot.graph_from_dot_data(CONVERSION_DOT)[0]
+    n = g.to_networkx()
+    assert isinstance(n, nx.MultiDiGraph)
+    assert n.name == "G"
+    assert n.graph["graph"] == {"rankdir": "LR"}
+    assert n.graph["node"] == {"shape": "box"}
+    assert list(n.nodes) == ["a", "x:y", "b", "c", "d"]
+    assert n.nodes["d"] == {"shape": "circle"}
+    assert list(n.edges(keys=True, data=True)) == [
+        ("a", "b", 0, {"weight": "1"}),
+        ("a", "b", 1, {"tailport": "p"}),
+        ("b", "c", 0, {}),
+        ("c", "d", 0, {}),
+    ]
+    cluster, inner = n.graph["subgraphs"]
+    assert cluster["name"] == "cluster_1"
+    assert cluster["parent"] is None
+    assert cluster["nodes"] == ["c"]
+    assert cluster["edges"] == [("b", "c", 0)]
+    assert inner["parent"] == 0
+    assert inner["nodes"] == ["d"]
+
+    _assert_converted(pydot.from_networkx(n))
+
+    g = pydot.from_networkx(nx.path_graph(3))
+    assert g.get_type() == "graph"
+    assert g.get_strict()
+    s = " ".join(g.to_string().split())
+    assert s == "strict graph G { 0; 1; 2; 0 -- 1; 1 -- 2; }"
+    n = g.to_networkx()
+    assert type(n) is nx.Graph
+    assert list(n.edges) == [("0", "1"), ("1", "2")]
+
+
+def test_gc_paused() -> None:
+    assert gc.isenabled()
+    with pydot.gc_paused():
+        assert not gc.isenabled()
+        with pydot.gc_paused():
+            pass
+        assert not gc.isenabled()
+
+        # Concurrent pauses only end with the last of them
+        entered, release = threading.Event(), threading.Event()
+
+        def pause() -> None:
+            with pydot.gc_paused():
+                entered.set()
+                release.wait(10)
+
+        thread = threading.Thread(target=pause)
+        thread.start()
+        entered.wait(10)
+    assert not gc.isenabled()
+    release.set()
+    thread.join()
+    assert gc.isenabled()
+
+    # The collector stays disabled if it already was
+    gc.disable()
+    try:
+        with pydot.gc_paused():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+
+def test_igraph_conversion() -> None:
+    pytest.importorskip("igraph")
+
+    g = pydot.graph_from_dot_data(CONVERSION_DOT)[0]
+    ig = g.to_igraph()
+    assert ig.is_directed()
+    assert ig.vs["name"] == list(g.node_index())
+    assert ig.vs["color"] == ["red", None, None, None, None]
+    edge_array = g.to_edge_array().tolist()
+    assert ig.get_edgelist() == [tuple(edge) for edge in edge_array]
+    assert ig.get_edgelist() == [(0, 2), (0, 2), (3, 4), (2, 3)]
+    assert ig.es["tailport"] == [None, "p", None, None]
+    assert ig["subgraphs"][0]["edges"] == [3]
+
+    _assert_converted(pydot.from_igraph(ig))
+
+
+def test_binary_snapshot(tmp_path) -> None:
+    g = pydot.graph_from_dot_data(
+        """strict digraph G {
+        rankdir=LR;
+        a [label="é", width=1.5];
+        a:n -> b [weight=3];
+        subgraph cluster_x { label=X; c -> d [color=red]; }
+        subgraph cluster_y { c -> e [color=red]; }
+        { f g } -> h;
+        }"""
+    )[0]
+    g.set_prog("neato")
+    g.get_node("a")[0].set("points", [1, 2])
+    g.set("ratio", None)
+    g.set("pack", True)
+    g.intern_attributes()
+    path = tmp_path / "G.bin"
+    g.dump_binary(path)
+
+    h = pydot.load_binary(path)
+    assert isinstance(h, pydot.Dot)
+    assert h.to_string() == g.to_string()
+    assert h.prog == "neato"
+    assert h.get_strict()
+    assert h.get_node("a")[0].get("points") == [1, 2]
+    assert h.get("pack") is True
+    c_to_d = h.get_subgraph("cluster_x")[0].get_edge("c", "d")[0]
+    c_to_e = h.get_subgraph("cluster_y")[0].get_edge("c", "e")[0]
+    assert c_to_d.obj_dict["attributes"] is c_to_e.obj_dict["attributes"]
+    assert c_to_d.get_parent_graph() is h
+
+    with pydot.GraphSnapshot(path) as snapshot:
+        assert snapshot.subgraph_names() == ["cluster_x", "cluster_y"]
+        (sgraph,) = snapshot.load_subgraph("cluster_y")
+        assert [e.get_source() for e in sgraph.get_edges()] == ["c"]
+        assert sgraph.get_edge("c", "e")[0].get("color") == "red"
+        assert sgraph.get_parent_graph() is sgraph
+        assert snapshot.load_subgraph("cluster_z") == []
+
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(pydot.Error, match="Not a pydot graph snapshot"):
+        pydot.load_binary(path)
+
+
 def test_version() -> None:
     assert isinstance(pydot.__version__, str)
 
@@ -952,3 +1355,995 @@ def test_object_cloning(objdict: dict[str, T.Any]) -> None:
     newg = pydot.Dot("G")
     assert newg != g
     assert newg != h
+
+
+def test_element_views() -> None:
+    g = pydot.Graph("G", graph_type="graph")
+    a = pydot.Node("a", shape="box")
+    g.add_node(a)
+    g.add_node(pydot.Node("b", shape="circle"))
+    g.add_node(pydot.Node("c", shape="box"))
+    e = pydot.Edge("a", "b")
+    g.add_edge(e)
+    g.add_edge(pydot.Edge("b", "c"))
+    sg = pydot.Subgraph("sub")
+    g.add_subgraph(sg)
+
+    assert len(g.nodes) == 3
+    assert len(g.edges) == 2
+    assert len(g.subgraphs) == 1
+    assert g.nodes is g.nodes
+
+    assert "a" in g.nodes
+    assert a in g.nodes
+    assert pydot.Node("a") not in g.nodes
+    assert "z" not in g.nodes
+    assert ("a", "b") in g.edges
+    assert ["a", "b"] in g.edges
+    assert e in g.edges
+    assert pydot.Edge("a", "b") not in g.edges
+    assert {"unhashable"} not in g.edges
+    assert "sub" in g.subgraphs
+    assert sg in g.subgraphs
+
+    assert [n.get_name() for n in g.nodes] == ["a", "b", "c"]
+    assert list(g.nodes.keys()) == ["a", "b", "c"]
+    assert [n.get_name() for n in g.nodes.filter(shape="box")] == ["a", "c"]
+    assert [
+        n.get_name()
+        for n in g.nodes.filter(lambda n: n.get_name() > "a", shape="box")
+    ] == ["c"]
+    assert [s.get_name() for s in g.subgraphs] == ["sub"]
+    assert isinstance(next(iter(g.subgraphs)), pydot.Subgraph)
+    assert repr(g.edges) == "EdgeView([('a', 'b'), ('b', 'c')])"
+
+    # Wrappers are reused across iterations
+    first = list(g.edges)
+    assert [id(x) for x in g.edges] == [id(x) for x in first]
+    assert first[0].obj_dict is e.obj_dict
+
+    # Views are live
+    g.del_node("b")
+    g.del_edge("a", "b")
+    assert len(g.nodes) == 2
+    assert "b" not in g.nodes
+    assert len(g.edges) == 1
+    assert g.edges
+
+    empty = pydot.Graph()
+    assert not empty.nodes
+    assert list(empty.edges) == []
+
+
+def test_hierarchy_queries() -> None:
+    g = pydot.Dot("G", graph_type="graph")
+    g.add_node(pydot.Node("a"))
+    sg = pydot.Subgraph("sg")
+    sg.add_node(pydot.Node("b"))
+    cl = pydot.Cluster("cl")
+    cl.add_node(pydot.Node("c"))
+    cl.add_node(pydot.Node("b"))
+    cl.add_edge(pydot.Edge("b", "c"))
+    sg.add_subgraph(cl)
+    g.add_subgraph(sg)
+
+    assert [n.get_name() for n in g.find_node("b")] == ["b", "b"]
+    assert [n.get_name() for n in g.find_node("c")] == ["c"]
+    assert g.find_node("zz") == []
+    assert len(g.find_edges("b", "c")) == 1
+    assert len(g.find_edges(("c", "b"))) == 1
+    assert [x.get_name() for x in g.containing_subgraph("b")] == [
+        "sg",
+        "cluster_cl",
+    ]
+    assert g.containing_subgraph("a") == [g]
+    assert [x.get_name() for x in g.containing_subgraph(("c", "b"))] == [
+        "cluster_cl"
+    ]
+    assert [type(x) for x in g.containing_subgraph("b")] == [
+        pydot.Subgraph,
+        pydot.Cluster,
+    ]
+
+    # The index is kept up to date as the hierarchy changes.
+    sg_out = g.get_subgraph("sg")[0]
+    sg_out.add_node(pydot.Node("d"))
+    cl_out = sg_out.get_subgraph("cluster_cl")[0]
+    cl_out.add_edge(pydot.Edge("d", "a"))
+    nested = pydot.Subgraph("nested")
+    nested.add_node(pydot.Node("e"))
+    cl_out.add_subgraph(nested)
+    assert [x.get_name() for x in g.containing_subgraph("d")] == ["sg"]
+    assert [x.get_name() for x in g.containing_subgraph("e")] == ["nested"]
+    assert len(g.find_edges("a", "d")) == 1
+
+    assert cl_out.del_node("b")
+    assert [x.get_name() for x in g.containing_subgraph("b")] == ["sg"]
+    assert cl_out.del_edge("b", "c")
+    assert g.find_edges("b", "c") == []
+    assert g.containing_subgraph(pydot.Edge("b", "c")) == []
+    assert g.containing_subgraph(pydot.Node("a")) == [g]
+
+    # A Dot wrapping the same hierarchy shares its index
+    h = pydot.Dot(obj_dict=g.obj_dict)
+    assert [n.get_name() for n in h.find_node("e")] == ["e"]
+
+
+def test_undirected_edge_lookup_and_deletion() -> None:
+    g = pydot.Graph("G", graph_type="graph")
+    ab = pydot.Edge("a", "b")
+    ba = pydot.Edge("b", "a")
+    g.add_edge(ab)
+    g.add_edge(ba)
+    g.add_edge(pydot.Edge("a", "a"))
+
+    assert [e.obj_dict for e in g.get_edge("a", "b")] == [
+        ab.obj_dict,
+        ba.obj_dict,
+    ]
+    assert [e.obj_dict for e in g.get_edge(("b", "a"))] == [
+        ba.obj_dict,
+        ab.obj_dict,
+    ]
+    assert len(g.get_edge("a", "a")) == 1
+    assert ("b", "a") in g.edges
+    assert ab in g.edges
+
+    # Index counts across both directions, in get_edge() order
+    assert g.del_edge("b", "a", index=1)
+    assert [e.obj_dict for e in g.get_edge("a", "b")] == [ba.obj_dict]
+    assert g.del_edge("a", "b", index=5)
+    assert g.get_edge("a", "b") == []
+    assert not g.del_edge("b", "a")
+
+    g.add_edge(pydot.Edge("c", "d"))
+    assert g.del_edge(pydot.Node("d"), pydot.Node("c"))
+    assert [e.get_source() for e in g.get_edges()] == ["a"]
+
+    # Directed graphs keep telling both directions apart
+    g.set_type("digraph")
+    g.add_edge(pydot.Edge("x", "y"))
+    assert g.get_edge("y", "x") == []
+    assert ("y", "x") not in g.edges
+    assert not g.del_edge("y", "x")
+    assert g.del_edge("x", "y")
+
+
+def test_simplify_and_suppress_disconnected_in_subgraph() -> None:
+    g = pydot.Dot("G", graph_type="graph")
+    sg = pydot.Subgraph("S", simplify=True, suppress_disconnected=True)
+    for n in "abcd":
+        sg.add_node(pydot.Node(n))
+    for _ in range(3):
+        sg.add_edge(pydot.Edge("a", "b"))
+        sg.add_edge(pydot.Edge("b", "a", color="red"))
+    sg.add_edge(pydot.Edge("c", "c"))
+    sg.add_edge(pydot.Edge("c", "c"))
+    sg.add_edge(pydot.Edge(pydot.Subgraph("x"), "c"))
+    g.add_subgraph(sg)
+
+    result = " ".join(g.to_string().split())
+    assert result == (
+        "graph G { subgraph S { a; b; c; a -- b; c -- c; x -- c; } }"
+    )
+
+    g.set_type("digraph")
+    result = " ".join(g.to_string().split())
+    assert result == (
+        "digraph G { subgraph S { a; b; c; "
+        "a -> b; b -> a [color=red]; c -> c; x -> c; } }"
+    )
+
+
+def test_graph_intern_attributes() -> None:
+    g = pydot.Dot("G", graph_type="graph")
+    sg = pydot.Subgraph("S")
+    g.add_subgraph(sg)
+    for i in range(3):
+        g.add_node(pydot.Node(f"a{i}", shape="box", color="red"))
+        sg.add_node(pydot.Node(f"b{i}", shape="box", color="red"))
+        g.add_edge(pydot.Edge(f"a{i}", f"b{i}", style="dashed"))
+    g.add_node(pydot.Node("odd", pos=["unhashable"]))
+    before = g.to_string()
+
+    g.intern_attributes()
+    a0, a1 = g.get_node("a0")[0], g.get_node("a1")[0]
+    b0 = g.get_subgraph("S")[0].get_node("b0")[0]
+    e0, e1 = g.get_edges()[0:2]
+    assert isinstance(a0.get_attributes(), pydot.SharedAttributes)
+    assert a0.get_attributes() is a1.get_attributes() is b0.get_attributes()
+    assert e0.get_attributes() is e1.get_attributes()
+    assert type(g.get_node("odd")[0].get_attributes()) is dict
+    assert g.to_string() == before
+    assert a0.get_attributes()._formatted == {
+        pydot.Node: "shape=box, color=red"
+    }
+    assert g.to_string() == before
+
+    # Each type of element formats a shared dictionary its own way
+    class QuotedNode(pydot.Node):
+        def formatted_attr_list(self) -> list[str]:
+            return [f'{k}="{v}"' for k, v in self.get_attributes().items()]
+
+    shared = a1.get_attributes()
+    c = QuotedNode("c")
+    c.obj_dict["attributes"] = shared
+    assert c.to_string() == 'c [shape="box", color="red"];'
+    assert a1.to_string() == "a1 [shape=box, color=red];"
+
+    # Setting an attribute unshares it
+    a0.set_color("blue")
+    a1.add_style("filled")
+    assert a0.get_attributes() == {"shape": "box", "color": "blue"}
+    assert a1.get_style() == "filled"
+    assert b0.get_color() == "red"
+    assert "style" not in b0.get_attributes()
+    assert type(a0.get_attributes()) is dict
+
+    # Equal values of different types are output as they were set
+    h = pydot.Dot("H")
+    for i, penwidth in enumerate([1, True, 1.0]):
+        h.add_node(pydot.Node(f"n{i}", penwidth=penwidth))
+    before = h.to_string()
+    h.intern_attributes()
+    assert h.to_string() == before
+    assert "n1 [penwidth=true]" in before
+
+
+@pytest.mark.parametrize("deep", [False, True])
+def test_graph_clone(deep: bool) -> None:
+    g = pydot.graph_from_dot_data(
+        """digraph G {
+        a [shape=box];
+        b [shape=box];
+        a -> b;
+        subgraph cluster_x { c -> d [color=red]; }
+        { e f } -> g;
+        }"""
+    )[0]
+    g.set_prog("neato")
+    g.get_node("a")[0].set("pos", [1, 2])
+    g.intern_attributes()
+    before = g.to_string()
+
+    h = g.clone(deep=deep)
+    assert isinstance(h, pydot.Dot)
+    assert h != g
+    assert h.to_string() == before
+    assert h.prog == "neato"
+    assert h.get_parent_graph() is h
+    hx = h.get_subgraph("cluster_x")[0]
+    assert hx.get_parent_graph() is h
+    assert hx.get_edge("c", "d")[0].get_parent_graph() is h
+
+    # Interned attributes are shared, until they are set
+    hb, gb = h.get_node("b")[0], g.get_node("b")[0]
+    assert hb.get_attributes() is gb.get_attributes()
+    hb.set_shape("circle")
+    assert gb.get_shape() == "box"
+    hpos, gpos = h.get_node("a")[0].get("pos"), g.get_node("a")[0].get("pos")
+    assert hpos == gpos
+    assert (hpos is gpos) is not deep
+
+    hx.add_node(pydot.Node("z"))
+    h.del_edge("a", "b")
+    h.set_graph_defaults(rankdir="LR")
+    assert g.to_string() == before
+
+
+def test_call_graphviz_input() -> None:
+    (out, err, proc) = pydot.call_graphviz(
+        "python",
+        ["-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"],
+        None,
+        input=b"graph G { a -- b }",
+    )
+    assert proc.returncode == 0
+    assert out == b"GRAPH G { A -- B }"
+
+
+def test_create_pipes_dot_data(monkeypatch) -> None:
+    calls = []
+
+    def fake_call_graphviz(**kwargs):
+        wd = kwargs["working_dir"]
+        calls.append((kwargs, sorted(os.listdir(wd)) if wd else None))
+        return b"output", b"", subprocess.CompletedProcess([], returncode=0)
+
+    monkeypatch.setattr(pydot.core, "call_graphviz", fake_call_graphviz)
+
+    g = pydot.Dot("G", graph_type="graph")
+    g.add_node(pydot.Node("a"))
+    assert g.create(prog=["neato", "-n2"], format="svg") == b"output"
+    kwargs, listing = calls.pop()
+    assert kwargs["program"] == "neato"
+    assert kwargs["arguments"] == ["-Tsvg", "-n2"]
+    assert kwargs["working_dir"] is None
+    assert kwargs["input"].replace(b"\r\n", b"\n") == g.to_string().encode()
+
+    g.add_node(pydot.Node("ñ"))
+    g.create(format="png", encoding="latin-1")
+    kwargs, listing = calls.pop()
+    assert kwargs["input"].replace(b"\r\n", b"\n") == g.to_string().encode(
+        "latin-1"
+    )
+
+    shapefile = Path(__file__).parent / "from-past-to-future" / "AI.png"
+    g.set_shape_files(str(shapefile))
+    g.create(format="png")
+    kwargs, listing = calls.pop()
+    assert listing == ["AI.png"]
+
+    # The staged shape files are reused, until they change.
+    g.create(format="png")
+    assert calls.pop()[0]["working_dir"] == kwargs["working_dir"]
+    staged = os.path.join(kwargs["working_dir"], "AI.png")
+    assert os.path.samefile(staged, shapefile)
+
+    pydot.core._staging_directories.clear()
+    assert not os.path.exists(kwargs["working_dir"])
+
+    # A directory that could not be staged is deleted.
+    staging = []
+
+    def failing_stage_shape_files(shape_files, path):
+        staging.append(path)
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(
+        pydot.core, "_stage_shape_files", failing_stage_shape_files
+    )
+    with pytest.raises(OSError, match="No space left"):
+        g.create(format="png")
+    assert len(staging) == 1
+    assert not os.path.exists(staging[0])
+
+
+def test_acall_graphviz(monkeypatch) -> None:
+    (out, err, proc) = asyncio.run(
+        pydot.core.acall_graphviz(
+            "python",
+            ["-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"],
+            None,
+            input=b"graph G { a -- b }",
+        )
+    )
+    assert proc.returncode == 0
+    assert out == b"GRAPH G { A -- B }"
+
+    processes = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def spy(*args, **kwargs):
+        processes.append(await create_subprocess_exec(*args, **kwargs))
+        return processes[-1]
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", spy)
+
+    async def cancel_sleeper():
+        task = asyncio.ensure_future(
+            pydot.core.acall_graphviz(
+                "python", ["-c", "import time; time.sleep(60)"], None
+            )
+        )
+        while not processes:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_sleeper())
+    assert processes[0].returncode is not None
+
+
+def test_acreate(monkeypatch, tmp_path) -> None:
+    calls = []
+
+    async def fake_acall_graphviz(**kwargs):
+        calls.append(kwargs)
+        if b"bad" in kwargs["input"]:
+            return (
+                b"",
+                b"Error: syntax error",
+                subprocess.CompletedProcess([], returncode=1),
+            )
+        return b"output", b"", subprocess.CompletedProcess([], returncode=0)
+
+    monkeypatch.setattr(pydot.core, "acall_graphviz", fake_acall_graphviz)
+
+    g = pydot.Dot("G")
+    assert asyncio.run(g.acreate(prog=["neato", "-n2"], format="svg")) == (
+        b"output"
+    )
+    assert calls[-1]["program"] == "neato"
+    assert calls[-1]["arguments"] == ["-Tsvg", "-n2"]
+    assert calls[-1]["input"].replace(b"\r\n", b"\n") == (
+        g.to_string().encode()
+    )
+
+    path = tmp_path / "G.png"
+    assert asyncio.run(g.awrite(str(path), format="png"))
+    assert path.read_bytes() == b"output"
+    assert calls[-1]["arguments"] == ["-Tpng"]
+
+    with pytest.raises(AssertionError):
+        asyncio.run(pydot.Dot("bad").acreate())
+
+
+def test_render_pool_batches(monkeypatch) -> None:
+    calls = []
+    release = threading.Event()
+
+    def fake_call_graphviz(**kwargs):
+        release.wait(10)
+        args = kwargs["arguments"]
+        assert kwargs["working_dir"] is None
+        calls.append(args)
+        if "-O" not in args:
+            if b"bad" in kwargs["input"]:
+                return (
+                    b"",
+                    b"Error: syntax error",
+                    subprocess.CompletedProcess([], returncode=1),
+                )
+            return (
+                kwargs["input"],
+                b"",
+                subprocess.CompletedProcess([], returncode=0),
+            )
+        returncode = 0
+        for name in args[args.index("-O") + 1 :]:
+            with open(name, "rb") as f:
+                data = f.read()
+            if b"bad" in data:
+                returncode = 1
+                continue
+            with open(f"{name}.svg", "wb") as f:
+                f.write(data)
+        return b"", b"", subprocess.CompletedProcess([], returncode=returncode)
+
+    monkeypatch.setattr(pydot.core, "call_graphviz", fake_call_graphviz)
+
+    graphs = [pydot.Dot(f"G{i}") for i in range(4)]
+    with pydot.RenderPool(workers=1) as pool:
+        futures = [pool.submit(g, format="svg") for g in graphs]
+        release.set()
+        results = [f.result() for f in futures]
+    assert results == [g.to_string().encode() for g in graphs]
+    # The only worker renders the graphs queued meanwhile in one batch.
+    assert len(calls) <= 2
+    assert calls[-1][:2] == ["-Tsvg", "-O"]
+    assert os.path.basename(calls[-1][2]) == "g0.gv"
+
+    # A failing graph is rendered again on its own, others are unaffected.
+    calls.clear()
+    release.clear()
+    graphs[2] = pydot.Dot("bad")
+    with pydot.RenderPool(workers=1) as pool:
+        futures = [pool.submit(g, format="svg") for g in graphs]
+        release.set()
+        assert futures[3].result() == graphs[3].to_string().encode()
+        with pytest.raises(AssertionError):
+            futures[2].result()
+        assert calls[-1] == ["-Tsvg"]
+        svg = graphs[0].create_svg(pool=pool)
+        assert svg == graphs[0].to_string().encode()
+    with pytest.raises(pydot.Error):
+        pool.submit(graphs[0])
+
+
+def test_render_many(monkeypatch) -> None:
+    def fake_call_graphviz(**kwargs):
+        args = kwargs["arguments"]
+        inputs = args[args.index("-O") + 1 :] if "-O" in args else [None]
+        returncode = 0
+        for name in inputs:
+            if name is None:
+                data = kwargs["input"]
+            else:
+                with open(name, "rb") as f:
+                    data = f.read()
+            if b"bad" in data:
+                returncode = 1
+            elif name is not None:
+                with open(f"{name}.png", "wb") as f:
+                    f.write(data)
+        stdout = (
+            kwargs["input"] if returncode == 0 and "-O" not in args else b""
+        )
+        return stdout, b"", subprocess.CompletedProcess([], returncode)
+
+    monkeypatch.setattr(pydot.core, "call_graphviz", fake_call_graphviz)
+
+    graphs = [pydot.Dot(f"G{i}") for i in range(20)]
+    graphs[7] = pydot.Dot("bad")
+    results = list(pydot.render_many(iter(graphs), format="png", workers=2))
+    assert sorted(r.position for r in results) == list(range(20))
+    for r in results:
+        assert r.graph is graphs[r.position]
+        if r.position == 7:
+            assert r.data is None
+            assert isinstance(r.error, AssertionError)
+        else:
+            assert r.data == r.graph.to_string().encode()
+            assert r.error is None
+
+
+@pytest.mark.parametrize("backend", ["memory", "directory"])
+def test_render_cache(monkeypatch, tmp_path, backend) -> None:
+    calls = []
+
+    def fake_call_graphviz(**kwargs):
+        calls.append(kwargs["arguments"])
+        if kwargs["arguments"] == ["-V"]:
+            return b"", b"dot - graphviz version 0", None
+        out = b"%d" % len(calls)
+        return out, b"", subprocess.CompletedProcess([], returncode=0)
+
+    monkeypatch.setattr(pydot.core, "call_graphviz", fake_call_graphviz)
+    monkeypatch.setattr(pydot.core, "_graphviz", None)
+
+    if backend == "memory":
+        cache = pydot.MemoryRenderCache(max_bytes=2)
+    else:
+        cache = pydot.DirectoryRenderCache(str(tmp_path), max_bytes=2)
+
+    g = pydot.Dot("G")
+    out = g.create(format="svg", cache=cache)
+    assert calls == [["-V"], ["-Tsvg"]]
+    assert g.create(format="svg", cache=cache) == out
+    assert g.create_svg(cache=cache) == out
+    assert len(calls) == 2
+
+    # Any change of input is a cache miss.
+    assert g.create(format="png", cache=cache) != out
+    g.add_node(pydot.Node("a"))
+    assert g.create(format="svg", cache=cache) != out
+    assert calls[-2:] == [["-Tpng"], ["-Tsvg"]]
+
+    # The least recently used output was evicted.
+    pydot.Dot("G").create(format="svg", cache=cache)
+    assert len(calls) == 5
+
+    cache.clear()
+    assert cache.get(cache.key("dot", ["-Tsvg"], b"", [])) is None
+
+
+def test_render_cache_shape_files(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(
+        pydot.get_graphviz(), "banner", lambda prog: b"graphviz version 0"
+    )
+    cache = pydot.MemoryRenderCache()
+    shape = tmp_path / "shape.svg"
+    shape.write_bytes(b"<svg/>")
+
+    # Shape files are only read again once they changed.
+    key = cache.key("dot", ["-Tsvg"], b"", [str(shape)])
+    hits = pydot.render._file_digest.cache_info().hits
+    assert cache.key("dot", ["-Tsvg"], b"", [str(shape)]) == key
+    assert pydot.render._file_digest.cache_info().hits == hits + 1
+
+    shape.write_bytes(b"<svg></svg>")
+    assert cache.key("dot", ["-Tsvg"], b"", [str(shape)]) != key
+
+
+def test_directory_render_cache_size(monkeypatch, tmp_path) -> None:
+    with pytest.raises(TypeError):
+        pydot.RenderCache()  # type: ignore[abstract]
+
+    (tmp_path / "old.out").write_bytes(b"12345")
+    cache = pydot.DirectoryRenderCache(str(tmp_path), max_bytes=10)
+    scans = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+
+    # The directory is only scanned once the known size exceeds the limit
+    cache.put("a", b"123")
+    cache.put("a", b"1234")
+    assert not scans
+    cache.put("b", b"123")
+    assert scans == [1]
+    assert not (tmp_path / "old.out").exists()
+    assert cache.get("a") == b"1234"
+    assert cache.get("b") == b"123"
+
+
+def test_create_multi(monkeypatch, tmp_path) -> None:
+    calls = []
+
+    def fake_call_graphviz(**kwargs):
+        args = kwargs["arguments"]
+        calls.append(kwargs)
+        for fmt, out in zip(args, args[1:]):
+            if fmt.startswith("-T") and out.startswith("-o"):
+                path = os.path.join(kwargs["working_dir"] or "", out[2:])
+                with open(path, "wb") as f:
+                    f.write(fmt[2:].encode() + b":" + kwargs["input"])
+        return b"", b"", subprocess.CompletedProcess([], returncode=0)
+
+    monkeypatch.setattr(pydot.core, "call_graphviz", fake_call_graphviz)
+
+    g = pydot.Dot("G")
+    dot = g.to_string().encode()
+    outputs = g.create_multi(["png", "cmapx", "png"], prog=["dot", "-v"])
+    assert outputs == {"png": b"png:" + dot, "cmapx": b"cmapx:" + dot}
+    assert len(calls) == 1
+    assert calls[0]["arguments"][0] == "-v"
+
+    paths = {"svg": str(tmp_path / "g.svg"), "raw": str(tmp_path / "g.gv")}
+    assert g.write_multi(paths)
+    assert (tmp_path / "g.svg").read_bytes() == b"svg:" + dot
+    assert (tmp_path / "g.gv").read_text() == g.to_string()
+    assert len(calls) == 2
+
+
+def test_layout(monkeypatch) -> None:
+    layout = {
+        "name": "G",
+        "directed": True,
+        "strict": False,
+        "bb": "0,0,160,124",
+        "_subgraph_cnt": 2,
+        "objects": [
+            {
+                "_gvid": 0,
+                "name": "cluster_x",
+                "bb": "8,8,70,76",
+                "lp": "39,63",
+                "nodes": [2],
+            },
+            # An empty subgraph, with no keys telling it apart from nodes
+            {"_gvid": 1, "name": "empty"},
+            {
+                "_gvid": 2,
+                "name": "a",
+                "pos": "39,34",
+                "width": "0.75",
+                "height": "0.5",
+            },
+            {
+                "_gvid": 3,
+                "name": "b c",
+                "pos": "120,106",
+                "width": "1",
+                "height": "0.5",
+            },
+            {
+                "_gvid": 4,
+                "name": "d",
+                "pos": "120,34",
+                "width": "0.75",
+                "height": "0.5",
+            },
+        ],
+        "edges": [
+            {"_gvid": 0, "tail": 2, "head": 3, "pos": "e,1 2 3 4"},
+            {"_gvid": 1, "tail": 2, "head": 3, "pos": "e,5 6 7 8"},
+            {"_gvid": 2, "tail": 4, "head": 2, "pos": "e,9 9", "lp": "1,1"},
+        ],
+    }
+
+    def fake_call_graphviz(**kwargs):
+        assert kwargs["arguments"] == ["-Tjson0"]
+        out = json.dumps(layout).encode()
+        return out, b"", subprocess.CompletedProcess([], returncode=0)
+
+    monkeypatch.setattr(pydot.core, "call_graphviz", fake_call_graphviz)
+
+    g = pydot.Dot("G")
+    cluster = pydot.Cluster("x")
+    cluster.add_node(pydot.Node("a", color="red"))
+    g.add_subgraph(cluster)
+    g.add_subgraph(pydot.Subgraph("empty"))
+    g.add_edge(pydot.Edge("a", '"b c"'))
+    g.add_edge(pydot.Edge("a:n", '"b c"'))
+    g.add_edge(pydot.Edge("d", "a"))
+
+    assert g.layout() == layout
+    assert g.get_bb() == "0,0,160,124"
+    assert cluster.get_bb() == "8,8,70,76"
+    assert cluster.get_lp() == "39,63"
+    node_a = cluster.get_node("a")[0]
+    assert node_a.get_pos() == "39,34"
+    assert node_a.get_color() == "red"
+    assert g.get_node("d")[0].get_pos() == "120,34"
+    edges = g.get_edges()
+    assert [e.get_pos() for e in edges] == ["e,1 2 3 4", "e,5 6 7 8", "e,9 9"]
+    assert edges[2].get_lp() == "1,1"
+    assert '"b c" [pos="120,106"' in g.to_string()
+    assert g.get_node("empty") == []
+
+
+def test_layout_positions(monkeypatch) -> None:
+    np = pytest.importorskip("numpy")
+    layout = {
+        "name": "G",
+        "bb": "0,0,160,124",
+        "_subgraph_cnt": 1,
+        "objects": [
+            {"_gvid": 0, "name": "cluster_x", "bb": "8,8,70,76", "nodes": [1]},
+            {
+                "_gvid": 1,
+                "name": "a",
+                "pos": "39,34",
+                "width": "0.75",
+                "height": "0.5",
+            },
+            {
+                "_gvid": 2,
+                "name": "b c",
+                "pos": "120,106",
+                "width": "1",
+                "height": "0.5",
+            },
+        ],
+        "edges": [
+            {
+                "_gvid": 0,
+                "tail": 1,
+                "head": 2,
+                "pos": "e,1,2 3,4 5,6 7,8 9,10",
+            },
+            {
+                "_gvid": 1,
+                "tail": 2,
+                "head": 1,
+                "pos": "s,0,0 1,1 2,2 3,3 4,4;5,5 6,6 7,7 8,8",
+            },
+        ],
+    }
+
+    def fake_call_graphviz(**kwargs):
+        assert kwargs["arguments"] == ["-Tjson0"]
+        out = json.dumps(layout).encode()
+        return out, b"", subprocess.CompletedProcess([], returncode=0)
+
+    monkeypatch.setattr(pydot.core, "call_graphviz", fake_call_graphviz)
+
+    g = pydot.Dot("G")
+    g.add_node(pydot.Node("d"))
+    g.add_edge(pydot.Edge("a", '"b c"'))
+    g.add_edge(pydot.Edge('"b c"', "a"))
+
+    result = g.layout_positions()
+    assert result.nodes == {"d": 0, "a": 1, "b c": 2}
+    assert np.isnan(result.positions[0]).all()
+    assert result.positions[1:].tolist() == [[39, 34], [120, 106]]
+    assert result.sizes[1:].tolist() == [[54, 36], [72, 36]]
+    assert result.edges.tolist() == [[1, 2], [2, 1]]
+    assert result.offsets.tolist() == [0, 4, 12]
+    assert result.points[:4].tolist() == [[3, 4], [5, 6], [7, 8], [9, 10]]
+    assert result.points[4:].tolist() == [[i, i] for i in range(1, 9)]
+    assert result.bounding_box.tolist() == [0, 0, 160, 124]
+    assert g.get_node("a") == []
+
+    g.layout_positions(store=True)
+    assert g.get_node("a")[0].get_pos() == "39,34"
+
+    # Layouts in three dimensions
+    layout["objects"][1]["pos"] = "39,34,1"
+    layout["objects"][2]["pos"] = "120,106,2"
+    layout["edges"][0]["pos"] = "e,1,2,3 3,4,5"
+    del layout["edges"][1]
+    result = g.layout_positions()
+    assert result.positions[1:].tolist() == [[39, 34, 1], [120, 106, 2]]
+    assert result.points.tolist() == [[3, 4, 5]]
+
+    layout["objects"][2]["pos"] = "120,106"
+    with pytest.raises(ValueError, match="numbers of coordinates"):
+        g.layout_positions()
+
+
+def test_render_limits_timeout() -> None:
+    limits = pydot.RenderLimits(timeout=0.5)
+    sleep = ["-c", "import time; time.sleep(60)"]
+    with pytest.raises(pydot.GraphvizLimitError) as exc_info:
+        pydot.call_graphviz("python", sleep, None, limits=limits)
+    assert exc_info.value.limit == "timeout"
+    assert exc_info.value.program == "python"
+
+    with pytest.raises(pydot.GraphvizLimitError):
+        asyncio.run(
+            pydot.core.acall_graphviz("python", sleep, None, limits=limits)
+        )
+
+    pydot.call_graphviz("python", ["-c", "pass"], None, limits=limits)
+    assert limits.runs == 3
+    assert limits.exceeded == {"timeout": 2}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="No resource limits")
+def test_render_limits_resources() -> None:
+    limits = pydot.RenderLimits(cpu_time=1, memory=2**40)
+    spin = ["-c", "while True: pass"]
+    with pytest.raises(pydot.GraphvizLimitError) as exc_info:
+        pydot.call_graphviz("python", spin, None, limits=limits)
+    assert exc_info.value.limit == "cpu_time"
+
+    with pytest.raises(pydot.GraphvizLimitError) as exc_info:
+        limits._check("dot", 1, b"Error: Out of memory")
+    assert exc_info.value.limit == "memory"
+    assert limits.exceeded == {"cpu_time": 1, "memory": 1}
+
+    # Other failures are left to the caller, crashes included.
+    limits._check("dot", 1, b"Error: syntax error")
+    limits._check("dot", -signal.SIGSEGV, b"")
+    limits._check("dot", -signal.SIGABRT, b"Assertion failed")
+    with pytest.raises(pydot.GraphvizLimitError):
+        limits._check("dot", -signal.SIGABRT, b"std::bad_alloc")
+    assert limits.exceeded == {"cpu_time": 1, "memory": 2}
+
+
+FAKE_GRAPHVIZ = """\
+import sys
+data = sys.stdin.buffer.read()
+outputs = [arg[2:] for arg in sys.argv[1:] if arg.startswith("-o")]
+for path in outputs:
+    with open(path, "wb") as f:
+        f.write(data)
+if b"bad" in data:
+    sys.exit("Error: syntax error")
+if not outputs:
+    for i in range(0, len(data), 7):
+        sys.stdout.buffer.write(data[i : i + 7])
+        sys.stdout.flush()
+"""
+
+
+@pytest.fixture
+def fake_graphviz(tmp_path):
+    """A program that copies its input to its output, like `-Tcanon`."""
+    if sys.platform == "win32":
+        pytest.skip("Needs an executable script")
+    path = tmp_path / "fake_graphviz"
+    path.write_text(f"#!{sys.executable}\n{FAKE_GRAPHVIZ}")
+    path.chmod(0o755)
+    return str(path)
+
+
+RELATIVE_IMAGE_GRAPHVIZ = """\
+import sys
+args = sys.argv[1:]
+with open("image.txt", "rb") as f:
+    image = f.read()
+if "-O" in args:
+    inputs = args[args.index("-O") + 1 :]
+    outputs = [f"{path}.svg" for path in inputs]
+else:
+    sys.stdin.buffer.read()
+    outputs = [arg[2:] for arg in args if arg.startswith("-o")]
+for path in outputs:
+    with open(path, "wb") as f:
+        f.write(image)
+if not outputs:
+    sys.stdout.buffer.write(image)
+"""
+
+
+def test_render_relative_paths(monkeypatch, tmp_path) -> None:
+    if sys.platform == "win32":
+        pytest.skip("Needs an executable script")
+    prog = tmp_path / "fake_graphviz"
+    prog.write_text(f"#!{sys.executable}\n{RELATIVE_IMAGE_GRAPHVIZ}")
+    prog.chmod(0o755)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "image.txt").write_bytes(b"image")
+
+    # Relative paths resolve from the current directory, whether graphs
+    # are rendered on their own, in several formats or in a batch.
+    graphs = [pydot.Dot(f"G{i}") for i in range(4)]
+    assert graphs[0].create(prog=str(prog), format="svg") == b"image"
+    outputs = graphs[0].create_multi(["svg", "png"], prog=str(prog))
+    assert outputs == {"svg": b"image", "png": b"image"}
+    with pydot.RenderPool(workers=1) as pool:
+        futures = [
+            pool.submit(g, prog=str(prog), format="svg") for g in graphs
+        ]
+        assert [f.result() for f in futures] == [b"image"] * 4
+
+
+def test_create_stream(fake_graphviz) -> None:
+    g = pydot.Dot("G")
+    g.add_edge(pydot.Edge("a", "b"))
+    chunks = list(g.create_stream(prog=fake_graphviz, chunk_size=4))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 4 for chunk in chunks)
+    assert b"".join(chunks) == g.to_string().encode()
+
+    stream = g.create_stream(prog=fake_graphviz)
+    assert next(stream)
+    stream.close()
+
+    with pytest.raises(AssertionError):
+        list(pydot.Dot("bad").create_stream(prog=fake_graphviz))
+
+    with pytest.raises(OSError, match="not found in path"):
+        list(g.create_stream(prog="pydot-missing-program"))
+
+
+def test_write_without_buffering(fake_graphviz, tmp_path) -> None:
+    g = pydot.Dot("G")
+    path = tmp_path / "G.svg"
+    assert g.write(str(path), prog=fake_graphviz, format="svg")
+    assert path.read_text() == g.to_string()
+    umask = os.umask(0)
+    os.umask(umask)
+    assert path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+    # A failed render leaves the file as it was.
+    with pytest.raises(AssertionError):
+        pydot.Dot("bad").write_svg(str(path), prog=fake_graphviz)
+    assert path.read_text() == g.to_string()
+    assert sorted(os.listdir(tmp_path)) == ["G.svg", "fake_graphviz"]
+
+    # Files are written through links, keeping their permissions.
+    path.chmod(0o640)
+    link = tmp_path / "link.svg"
+    link.symlink_to(path)
+    hardlink = tmp_path / "hardlink.svg"
+    os.link(path, hardlink)
+    h = pydot.Dot("H")
+    h.write_svg(str(link), prog=fake_graphviz)
+    assert link.is_symlink()
+    assert path.read_text() == h.to_string()
+    assert hardlink.read_text() == h.to_string()
+    assert path.stat().st_mode & 0o777 == 0o640
+
+
+def test_graphviz_installation(monkeypatch, fake_graphviz) -> None:
+    monkeypatch.setattr(pydot.core, "_graphviz", None)
+    bin_dir = os.path.dirname(fake_graphviz)
+    os.rename(fake_graphviz, os.path.join(bin_dir, "dot"))
+    monkeypatch.setenv("PATH", bin_dir)
+
+    graphviz = pydot.get_graphviz()
+    assert pydot.get_graphviz() is graphviz
+    assert graphviz.which("dot") == os.path.join(bin_dir, "dot")
+    assert graphviz.which("neato") is None
+    with pytest.raises(FileNotFoundError, match="not found in path"):
+        pydot.Dot("G").create(prog="neato")
+    assert (
+        pydot.Dot("G").create(prog="dot")
+        == pydot.Dot("G").to_string().encode()
+    )
+
+    def fake_call_graphviz(**kwargs):
+        messages = {
+            "-V": b"dot - graphviz version 2.43.0 (0)\n",
+            "-T?": b'Format: "?" not recognized. Use one of: png svg\n',
+            "-K?": b"Use one of: circo dot neato\n",
+        }
+        stderr = messages[kwargs["arguments"][0]]
+        return b"", stderr, subprocess.CompletedProcess([], returncode=1)
+
+    monkeypatch.setattr(pydot.core, "call_graphviz", fake_call_graphviz)
+    assert graphviz.version == "2.43.0"
+    assert graphviz.version_info == (2, 43, 0)
+    assert graphviz.formats == {"png", "svg"}
+    assert graphviz.layout_engines == {"circo", "dot", "neato"}
+
+    monkeypatch.setenv("PATH", "")
+    assert pydot.get_graphviz() is not graphviz
+
+
+def test_shape_files_staging(monkeypatch, tmp_path) -> None:
+    shape = tmp_path / "shape.png"
+    shape.write_bytes(b"first")
+    with pydot.core._shape_files_dir([str(shape)]) as staging_dir:
+        staged = os.path.join(staging_dir, "shape.png")
+        assert os.path.samefile(staged, shape)
+
+    shape.write_bytes(b"second, changed")
+    with pydot.core._shape_files_dir([str(shape)]) as changed_dir:
+        assert changed_dir != staging_dir
+
+    def unsupported(*args):
+        raise OSError("not supported")
+
+    monkeypatch.setattr(os, "link", unsupported)
+    monkeypatch.setattr(os, "symlink", unsupported)
+    (tmp_path / "staged").mkdir()
+    pydot.core._stage_shape_files([str(shape)], str(tmp_path / "staged"))
+    assert (tmp_path / "staged" / "shape.png").read_bytes() == (
+        b"second, changed"
+    )
@@ -6,10 +6,13 @@
 
 from __future__ import annotations
 
+import copy
+import pickle
+
 import pytest
 
 import pydot
-from pydot.classes import FrozenDict
+from pydot.classes import FrozenDict, SharedAttributes, intern_attributes
 
 
 def test_FrozenDict_create(objdict):
@@ -85,3 +88,29 @@ def test_frozendict_deprecation(objdict):
         fd = pydot.frozendict(objdict)
 
     assert isinstance(fd, FrozenDict)
+
+
+def test_intern_attributes() -> None:
+    sa1 = intern_attributes({"shape": "box", "color": "red"})
+    sa2 = intern_attributes({"shape": "box", "color": "red"})
+    sa3 = intern_attributes({"color": "red", "shape": "box"})
+    assert isinstance(sa1, SharedAttributes)
+    assert sa1 is sa2
+    assert sa1 is not sa3  # Order is significant for output
+    # So are the types of equal values
+    sa4 = intern_attributes({"penwidth": 1})
+    assert intern_attributes({"penwidth": True}) is not sa4
+    assert intern_attributes({"penwidth": 1.0}) is not sa4
+    assert type(intern_attributes({"penwidth": 1.0})["penwidth"]) is float
+    assert sa1 == sa3 == {"shape": "box", "color": "red"}
+    assert sa1 != {"shape": "box"}
+    assert intern_attributes(sa1) is sa1
+    assert repr(sa1) == "SharedAttributes({'shape': 'box', 'color': 'red'})"
+
+    with pytest.raises(AttributeError):
+        sa1["shape"] = "circle"
+    with pytest.raises(TypeError):
+        intern_attributes({"pos": ["unhashable"]})
+
+    assert pickle.loads(pickle.dumps(sa1)) is sa1
+    assert copy.deepcopy(sa1) is sa1